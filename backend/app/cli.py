@@ -0,0 +1,358 @@
+"""Command-line entry points.
+
+``bulk-parse`` runs the same pipeline as ``POST /parse`` over every PDF under
+a directory, spreading files across worker processes::
+
+    python -m app.cli bulk-parse /archive/specs --out specs.ndjson --workers 8
+    python -m app.cli bulk-parse /archive/specs --save-as reviewer@example.com
+
+With ``--out`` each finished file is appended to an NDJSON file as one line;
+with ``--save-as`` it is saved as a result owned by that user, exactly as
+``/parse?save=true`` would.  Re-running the same command after an
+interruption skips files that were already processed: by relative path for
+NDJSON output, by document hash for database output. With both, a file
+already saved but missing from the NDJSON file is parsed again and written
+there without saving it twice. ``--retry-errors``
+re-runs the files that failed before; their error records are removed from
+the NDJSON file first, so each path keeps one record.
+
+``maintenance`` runs one retention + compaction pass (see
+``app.services.maintenance``) and prints its report::
+
+    python -m app.cli maintenance
+    python -m app.cli maintenance --convert-auto-vacuum   # once, for a database from before auto-vacuum
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Set
+
+from dotenv import load_dotenv
+
+# Load environment variables (DATABASE_URL, ...) before the app modules read them
+load_dotenv()
+
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models.db_models import ParseResult, User  # noqa: E402
+from app.services.match_collector import MatchCollector  # noqa: E402
+from app.services import document_store  # noqa: E402
+from app.services.maintenance import run_maintenance  # noqa: E402
+from app.services.pipeline import ParseOutcome, parse_document, save_parse_result  # noqa: E402
+
+_worker_known_hashes: Set[str] = set()
+_worker_store_documents = False
+_worker_reparse_known = False
+
+_TAIL_BLOCK = 1 << 16
+
+
+def _iter_pdfs(root: str) -> Iterator[str]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(".pdf"):
+                yield os.path.join(dirpath, name)
+
+
+def _init_worker(known_hashes: Set[str], store_documents: bool, reparse_known: bool) -> None:
+    global _worker_known_hashes, _worker_store_documents, _worker_reparse_known
+    _worker_known_hashes = known_hashes
+    _worker_store_documents = store_documents
+    _worker_reparse_known = reparse_known
+
+
+def _parse_file(path: str, rel_path: str) -> Dict:
+    """Worker: parse one PDF and return a picklable record."""
+
+    try:
+        with open(path, "rb") as fh:
+            data = fh.read()
+        sha256 = hashlib.sha256(data).hexdigest()
+        already_saved = sha256 in _worker_known_hashes
+        if already_saved and not _worker_reparse_known:
+            return {"path": rel_path, "sha256": sha256, "skipped": True}
+        store = _worker_store_documents and not already_saved
+        outcome = parse_document(data, collect_pages=store)
+    except Exception as e:  # one bad PDF must not stop a backfill
+        return {"path": rel_path, "error": f"{type(e).__name__}: {e}"}
+    if store:
+        try:
+            document_store.save_document(data)
+        except Exception as e:
+            outcome.close()  # a spilled collection's temp file
+            return {"path": rel_path, "error": f"{type(e).__name__}: {e}"}
+
+    return {
+        "path": rel_path,
+        "sha256": sha256,
+        "already_saved": already_saved,
+        "num_pages": outcome.num_pages,
+        "parse_time_ms": outcome.parse_time_ms,
+        "total_matches": outcome.total_matches,
+        "matched_pages": outcome.matched_pages,
+        "regex_truncated_pages": outcome.regex_truncated_pages,
+        "results": outcome.results,
+        "pages": outcome.pages,
+    }
+
+
+def _truncate_torn_tail(out_path: str) -> None:
+    """Cut a final line the previous run died in the middle of writing."""
+
+    with open(out_path, "rb+") as fh:
+        end = fh.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            step = min(_TAIL_BLOCK, pos)
+            fh.seek(pos - step)
+            block = fh.read(step)
+            if pos == end and block.endswith(b"\n"):
+                return
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                fh.truncate(pos - step + newline + 1)
+                return
+            pos -= step
+        fh.truncate(0)
+
+
+def _load_done_paths(out_path: str, retry_errors: bool) -> Set[str]:
+    """Read an existing NDJSON output, dropping a torn final line.
+
+    With ``retry_errors``, error records are also removed from the file
+    (rewritten line by line) so that every path keeps a single record.
+    """
+
+    done: Set[str] = set()
+    if not os.path.exists(out_path):
+        return done
+    _truncate_torn_tail(out_path)
+    dropped = 0
+    tmp_path = f"{out_path}.tmp"
+    with open(out_path, "rb") as fh, (open(tmp_path, "wb") if retry_errors else contextlib.nullcontext()) as tmp:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if retry_errors and record is not None and "error" in record:
+                dropped += 1
+                continue
+            if tmp is not None:
+                tmp.write(line)
+            if record is not None:
+                done.add(record["path"])
+    if retry_errors:
+        if dropped:
+            os.replace(tmp_path, out_path)
+        else:
+            os.remove(tmp_path)
+    return done
+
+
+def _bulk_parse(args: argparse.Namespace) -> int:
+    if not args.out and not args.save_as:
+        print("bulk-parse: give --out and/or --save-as", file=sys.stderr)
+        return 2
+
+    root = os.path.abspath(args.directory)
+    done_paths = _load_done_paths(args.out, args.retry_errors) if args.out else set()
+
+    db = None
+    user_id: Optional[int] = None
+    known_hashes: Set[str] = set()
+    if args.save_as:
+        init_db()
+        db = SessionLocal()
+        user = db.query(User).filter(User.email == args.save_as).first()
+        if user is None:
+            print(f"bulk-parse: no user with email {args.save_as}", file=sys.stderr)
+            return 2
+        user_id = user.id
+        known_hashes = {
+            h
+            for (h,) in db.query(ParseResult.document_hash)
+            .filter(ParseResult.user_id == user_id, ParseResult.document_hash.isnot(None))
+            .all()
+        }
+
+    todo = []
+    for path in _iter_pdfs(root):
+        rel_path = os.path.relpath(path, root)
+        if rel_path not in done_paths:
+            todo.append((path, rel_path))
+    print(f"bulk-parse: {len(todo)} file(s) to process, {len(done_paths)} already done", file=sys.stderr)
+
+    out_fh = open(args.out, "a", encoding="utf-8") if args.out else None
+    workers = args.workers or os.cpu_count() or 1
+    counts = {"parsed": 0, "skipped": 0, "errors": 0}
+    t0 = time.time()
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            # With --out, a saved file missing from the NDJSON is parsed again for it
+            initargs=(known_hashes, db is not None, out_fh is not None),
+        ) as pool:
+            pending: Set[concurrent.futures.Future] = set()
+            queue = iter(todo)
+            finished = 0
+            while True:
+                # Keep a bounded window in flight so results never pile up in memory.
+                while len(pending) < workers * 2:
+                    nxt = next(queue, None)
+                    if nxt is None:
+                        break
+                    pending.add(pool.submit(_parse_file, *nxt))
+                if not pending:
+                    break
+                completed, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for fut in completed:
+                    record = fut.result()
+                    finished += 1
+                    status = _handle_record(record, out_fh, db, user_id, counts)
+                    print(f"[{finished}/{len(todo)}] {record['path']}: {status}", file=sys.stderr)
+    finally:
+        if out_fh is not None:
+            out_fh.close()
+        if db is not None:
+            db.close()
+
+    elapsed = time.time() - t0
+    print(
+        f"bulk-parse: {counts['parsed']} parsed, {counts['skipped']} skipped, "
+        f"{counts['errors']} failed in {elapsed:.1f}s",
+        file=sys.stderr,
+    )
+    return 1 if counts["errors"] else 0
+
+
+def _handle_record(record: Dict, out_fh, db, user_id: Optional[int], counts: Dict[str, int]) -> str:
+    if record.get("skipped"):
+        counts["skipped"] += 1
+        return "already saved"
+    if "error" in record:
+        counts["errors"] += 1
+        if out_fh is not None:
+            out_fh.write(json.dumps(record) + "\n")
+            out_fh.flush()
+        return record["error"]
+
+    pages: List = record.pop("pages")
+    collector: MatchCollector = record.pop("results")
+    already_saved = record.pop("already_saved")
+    out_pos = out_fh.tell() if out_fh is not None else None
+    try:
+        # Small collections are encoded once and reused; spilled ones stream.
+        results_json = None if collector.spilled else collector.to_json()
+        if already_saved:
+            record["result_id"] = _saved_result_id(db, user_id, record["sha256"])
+        elif db is not None:
+            outcome = ParseOutcome(
+                results=collector,
+                num_pages=record["num_pages"],
+                parse_time_ms=record["parse_time_ms"],
+                pages=pages,
+                regex_truncated_pages=record["regex_truncated_pages"],
+            )
+            saved = save_parse_result(
+                db,
+                user_id,
+                record["path"],
+                outcome,
+                document_hash=record["sha256"],
+                results_json=results_json,
+            )
+            record["result_id"] = saved.id
+        if out_fh is not None:
+            out_fh.write(json.dumps(record)[:-1] + ', "results": ')
+            if results_json is not None:
+                out_fh.write(results_json)
+            else:
+                for chunk in collector.iter_json():
+                    out_fh.write(chunk.decode("utf-8"))
+            out_fh.write("}\n")
+            out_fh.flush()
+    except Exception as e:  # a failed save or write must not stop the backfill either
+        if db is not None:
+            db.rollback()
+        error = {"path": record["path"], "error": f"{type(e).__name__}: {e}"}
+        return _handle_record(error, _rewind(out_fh, out_pos), db, user_id, counts)
+    finally:
+        collector.close()
+    counts["parsed"] += 1
+    if already_saved:
+        return "already saved; written to the NDJSON output"
+    return f"{record['total_matches']} matches on {record['matched_pages']} page(s) in {record['parse_time_ms']} ms"
+
+
+def _saved_result_id(db, user_id: int, sha256: str) -> Optional[int]:
+    row = (
+        db.query(ParseResult.id)
+        .filter(ParseResult.user_id == user_id, ParseResult.document_hash == sha256)
+        .order_by(ParseResult.id)
+        .first()
+    )
+    return row.id if row is not None else None
+
+
+def _rewind(out_fh, pos: Optional[int]):
+    """Drop a partly written line from ``out_fh``; None if the file is unusable."""
+
+    if out_fh is None:
+        return None
+    try:
+        out_fh.flush()
+    except OSError:
+        pass
+    try:
+        out_fh.truncate(pos)
+    except OSError:
+        return None
+    return out_fh
+
+
+def _maintenance(args: argparse.Namespace) -> int:
+    init_db()
+    report = run_maintenance(convert_auto_vacuum=args.convert_auto_vacuum)
+    if report is None:
+        print("Another process is running maintenance; try again later", file=sys.stderr)
+        return 1
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="CSI Parse command-line tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bulk = sub.add_parser("bulk-parse", help="Parse every PDF under a directory")
+    bulk.add_argument("directory", help="Directory tree to scan for *.pdf")
+    bulk.add_argument("--out", help="Append one NDJSON record per file to this path")
+    bulk.add_argument("--save-as", metavar="EMAIL", help="Save each file as a result owned by this user")
+    bulk.add_argument("--workers", type=int, default=0, help="Worker processes (default: CPU count)")
+    bulk.add_argument("--retry-errors", action="store_true", help="Re-run files that failed in a previous run")
+    bulk.set_defaults(func=_bulk_parse)
+
+    maint = sub.add_parser("maintenance", help="Apply result retention and compact the database once")
+    maint.add_argument(
+        "--convert-auto-vacuum",
+        action="store_true",
+        help="Switch an older database to incremental auto-vacuum (full VACUUM; locks the database while it runs)",
+    )
+    maint.set_defaults(func=_maintenance)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
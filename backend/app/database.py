@@ -1,6 +1,6 @@
 """Database configuration and session management."""
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -25,8 +25,49 @@ Base = declarative_base()
 def init_db():
     """Initialize database by creating all tables."""
     from app.models import db_models  # noqa: F401 - Import to register models
-    
+    from app.services import document_store, search_index, uploads  # noqa: F401 - Register listeners
+
+    _set_auto_vacuum()
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    search_index.ensure_schema(engine)
+
+
+def _set_auto_vacuum():
+    """Create new SQLite databases with incremental auto-vacuum.
+
+    The setting only takes effect before the first table is created; older
+    databases are converted on request by ``python -m app.cli maintenance
+    --convert-auto-vacuum`` (see ``app.services.maintenance``).
+    """
+    if engine.dialect.name != "sqlite" or inspect(engine).get_table_names():
+        return
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+
+
+def _add_missing_columns():
+    """Add nullable columns introduced after a table was first created.
+
+    ``create_all`` only creates missing tables, so databases from earlier
+    releases would otherwise lack newer columns.  Indexes declared on those
+    columns are created as well.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present or not column.nullable:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+                for index in table.indexes:
+                    if column in index.columns.values():
+                        index.create(bind=conn, checkfirst=True)
 
 
 def get_db():
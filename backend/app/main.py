@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
@@ -7,10 +9,15 @@ import os
 load_dotenv()
 
 from app.database import init_db
+from app.services import maintenance
+from app.routers.admin import router as admin_router
 from app.routers.health import router as health_router
 from app.routers.parse import router as parse_router
 from app.routers.auth import router as auth_router
 from app.routers.results import router as results_router
+from app.routers.search import router as search_router
+from app.routers.uploads import router as uploads_router
+from app.utils.compression import CompressionMiddleware
 
 app = FastAPI(title='CSI Parse API', version='0.1.0')
 
@@ -20,14 +27,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=['*'],
     allow_headers=['*'],
+    expose_headers=['ETag', 'Content-Disposition'],
 )
+app.add_middleware(CompressionMiddleware)
 
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
     init_db()
+    if maintenance.MAINTENANCE_INTERVAL_SECONDS > 0:
+        app.state.maintenance_task = asyncio.create_task(maintenance.run_periodically())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    task = getattr(app.state, "maintenance_task", None)
+    if task is not None:
+        task.cancel()
 
 app.include_router(health_router, prefix='/api/v1')
 app.include_router(auth_router, prefix='/api/v1')
 app.include_router(parse_router, prefix='/api/v1')
 app.include_router(results_router, prefix='/api/v1')
+app.include_router(search_router, prefix='/api/v1')
+app.include_router(uploads_router, prefix='/api/v1')
+app.include_router(admin_router, prefix='/api/v1')
@@ -1,6 +1,6 @@
 """Database models for SQLAlchemy."""
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -14,11 +14,15 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
+    # Personal retention limits; None falls back to the server defaults
+    retention_days = Column(Integer, nullable=True)
+    retention_max_results = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationship to parse results (for future use)
     parse_results = relationship("ParseResult", back_populates="user", cascade="all, delete-orphan")
+    upload_sessions = relationship("UploadSession", back_populates="user", cascade="all, delete-orphan")
 
 
 class ParseResult(Base):
@@ -34,8 +38,56 @@ class ParseResult(Base):
     total_matches = Column(Integer, nullable=False)
     matched_pages = Column(Integer, nullable=False)
     results_json = Column(Text, nullable=False)  # JSON string of full results
+    document_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the stored PDF
+    regex_truncated_pages = Column(Text, nullable=True)  # JSON list of pages whose regex scan hit its budget
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     # Relationship to user
     user = relationship("User", back_populates="parse_results")
+    aggregates = relationship("ResultAggregate", cascade="all, delete-orphan")
 
+
+class ResultAggregate(Base):
+    """Match count and confidence sum of one result for one key of one dimension.
+
+    Computed once when the result is saved (see ``app.services.aggregates``),
+    so summaries never have to read ``results_json``.
+    """
+
+    __tablename__ = "result_aggregates"
+
+    result_id = Column(Integer, ForeignKey("parse_results.id", ondelete="CASCADE"), primary_key=True)
+    dimension = Column(String(16), primary_key=True)  # keyword, section, division, page_bucket, ...
+    key = Column(String, primary_key=True)
+    matches = Column(Integer, nullable=False)
+    confidence_sum = Column(Float, nullable=False)
+
+
+
+class UploadSession(Base):
+    """A resumable upload in progress; its bytes are assembled under ``UPLOAD_DIR``."""
+
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex, also names the .part file
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename = Column(String, nullable=False)
+    total_size = Column(Integer, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    sha256 = Column(String(64), nullable=True)  # expected digest of the whole file, if given
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime, nullable=False, index=True)  # naive UTC
+    completing_since = Column(DateTime, nullable=True)  # naive UTC; set while /complete runs
+
+    user = relationship("User", back_populates="upload_sessions")
+    chunks = relationship("UploadChunk", cascade="all, delete-orphan", order_by="UploadChunk.chunk_index")
+
+
+class UploadChunk(Base):
+    """One verified chunk of an ``UploadSession``."""
+
+    __tablename__ = "upload_chunks"
+
+    upload_id = Column(String(32), ForeignKey("upload_sessions.id", ondelete="CASCADE"), primary_key=True)
+    chunk_index = Column(Integer, primary_key=True)
+    sha256 = Column(String(64), nullable=False)
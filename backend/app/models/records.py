@@ -0,0 +1,53 @@
+"""Compact internal records for the parse hot loop.
+
+A keyword-heavy document can produce tens of thousands of matches.  Building
+a pydantic ``ParseResultItem`` (plus a nested ``Position``) for each one,
+dumping it again for storage and letting FastAPI re-validate the whole
+response costs more than the matching itself.  The pipeline therefore
+collects :class:`MatchRecord` tuples and serializes them to JSON exactly once;
+that string is both stored in ``results_json`` and spliced into the
+response body.  The JSON shape is identical to ``ParseResultItem``.
+"""
+
+import json
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+
+class MatchRecord(NamedTuple):
+    keyword: str
+    page: int
+    section_hint: Optional[str]
+    spec_section: Optional[str]
+    snippet: str
+    context_before: str
+    context_after: str
+    context_window: str
+    confidence: float
+    match_type: str
+    start: int
+    end: int
+    proximity_window: Optional[int]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the ``ParseResultItem``-shaped dict for this match."""
+
+        return {
+            "keyword": self.keyword,
+            "page": self.page,
+            "section_hint": self.section_hint,
+            "spec_section": self.spec_section,
+            "snippet": self.snippet,
+            "context_before": self.context_before,
+            "context_after": self.context_after,
+            "context_window": self.context_window,
+            "confidence": self.confidence,
+            "match_type": self.match_type,
+            "positions": [{"start": self.start, "end": self.end}],
+            "proximity_window": self.proximity_window,
+        }
+
+
+def serialize_records(records: Iterable[MatchRecord]) -> str:
+    """Encode matches as the JSON array stored in ``ParseResult.results_json``."""
+
+    return json.dumps([record.to_dict() for record in records])
@@ -1,9 +1,10 @@
 from typing import List, Optional, Literal
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 
 
 class Position(BaseModel):
+    # Offsets into the normalized page text that was matched (headers/footers stripped)
     start: int
     end: int
 
@@ -51,6 +52,18 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class RetentionSettings(BaseModel):
+    # None: use the server default; values looser than the server's have no effect
+    max_age_days: Optional[int] = Field(None, ge=1)
+    max_results: Optional[int] = Field(None, ge=1)
+
+
+class RetentionResponse(BaseModel):
+    settings: RetentionSettings
+    server_defaults: RetentionSettings
+    effective: RetentionSettings
+
+
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str
@@ -61,6 +74,13 @@ class Token(BaseModel):
     token_type: str
 
 
+class ParseJobStatus(BaseModel):
+    job_id: str
+    filename: str
+    progress: float  # 0..1
+    started_at: float  # Unix time
+
+
 # Results schemas
 class ParseResultSummary(BaseModel):
     id: int
@@ -88,3 +108,67 @@ class ParseResultDetail(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class AggregateBucket(BaseModel):
+    key: str
+    matches: int
+    mean_confidence: Optional[float] = None
+
+
+class MatchBreakdown(BaseModel):
+    total_matches: int
+    mean_confidence: Optional[float] = None
+    by_keyword: List[AggregateBucket]
+    by_section: List[AggregateBucket]  # spec_section article, e.g. "1.05"
+    by_division: List[AggregateBucket]  # MasterFormat division, e.g. "03"
+    by_page_bucket: List[AggregateBucket]  # key: first page of the bucket
+    confidence_histogram: List[AggregateBucket]  # key: lower bound, in tenths
+    page_bucket_size: int
+
+
+class ResultBreakdown(MatchBreakdown):
+    result_id: int
+    filename: str
+    num_pages: int
+    matched_pages: int
+
+
+class ResultsBreakdown(MatchBreakdown):
+    result_count: int
+    pending_results: int = 0  # older results not aggregated yet, so not in the totals
+
+
+# Search schemas
+class SearchHit(BaseModel):
+    result_id: int
+    filename: str
+    page: int
+    section_hint: Optional[str] = None
+    snippet: str
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    hits: List[SearchHit]
+
+
+# Resumable upload schemas
+class UploadCreate(BaseModel):
+    filename: str
+    size: int
+    chunk_size: Optional[int] = None  # server default when omitted
+    sha256: Optional[str] = None  # verified at finalize when given
+
+
+class UploadStatus(BaseModel):
+    upload_id: str
+    filename: str
+    size: int
+    chunk_size: int
+    total_chunks: int
+    received_bytes: int
+    received_ranges: List[List[int]]  # merged [start, end) byte ranges
+    missing_chunks: List[int]
+    expires_at: datetime
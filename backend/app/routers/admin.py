@@ -0,0 +1,36 @@
+"""Admin-only routes (users listed in ``ADMIN_EMAILS``)."""
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.models.db_models import User
+from app.services import profiling
+from app.utils.auth import get_current_admin
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/profiles", response_model=List[dict])
+def list_profiles(current_admin: User = Depends(get_current_admin)):
+    """Stored parse profiles, newest first (per-page and per-function detail omitted)."""
+    return profiling.list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, current_admin: User = Depends(get_current_admin)):
+    """One profile: timings, peak memory, every page's stage timings and the top functions."""
+    summary = profiling.load_profile(profile_id)
+    if summary is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return summary
+
+
+@router.get("/profiles/{profile_id}/pstats")
+def download_pstats(profile_id: str, current_admin: User = Depends(get_current_admin)):
+    """The raw cProfile dump, for ``snakeviz`` or ``python -m pstats``."""
+    path = profiling.pstats_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"parse-{profile_id}.prof")
@@ -6,10 +6,18 @@ from sqlalchemy.exc import IntegrityError
 
 from app.database import get_db
 from app.models.db_models import User
-from app.models.schemas import UserCreate, UserResponse, Token, LoginRequest
+from app.models.schemas import (
+    UserCreate,
+    UserResponse,
+    Token,
+    LoginRequest,
+    RetentionSettings,
+    RetentionResponse,
+)
+from app.services import maintenance
 from app.utils.auth import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     get_current_user,
 )
@@ -29,7 +37,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
 
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(email=user_data.email, hashed_password=hashed_password)
     db.add(db_user)
 
@@ -51,7 +59,7 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     """Login and get access token."""
     # Find user
     user = db.query(User).filter(User.email == login_data.email).first()
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user or not await verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -69,6 +77,39 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     return current_user
 
 
+def _retention_response(user: User) -> RetentionResponse:
+    server_days = maintenance.RESULT_RETENTION_DAYS
+    server_max = maintenance.RESULT_RETENTION_MAX_RESULTS
+    return RetentionResponse(
+        settings=RetentionSettings(max_age_days=user.retention_days, max_results=user.retention_max_results),
+        server_defaults=RetentionSettings(max_age_days=server_days or None, max_results=server_max or None),
+        effective=RetentionSettings(
+            max_age_days=maintenance.effective_limit(user.retention_days, server_days) or None,
+            max_results=maintenance.effective_limit(user.retention_max_results, server_max) or None,
+        ),
+    )
+
+
+@router.get("/me/retention", response_model=RetentionResponse)
+def get_retention(current_user: User = Depends(get_current_user)):
+    """Get the retention limits applied to the current user's saved results."""
+    return _retention_response(current_user)
+
+
+@router.put("/me/retention", response_model=RetentionResponse)
+def set_retention(
+    settings: RetentionSettings,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Set personal retention limits; old results are removed by the next maintenance run."""
+    current_user.retention_days = settings.max_age_days
+    current_user.retention_max_results = settings.max_results
+    db.commit()
+    db.refresh(current_user)
+    return _retention_response(current_user)
+
+
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     current_user: User = Depends(get_current_user),
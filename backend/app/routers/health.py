@@ -1,4 +1,11 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.models.db_models import User
+from app.services.admission import parse_admission
+from app.services.maintenance import maintenance_stats
+from app.services.matcher import REGEX_SET
+from app.services.parse_jobs import parse_jobs
+from app.utils.auth import get_current_admin
 
 router = APIRouter()
 
@@ -6,3 +13,18 @@ router = APIRouter()
 @router.get('/health')
 def health() -> dict:
     return {"status": "ok"}
+
+
+@router.get('/metrics')
+def metrics(current_admin: User = Depends(get_current_admin)) -> dict:
+    """Operational counters; admin-only (users in ``ADMIN_EMAILS``)."""
+    return {
+        "admission": parse_admission.stats(),
+        "parses": parse_jobs.stats(),
+        "maintenance": maintenance_stats.snapshot(),
+        "regex": {
+            "patterns": len(REGEX_SET.patterns),
+            "scans_skipped": REGEX_SET.patterns_skipped,
+            "pages_over_budget": REGEX_SET.pages_over_budget,
+        },
+    }
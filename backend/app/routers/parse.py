@@ -1,119 +1,233 @@
 # app/routers/parse.py
+import asyncio
 import json
-import time
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 
-from app.models.schemas import ParseResponse, ParseResultItem, DocumentMeta, Position
-from app.models.db_models import ParseResult, User
-from app.services.pdf_parser import PDFParser
-from app.services.matcher import find_matches, compute_confidence
-from app.utils.spec_section import SectionResolver
-from app.utils.text import normalize_text_with_mapping, window
-from app.utils.keywords import SNIPPET_WINDOW, PROXIMITY_CHAR_WINDOW
-from app.utils.auth import get_current_user
+from app.models.schemas import ParseJobStatus, ParseResponse
+from app.models.db_models import User
+from app.services.admission import parse_admission, AdmissionRejected
+from app.services import document_store, profiling
+from app.services.parse_jobs import JOB_ID_PATTERN, ParseCancelled, ParseJob, parse_jobs
+from app.services.pipeline import ParseOutcome, parse_document, save_parse_result
+from app.utils.auth import get_current_user, is_admin
 from app.database import get_db
 
 router = APIRouter()
 
+# How often a running parse checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 0.5
+# nginx's "client closed request"; nobody may be listening for it
+STATUS_PARSE_CANCELLED = 499
+
+
+def _upload_size(file: UploadFile) -> int:
+    if file.size is not None:
+        return file.size
+    # Multipart bodies are already spooled, so seeking is cheap.
+    pos = file.file.tell()
+    file.file.seek(0, 2)
+    size = file.file.tell()
+    file.file.seek(pos)
+    return size
+
+
 @router.post("/parse", response_model=ParseResponse)
 async def parse(
+    request: Request,
     file: UploadFile = File(...),
     save: bool = False,
+    job_id: Optional[str] = Query(None, pattern=JOB_ID_PATTERN, description="Client-chosen id for cancelling"),
+    profile: bool = Query(False, description="Admins only: profile this parse (see GET /admin/profiles)"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
+    check_profile_allowed(profile, current_user)
     if file.content_type not in ("application/pdf", "application/octet-stream"):
         raise HTTPException(status_code=400, detail="File must be a PDF")
 
-    data = await file.read()
-    if not data:
+    size = _upload_size(file)
+    if not size:
         raise HTTPException(status_code=400, detail="Empty file")
 
-    t0 = time.time()
-    parser = PDFParser(data)
-
-    results: List[ParseResultItem] = []
-    # Do this once so we don't call into PyMuPDF twice later
-    num_pages = parser.num_pages()
-
-    section_seed = None
-
-    for page_num, page_text, section_hint in parser.iter_pages():
-        ntext, index_map, canonical = normalize_text_with_mapping(page_text)
-        section_resolver = SectionResolver(canonical, seed_state=section_seed)
-        matches = find_matches(ntext)
-        for keyword_or_pattern, match_type, positions in matches:
-            for start, end in positions:
-                pre, snip, post = window(ntext, start, end, before=SNIPPET_WINDOW, after=SNIPPET_WINDOW)
-                context_window = f"{pre}{snip}{post}"
-                confidence = compute_confidence(ntext, start, end, match_type)
-                source_index = index_map[start] if 0 <= start < len(index_map) else None
-                spec_section = (
-                    section_resolver.resolve(source_index) if source_index is not None else None
-                )
-                results.append(
-                    ParseResultItem(
-                        keyword=keyword_or_pattern,
-                        page=page_num,
-                        section_hint=section_hint or None,
-                        spec_section=spec_section,
-                        snippet=snip,
-                        context_before=pre,
-                        context_after=post,
-                        context_window=context_window,
-                        confidence=confidence,
-                        match_type=match_type,  # type: ignore
-                        positions=[Position(start=start, end=end)],
-                        proximity_window=PROXIMITY_CHAR_WINDOW,
-                    )
-                )
-        section_seed = section_resolver.tail_state()
-
-    elapsed_ms = int((time.time() - t0) * 1000)
-    
-    matched_pages = len({r.page for r in results})
-    total_matches = len(results)
     filename = file.filename or "document.pdf"
+    try:
+        async with cancellable_parse(
+            request, current_user, filename, job_id
+        ) as job, parse_admission.admit(current_user.id, size):
+            data = await file.read()
+            outcome, profile_summary = await run_parse(data, save, job, profile)
+            document_hash = None
+            if save:
+                # Kept so saved results can render pages server-side
+                document_hash = await run_in_threadpool(document_store.save_document, data)
+            del data
+    except AdmissionRejected as e:
+        raise admission_error(e)
+
+    return await build_parse_response(
+        db, current_user, filename, outcome, save, document_hash, profile_summary
+    )
+
+
+@router.get("/parse/jobs", response_model=List[ParseJobStatus])
+def list_parse_jobs(current_user: User = Depends(get_current_user)):
+    """List the current user's parses that are still running."""
+    return [
+        ParseJobStatus(job_id=job.id, filename=job.filename, progress=round(job.progress, 3), started_at=job.started_at)
+        for job in parse_jobs.running(current_user.id)
+    ]
+
+
+@router.post("/parse/jobs/{job_id}/cancel", status_code=status.HTTP_202_ACCEPTED)
+def cancel_parse_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Ask a running parse to stop at its next page boundary."""
+    if not parse_jobs.cancel(current_user.id, job_id, "cancelled_by_user"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No running parse with that job_id")
+    return {"job_id": job_id, "cancelling": True}
+
+
+async def _cancel_on_disconnect(request: Request, job: ParseJob) -> None:
+    while not job.cancelled:
+        if await request.is_disconnected():
+            job.cancel("client_disconnected")
+            return
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+
+@asynccontextmanager
+async def cancellable_parse(
+    request: Request, current_user: User, filename: str, job_id: Optional[str]
+) -> AsyncIterator[ParseJob]:
+    """Register a parse job for the block and cancel it if the client goes away.
+
+    Pass ``job.checkpoint`` to ``parse_document``; a cancelled parse ends the
+    request with ``STATUS_PARSE_CANCELLED``.
+    """
+    try:
+        job = parse_jobs.start(current_user.id, filename, job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    watcher = asyncio.create_task(_cancel_on_disconnect(request, job))
+    try:
+        yield job
+    except ParseCancelled as e:
+        raise HTTPException(status_code=STATUS_PARSE_CANCELLED, detail=str(e))
+    finally:
+        watcher.cancel()
+        parse_jobs.finish(job)
+
+
+def check_profile_allowed(profile: bool, current_user: User) -> None:
+    if profile and not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Profiling is restricted to admins")
+
+
+async def run_parse(
+    source: Union[bytes, str], save: bool, job: ParseJob, profile: bool = False
+) -> Tuple[ParseOutcome, Optional[Dict]]:
+    """Run ``parse_document`` for ``job`` in the threadpool, profiled if asked."""
+
+    # PyMuPDF and the matcher are CPU-bound; keep them off the event loop
+    if not profile:
+        return await run_in_threadpool(parse_document, source, save, job.checkpoint), None
+    try:
+        return await run_in_threadpool(
+            profiling.profile_parse, source, save, job.checkpoint, job.filename, job.user_id
+        )
+    except profiling.ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+def admission_error(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=e.reason,
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+async def build_parse_response(
+    db: Session,
+    current_user: User,
+    filename: str,
+    outcome: ParseOutcome,
+    save: bool,
+    document_hash: Optional[str] = None,
+    profile_summary: Optional[Dict] = None,
+    after_save: Optional[Callable[[], object]] = None,
+) -> Response:
+    """Optionally save ``outcome`` and return it in the ``ParseResponse`` shape.
+
+    ``after_save`` runs (in the threadpool) once the result is committed.
+    """
+
+    # Serialize the matches once; the same string is stored and returned.
+    # Spilled collections stay on disk and are streamed to both instead.
+    results_json = None
+    if not outcome.results.spilled:
+        results_json = await run_in_threadpool(outcome.results.to_json)
 
     result_id = None
 
     # Save to database if requested
     if save:
-        # Convert results to JSON string for storage
-        results_json = json.dumps([result.model_dump() for result in results])
-        
-        # Create ParseResult record
-        db_parse_result = ParseResult(
-            user_id=current_user.id,
-            filename=filename,
-            num_pages=num_pages,
-            parse_time_ms=elapsed_ms,
-            total_matches=total_matches,
-            matched_pages=matched_pages,
-            results_json=results_json,
-        )
-        
-        db.add(db_parse_result)
-        db.commit()
-        db.refresh(db_parse_result)
+        try:
+            db_parse_result = await run_in_threadpool(
+                save_parse_result,
+                db,
+                current_user.id,
+                filename,
+                outcome,
+                document_hash=document_hash,
+                results_json=results_json,
+            )
+        except Exception:
+            outcome.close()
+            raise
         result_id = db_parse_result.id
+        if after_save is not None:
+            try:
+                await run_in_threadpool(after_save)
+            except Exception:
+                outcome.close()
+                raise
 
-    response = ParseResponse(
-        document=DocumentMeta(
-            filename=filename,
-            num_pages=num_pages,
-            parse_time_ms=elapsed_ms,
-        ),
-        results=results,
-        meta={
-            "matched_pages": matched_pages,
-            "total_matches": total_matches,
-            "keywords_used": None,
-        },
-        result_id=result_id,
-    )
+    document = {
+        "filename": filename,
+        "num_pages": outcome.num_pages,
+        "parse_time_ms": outcome.parse_time_ms,
+    }
+    meta = {
+        "matched_pages": outcome.matched_pages,
+        "total_matches": outcome.total_matches,
+        "keywords_used": None,
+        "regex_truncated_pages": outcome.regex_truncated_pages,
+    }
+    if profile_summary is not None:
+        meta["profile"] = {
+            key: profile_summary[key]
+            for key in ("id", "wall_ms", "cpu_ms", "peak_traced_memory_bytes", "slowest_pages")
+        }
+        meta["profile"]["slowest_pages"] = meta["profile"]["slowest_pages"][:5]
+    # Built by hand so FastAPI does not re-validate every match against
+    # ParseResponse; the shape is unchanged.
+    head = f'{{"document":{json.dumps(document)},"results":'
+    tail = f',"meta":{json.dumps(meta)},"result_id":{json.dumps(result_id)}}}'
+    if results_json is not None:
+        return Response(content=head + results_json + tail, media_type="application/json")
 
-    return response
+    def body():
+        yield head.encode()
+        yield from outcome.results.iter_json()
+        yield tail.encode()
+
+    return StreamingResponse(
+        body(), media_type="application/json", background=BackgroundTask(outcome.close)
+    )
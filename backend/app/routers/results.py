@@ -1,18 +1,46 @@
 """Results routes for retrieving and managing saved parse results."""
 
+import csv
+import io
 import json
-from typing import List
+import os
+import re
+from typing import Any, Iterable, Iterator, List, Literal, Optional, Sequence
+from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models.db_models import ParseResult, User
-from app.models.schemas import ParseResultSummary, ParseResultDetail, ParseResultItem
+from app.models.schemas import (
+    ParseResultSummary,
+    ParseResultDetail,
+    ParseResultItem,
+    ResultBreakdown,
+    ResultsBreakdown,
+)
+from app.services import aggregates, document_store, page_renderer, search_index
+from app.services.result_store import (
+    EXPORT_BATCH_SIZE,
+    EXPORT_COLUMNS,
+    ResultFilters,
+    iter_export_rows,
+    result_filters,
+)
 from app.utils.auth import get_current_user
+from app.utils.etag import etag_matches, weak_etag
+from app.utils.keywords import SNIPPET_WINDOW
+from app.utils.xlsx import iter_xlsx
+
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\x20-\x7e]|["\\]')
 
 router = APIRouter(prefix="/results", tags=["results"])
 
+# Part of every result ETag; bump it when the detail representation changes.
+RESULT_ETAG_VERSION = 2
+
 
 @router.get("", response_model=List[ParseResultSummary])
 async def list_results(
@@ -29,29 +57,103 @@ async def list_results(
     return results
 
 
-@router.get("/{result_id}", response_model=ParseResultDetail)
-async def get_result(
+@router.get("/summary", response_model=ResultsBreakdown)
+def summarize_results(
+    ids: Optional[List[int]] = Query(None, description="Only these results (default: all of yours)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Match breakdowns summed over the current user's saved results.
+
+    Served from the aggregates stored with each result; no match payload is read.
+    Results saved before aggregation existed that are not backfilled yet are
+    left out of the totals and counted in ``pending_results``.
+    """
+    pending = aggregates.ensure_aggregated(db, current_user.id, ids)
+    selected = db.query(ParseResult.id).filter(ParseResult.user_id == current_user.id)
+    if ids is not None:
+        selected = selected.filter(ParseResult.id.in_(ids))
+    return ResultsBreakdown(
+        result_count=selected.count(),
+        pending_results=pending,
+        page_bucket_size=aggregates.AGGREGATE_PAGE_BUCKET,
+        **aggregates.summarize(db, selected.scalar_subquery()),
+    )
+
+
+@router.get("/{result_id}/summary", response_model=ResultBreakdown)
+def summarize_result(
     result_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get detailed information about a specific parse result."""
+    """Match counts and mean confidence by keyword, section, division, page bucket and confidence."""
     result = (
-        db.query(ParseResult)
+        db.query(ParseResult.id, ParseResult.filename, ParseResult.num_pages, ParseResult.matched_pages)
         .filter(ParseResult.id == result_id, ParseResult.user_id == current_user.id)
         .first()
     )
-    
+
     if not result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Parse result not found",
         )
+
+    aggregates.ensure_aggregated(db, current_user.id, [result_id], limit=1)
+    return ResultBreakdown(
+        result_id=result.id,
+        filename=result.filename,
+        num_pages=result.num_pages,
+        matched_pages=result.matched_pages,
+        page_bucket_size=aggregates.AGGREGATE_PAGE_BUCKET,
+        **aggregates.summarize(db, [result_id]),
+    )
+
+
+@router.get("/{result_id}", response_model=ParseResultDetail)
+async def get_result(
+    result_id: int,
+    response: Response,
+    filters: ResultFilters = Depends(result_filters),
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get detailed information about a specific parse result.
+
+    Saved results never change, so the response carries an ETag derived from
+    the result's identity and the filters; a matching ``If-None-Match`` gets
+    ``304`` before ``results_json`` is even read.
+    """
+    version = (
+        db.query(ParseResult.id, ParseResult.created_at, ParseResult.total_matches, ParseResult.document_hash)
+        .filter(ParseResult.id == result_id, ParseResult.user_id == current_user.id)
+        .first()
+    )
+
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Parse result not found",
+        )
+
+    etag = weak_etag(
+        RESULT_ETAG_VERSION, *version, filters.page, filters.keyword and filters.keyword.lower(), filters.section
+    )
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    response.headers.update(cache_headers)
+
+    result = db.query(ParseResult).filter(ParseResult.id == result_id).first()
     
     # Parse the JSON results string back into ParseResultItem objects
     try:
         results_data = json.loads(result.results_json)
-        results = [ParseResultItem(**item) for item in results_data]
+        results = [
+            ParseResultItem(**item) for item in results_data if filters.matches(item)
+        ]
     except (json.JSONDecodeError, ValueError, TypeError) as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -63,6 +165,7 @@ async def get_result(
         "matched_pages": result.matched_pages,
         "total_matches": result.total_matches,
         "keywords_used": None,
+        "regex_truncated_pages": json.loads(result.regex_truncated_pages or "[]"),
     }
     
     return ParseResultDetail(
@@ -78,6 +181,151 @@ async def get_result(
     )
 
 
+def _iter_csv(header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for i, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if i % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _content_disposition(filename: str) -> str:
+    """An attachment header with an ASCII fallback name and the original as ``filename*``."""
+
+    ascii_name = _UNSAFE_FILENAME_CHARS.sub("", filename).strip() or "results"
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def _stream_export_rows(result_id: int, filters: ResultFilters) -> Iterator[tuple]:
+    # The request-scoped session is closed before a streaming body is sent,
+    # so the export owns its own session for the lifetime of the stream.
+    db = SessionLocal()
+    try:
+        yield from iter_export_rows(db, result_id, filters)
+    finally:
+        db.close()
+
+
+@router.get("/{result_id}/export")
+async def export_result(
+    result_id: int,
+    format: Literal["csv", "xlsx"] = "csv",
+    filters: ResultFilters = Depends(result_filters),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Stream a saved result's matches as CSV or XLSX, one row per match."""
+    result = (
+        db.query(ParseResult.id, ParseResult.filename)
+        .filter(ParseResult.id == result_id, ParseResult.user_id == current_user.id)
+        .first()
+    )
+
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Parse result not found",
+        )
+
+    stem = os.path.splitext(result.filename)[0] or "results"
+    rows = _stream_export_rows(result_id, filters)
+    if format == "xlsx":
+        body = iter_xlsx(EXPORT_COLUMNS, rows, sheet_name=stem)
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    else:
+        body = _iter_csv(EXPORT_COLUMNS, rows)
+        media_type = "text/csv; charset=utf-8"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": _content_disposition(f"{stem}.{format}")},
+    )
+
+
+@router.get("/{result_id}/pages/{page}/image")
+def get_page_image(
+    result_id: int,
+    page: int,
+    dpi: int = Query(page_renderer.DEFAULT_DPI, ge=page_renderer.MIN_DPI, le=page_renderer.MAX_DPI),
+    format: Literal["png", "webp"] = "png",
+    highlight: bool = True,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Render one page of the result's source PDF, with its matches highlighted."""
+    result = (
+        db.query(ParseResult.id, ParseResult.document_hash)
+        .filter(ParseResult.id == result_id, ParseResult.user_id == current_user.id)
+        .first()
+    )
+
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Parse result not found",
+        )
+
+    pdf_path = document_store.open_document(result.document_hash)
+    if pdf_path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Source document is not stored for this result",
+        )
+
+    if format == "webp" and not page_renderer.webp_supported():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="WebP rendering requires Pillow; request format=png",
+        )
+
+    highlights: List[page_renderer.Highlight] = []
+    matched_text = None
+    if highlight:
+        highlights = [
+            _highlight(dict(zip(EXPORT_COLUMNS, row)))
+            for row in iter_export_rows(db, result_id, ResultFilters(page=page))
+        ]
+        highlights = [h for h in highlights if h is not None]
+        if highlights:
+            matched_text = search_index.page_text(db, result_id, page)
+
+    try:
+        image, cache_hit = page_renderer.get_page_image(
+            result.document_hash, pdf_path, page, dpi, format, highlights, matched_text
+        )
+    except page_renderer.PageOutOfRange:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Page not found",
+        )
+
+    return Response(
+        content=image,
+        media_type=page_renderer.IMAGE_MEDIA_TYPES[format],
+        headers={
+            "Cache-Control": "private, max-age=86400",
+            "X-Render-Cache": "hit" if cache_hit else "miss",
+        },
+    )
+
+
+def _highlight(row: dict) -> Optional[page_renderer.Highlight]:
+    """Where to mark one stored match; its context splits around the snippet."""
+
+    start, end, snippet = row["start"], row["end"], row["snippet"]
+    if start is None or end is None or not snippet:
+        return None
+    context = row["context_window"] or ""
+    before = context[: min(SNIPPET_WINDOW, start)]
+    return page_renderer.Highlight(start, end, snippet, before, context[len(before) + len(snippet) :])
+
+
 @router.delete("/{result_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_result(
     result_id: int,
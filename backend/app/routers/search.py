@@ -0,0 +1,30 @@
+"""Full-text search across a user's saved documents."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.db_models import User
+from app.models.schemas import SearchResponse
+from app.services import search_index
+from app.utils.auth import get_current_user
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=SearchResponse)
+def search(
+    q: str = Query(..., min_length=1, description='Words and/or "quoted phrases", all required'),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Search the page text of the current user's saved results."""
+    if not search_index.is_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Full-text search requires the SQLite backend",
+        )
+
+    hits = search_index.search(db, current_user.id, q, limit)
+    return SearchResponse(query=q, hits=hits)
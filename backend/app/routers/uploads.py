@@ -0,0 +1,203 @@
+"""Resumable chunked uploads that finish by parsing the assembled PDF.
+
+    POST   /uploads                        create a session -> UploadStatus
+    PUT    /uploads/{id}/chunks/{index}    raw chunk body + X-Chunk-SHA256
+    GET    /uploads/{id}                   which byte ranges have arrived
+    POST   /uploads/{id}/complete?save=    parse; same response as /parse
+                                           (409 while another complete runs)
+    DELETE /uploads/{id}                   abandon the upload
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
+
+from app.database import get_db
+from app.models.db_models import UploadSession, User
+from app.models.schemas import ParseResponse, UploadCreate, UploadStatus
+from app.routers.parse import (
+    admission_error,
+    build_parse_response,
+    cancellable_parse,
+    check_profile_allowed,
+    run_parse,
+)
+from app.services import document_store, uploads
+from app.services.admission import AdmissionRejected, parse_admission
+from app.services.parse_jobs import JOB_ID_PATTERN
+from app.utils.auth import get_current_user
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+
+def _status(upload: UploadSession) -> UploadStatus:
+    ranges = uploads.received_ranges(upload)
+    return UploadStatus(
+        upload_id=upload.id,
+        filename=upload.filename,
+        size=upload.total_size,
+        chunk_size=upload.chunk_size,
+        total_chunks=uploads.num_chunks(upload),
+        received_bytes=sum(end - start for start, end in ranges),
+        received_ranges=ranges,
+        missing_chunks=uploads.missing_chunks(upload),
+        expires_at=upload.expires_at,
+    )
+
+
+def _get_upload(db: Session, upload_id: str, current_user: User) -> UploadSession:
+    upload = uploads.get_session(db, upload_id, current_user.id)
+    if upload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    return upload
+
+
+@router.post("", response_model=UploadStatus, status_code=status.HTTP_201_CREATED)
+def create_upload(
+    body: UploadCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Start a resumable upload of a PDF of known size."""
+    if not body.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="File must be a PDF")
+    try:
+        upload = uploads.create_session(
+            db, current_user.id, body.filename, body.size, body.chunk_size, body.sha256
+        )
+    except uploads.UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _status(upload)
+
+
+@router.get("/{upload_id}", response_model=UploadStatus)
+def get_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Report which chunks have been received, so a client can resume."""
+    return _status(_get_upload(db, upload_id, current_user))
+
+
+@router.put("/{upload_id}/chunks/{index}", response_model=UploadStatus)
+async def put_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    x_chunk_sha256: str = Header(..., description="Hex SHA-256 of the chunk body"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Store chunk ``index``; re-sending a chunk replaces it."""
+    upload = _get_upload(db, upload_id, current_user)
+    try:
+        with uploads.chunk_writer(db, upload):
+            try:
+                await uploads.write_chunk(upload, index, request.stream(), x_chunk_sha256)
+            except (uploads.UploadError, ClientDisconnect) as e:
+                # The chunk's bytes on disk are unreliable now, even if it had arrived before.
+                uploads.record_chunk(db, upload, index, None)
+                if isinstance(e, ClientDisconnect):
+                    raise
+                code = 422 if isinstance(e, uploads.ChecksumMismatch) else 400
+                raise HTTPException(status_code=code, detail=str(e))
+            uploads.record_chunk(db, upload, index, x_chunk_sha256)
+    except uploads.CompletionInProgress as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return _status(upload)
+
+
+@router.post("/{upload_id}/complete", response_model=ParseResponse)
+async def complete_upload(
+    upload_id: str,
+    request: Request,
+    save: bool = False,
+    job_id: Optional[str] = Query(None, pattern=JOB_ID_PATTERN, description="Client-chosen id for cancelling"),
+    profile: bool = Query(False, description="Admins only: profile this parse (see GET /admin/profiles)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Parse the assembled file (optionally saving it) and end the session."""
+    check_profile_allowed(profile, current_user)
+    upload = _get_upload(db, upload_id, current_user)
+    if not uploads.claim_completion(db, upload):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload is already being completed or has a chunk still being written",
+        )
+    try:
+        response = await _complete(upload, request, save, job_id, profile, current_user, db)
+    except BaseException:
+        # A no-op once a saved result has discarded the session (see _finish_saved)
+        uploads.release_completion(db, upload_id)
+        raise
+    if not save:
+        uploads.discard(db, upload)
+    return response
+
+
+async def _complete(
+    upload: UploadSession,
+    request: Request,
+    save: bool,
+    job_id: Optional[str],
+    profile: bool,
+    current_user: User,
+    db: Session,
+):
+    try:
+        path, digest = await run_in_threadpool(uploads.assemble, upload, save)
+    except uploads.IncompleteUpload as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(e), "missing_chunks": e.missing},
+        )
+    except uploads.ChecksumMismatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    filename = upload.filename
+    try:
+        async with cancellable_parse(
+            request, current_user, filename, job_id
+        ) as job, parse_admission.admit(current_user.id, upload.total_size):
+            # Parsed straight from disk; the upload is never read into memory
+            outcome, profile_summary = await run_parse(path, save, job, profile)
+    except AdmissionRejected as e:
+        raise admission_error(e)
+
+    # The file moves into the document store only once its result is saved,
+    # so a failed save leaves the upload as it was for a retry.
+    return await build_parse_response(
+        db,
+        current_user,
+        filename,
+        outcome,
+        save,
+        digest if save else None,
+        profile_summary,
+        after_save=lambda: _finish_saved(db, upload, path, digest),
+    )
+
+
+def _finish_saved(db: Session, upload: UploadSession, path: str, digest: str) -> None:
+    # The result is committed, so the session must not be completable again
+    # (a retry would save a duplicate), even if adopting the file fails.
+    try:
+        document_store.adopt_document(path, digest)
+    finally:
+        uploads.discard(db, upload)
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Abandon an upload and delete what was received."""
+    uploads.discard(db, _get_upload(db, upload_id, current_user))
+    return None
@@ -0,0 +1,193 @@
+"""Admission control for the parse path.
+
+Every parse holds the uploaded bytes, an open PyMuPDF document and the full
+match list in memory, so the API admits parses against two budgets: the
+number of parses running at once (the CPU budget) and the total size of the
+uploads they hold (the memory budget).  Work that does not fit waits in a
+bounded queue; waiters are granted round-robin across users so one account
+uploading a whole project archive cannot starve everybody else.  When the
+queue is full, or a waiter times out, the caller gets
+:class:`AdmissionRejected` carrying a ``retry_after`` hint.
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+PARSE_MAX_ACTIVE = int(os.getenv("PARSE_MAX_ACTIVE", str(os.cpu_count() or 2)))
+PARSE_MAX_INFLIGHT_BYTES = int(os.getenv("PARSE_MAX_INFLIGHT_BYTES", str(512 * 1024 * 1024)))
+PARSE_MAX_QUEUE = int(os.getenv("PARSE_MAX_QUEUE", "32"))
+PARSE_MAX_QUEUED_PER_USER = int(os.getenv("PARSE_MAX_QUEUED_PER_USER", "4"))
+PARSE_QUEUE_TIMEOUT_SECONDS = float(os.getenv("PARSE_QUEUE_TIMEOUT_SECONDS", "30"))
+
+
+class AdmissionRejected(Exception):
+    """Raised when a parse cannot be admitted; ``retry_after`` is in seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Track in-flight parses and bytes against budgets, queueing the excess."""
+
+    def __init__(
+        self,
+        max_active: int = PARSE_MAX_ACTIVE,
+        max_bytes: int = PARSE_MAX_INFLIGHT_BYTES,
+        max_queue: int = PARSE_MAX_QUEUE,
+        max_queued_per_user: int = PARSE_MAX_QUEUED_PER_USER,
+        queue_timeout: float = PARSE_QUEUE_TIMEOUT_SECONDS,
+    ):
+        self.max_active = max(1, max_active)
+        self.max_bytes = max_bytes
+        self.max_queue = max_queue
+        self.max_queued_per_user = max_queued_per_user
+        self.queue_timeout = queue_timeout
+
+        self.active = 0
+        self.inflight_bytes = 0
+        # user_id -> FIFO of (future, nbytes); dict order is the round-robin order
+        self._waiters: "OrderedDict[int, Deque[Tuple[asyncio.Future, int]]]" = OrderedDict()
+        self._queued = 0
+
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self._wait_ms: Deque[float] = deque(maxlen=512)
+        self._service_s = 1.0  # EWMA of parse duration, for Retry-After
+
+    # -- budget bookkeeping -------------------------------------------------
+
+    def _fits(self, nbytes: int) -> bool:
+        if self.active >= self.max_active:
+            return False
+        # An upload bigger than the whole budget may still run on its own.
+        return self.active == 0 or self.inflight_bytes + nbytes <= self.max_bytes
+
+    def _reserve(self, nbytes: int) -> None:
+        self.active += 1
+        self.inflight_bytes += nbytes
+        self.admitted_total += 1
+
+    def _grant_waiters(self) -> None:
+        progressed = True
+        while progressed and self._waiters:
+            progressed = False
+            for user_id in list(self._waiters):
+                queue = self._waiters[user_id]
+                fut, nbytes = queue[0]
+                if not self._fits(nbytes):
+                    continue
+                queue.popleft()
+                self._queued -= 1
+                self._reserve(nbytes)
+                fut.set_result(True)
+                # Served users go to the back of the rotation.
+                del self._waiters[user_id]
+                if queue:
+                    self._waiters[user_id] = queue
+                progressed = True
+                break
+
+    def _discard(self, user_id: int, fut: asyncio.Future) -> None:
+        fut.cancel()
+        queue = self._waiters.get(user_id)
+        if queue is not None:
+            for entry in queue:
+                if entry[0] is fut:
+                    queue.remove(entry)
+                    self._queued -= 1
+                    break
+            if not queue:
+                del self._waiters[user_id]
+        # A large waiter leaving may unblock smaller ones behind it.
+        self._grant_waiters()
+
+    def _retry_after(self) -> int:
+        backlog = self._queued / self.max_active + 1
+        return max(1, int(round(backlog * self._service_s)))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected_total += 1
+        return AdmissionRejected(reason, self._retry_after())
+
+    # -- public API ---------------------------------------------------------
+
+    async def acquire(self, user_id: int, nbytes: int) -> None:
+        if not self._waiters and self._fits(nbytes):
+            self._reserve(nbytes)
+            self._wait_ms.append(0.0)
+            return
+
+        user_queue = self._waiters.get(user_id)
+        if self._queued >= self.max_queue:
+            raise self._reject("Parse queue is full")
+        if user_queue is not None and len(user_queue) >= self.max_queued_per_user:
+            raise self._reject("Too many queued parses for this user")
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user_id, deque()).append((fut, nbytes))
+        self._queued += 1
+        # Capacity may be free even though others are waiting (e.g. a large
+        # upload blocked on the byte budget); this request may fit in it now.
+        self._grant_waiters()
+        enqueued = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if fut.done() and not fut.cancelled():
+                # Granted in the same tick the timeout fired; keep the slot.
+                pass
+            else:
+                self._discard(user_id, fut)
+                raise self._reject("Timed out waiting for a parse slot")
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release(nbytes)
+            else:
+                self._discard(user_id, fut)
+            raise
+        self._wait_ms.append((time.monotonic() - enqueued) * 1000)
+
+    def release(self, nbytes: int, duration_s: Optional[float] = None) -> None:
+        self.active -= 1
+        self.inflight_bytes -= nbytes
+        if duration_s is not None:
+            self._service_s = 0.8 * self._service_s + 0.2 * duration_s
+        self._grant_waiters()
+
+    @contextlib.asynccontextmanager
+    async def admit(self, user_id: int, nbytes: int) -> AsyncIterator[None]:
+        """Hold a parse slot and ``nbytes`` of the memory budget for the block."""
+
+        await self.acquire(user_id, nbytes)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(nbytes, time.monotonic() - started)
+
+    def stats(self) -> Dict[str, object]:
+        waits = sorted(self._wait_ms)
+        return {
+            "active": self.active,
+            "max_active": self.max_active,
+            "inflight_bytes": self.inflight_bytes,
+            "max_inflight_bytes": self.max_bytes,
+            "queue_depth": self._queued,
+            "max_queue": self.max_queue,
+            "queued_users": len(self._waiters),
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "wait_ms_avg": round(sum(waits) / len(waits), 1) if waits else 0.0,
+            "wait_ms_p95": round(waits[max(0, int(len(waits) * 0.95) - 1)], 1) if waits else 0.0,
+            "wait_ms_max": round(waits[-1], 1) if waits else 0.0,
+        }
+
+
+parse_admission = AdmissionController()
@@ -0,0 +1,205 @@
+"""Per-result match breakdowns, computed once at save time.
+
+Every saved result gets rows in ``result_aggregates``: the match count and
+confidence sum for each key of a handful of dimensions:
+
+* ``keyword``: the keyword or regex that matched;
+* ``section``: the article of ``spec_section`` (``1.05`` for ``1.05-A-1``);
+* ``division``: the MasterFormat division from ``section_hint``
+  (``03`` for ``SECTION 03 30 00``);
+* ``page_bucket``: pages in blocks of ``AGGREGATE_PAGE_BUCKET``, keyed by
+  the first page;
+* ``confidence``: a histogram of confidence in tenths (``0.8`` = 0.8-0.9);
+* ``total``: one row (key ``""``) for the whole result. It is always
+  written, even with no matches, and marks the result as aggregated.
+
+:class:`MatchAggregates` is fed by ``MatchCollector`` as matches arrive, so
+a spilled collection is never read back for this. Results saved before
+aggregation existed are backfilled from ``results_json`` by the maintenance
+task (``backfill_all``). A summary request backfills at most
+``AGGREGATE_BACKFILL_PER_REQUEST`` of the results it covers itself and
+reports the rest as pending, so one request never reparses a whole history.
+Summaries for one result or for all of a user's results are then plain
+``GROUP BY`` queries over these rows.
+"""
+
+import functools
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.db_models import ParseResult, ResultAggregate
+from app.services.pdf_parser import SECTION_LINE_PATTERN
+from app.services.result_store import EXPORT_COLUMNS, ResultFilters, iter_export_rows
+
+AGGREGATE_PAGE_BUCKET = int(os.getenv("AGGREGATE_PAGE_BUCKET", "25"))
+AGGREGATE_BACKFILL_PER_REQUEST = int(os.getenv("AGGREGATE_BACKFILL_PER_REQUEST", "5"))
+CONFIDENCE_BINS = 10
+UNASSIGNED = "unassigned"
+
+# Dimension -> field of the summary it is reported under
+DIMENSIONS = {
+    "keyword": "by_keyword",
+    "section": "by_section",
+    "division": "by_division",
+    "page_bucket": "by_page_bucket",
+    "confidence": "confidence_histogram",
+}
+TOTAL = "total"
+
+_KEYWORD, _PAGE, _SPEC_SECTION, _SECTION_HINT, _CONFIDENCE = (
+    EXPORT_COLUMNS.index(name) for name in ("keyword", "page", "spec_section", "section_hint", "confidence")
+)
+
+
+@functools.lru_cache(maxsize=1024)  # a document has few distinct section hints
+def division_of(section_hint: Optional[str]) -> str:
+    match = SECTION_LINE_PATTERN.search(section_hint or "")
+    return match.group(0)[:2] if match else UNASSIGNED
+
+
+def article_of(spec_section: Optional[str]) -> str:
+    return spec_section.split("-", 1)[0] if spec_section else UNASSIGNED
+
+
+def page_bucket(page: int) -> str:
+    return str((page - 1) // AGGREGATE_PAGE_BUCKET * AGGREGATE_PAGE_BUCKET + 1)
+
+
+def confidence_bin(confidence: float) -> str:
+    # round() first so e.g. 0.3 lands in the 0.3 bin despite float error
+    return f"{min(int(round(confidence * CONFIDENCE_BINS, 9)), CONFIDENCE_BINS - 1) / CONFIDENCE_BINS:.1f}"
+
+
+class MatchAggregates:
+    """Running counts for one parse; ``add`` is called once per match."""
+
+    def __init__(self):
+        # (dimension, key) -> [matches, confidence sum]
+        self.counts: Dict[Tuple[str, str], List[float]] = {}
+
+    def add(
+        self,
+        keyword: str,
+        page: int,
+        section_hint: Optional[str],
+        spec_section: Optional[str],
+        confidence: float,
+    ) -> None:
+        confidence = confidence or 0.0
+        for key in (
+            ("keyword", keyword),
+            ("section", article_of(spec_section)),
+            ("division", division_of(section_hint)),
+            ("page_bucket", page_bucket(page)),
+            ("confidence", confidence_bin(confidence)),
+            (TOTAL, ""),
+        ):
+            entry = self.counts.get(key)
+            if entry is None:
+                self.counts[key] = [1, confidence]
+            else:
+                entry[0] += 1
+                entry[1] += confidence
+
+    def rows(self, result_id: int) -> List[ResultAggregate]:
+        counts = dict(self.counts)
+        counts.setdefault((TOTAL, ""), [0, 0.0])
+        return [
+            ResultAggregate(
+                result_id=result_id, dimension=dimension, key=key, matches=int(n), confidence_sum=total
+            )
+            for (dimension, key), (n, total) in counts.items()
+        ]
+
+
+def backfill(db: Session, result_id: int) -> None:
+    """Aggregate a result saved before aggregation existed; commits ``db``."""
+
+    aggregates = MatchAggregates()
+    for row in iter_export_rows(db, result_id, ResultFilters()):
+        aggregates.add(row[_KEYWORD], row[_PAGE], row[_SECTION_HINT], row[_SPEC_SECTION], row[_CONFIDENCE])
+    db.add_all(aggregates.rows(result_id))
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request backfilled the same result first.
+        db.rollback()
+
+
+def _unaggregated(db: Session):
+    aggregated = db.query(ResultAggregate.result_id).filter(ResultAggregate.dimension == TOTAL)
+    return db.query(ParseResult.id).filter(ParseResult.id.not_in(aggregated))
+
+
+def ensure_aggregated(
+    db: Session,
+    user_id: int,
+    result_ids: Optional[Iterable[int]] = None,
+    limit: int = AGGREGATE_BACKFILL_PER_REQUEST,
+) -> int:
+    """Backfill up to ``limit`` of the user's results (or just ``result_ids``) that have no aggregates.
+
+    Newest first; returns how many are still missing afterwards.
+    """
+
+    query = _unaggregated(db).filter(ParseResult.user_id == user_id)
+    if result_ids is not None:
+        query = query.filter(ParseResult.id.in_(list(result_ids)))
+    missing = [row.id for row in query.order_by(ParseResult.id.desc())]
+    for result_id in missing[:limit]:
+        backfill(db, result_id)
+    return max(0, len(missing) - limit)
+
+
+def backfill_all(db: Session) -> int:
+    """Backfill every result without aggregates, for any user; returns how many."""
+
+    missing = [row.id for row in _unaggregated(db).order_by(ParseResult.id.desc())]
+    for result_id in missing:
+        backfill(db, result_id)
+    return len(missing)
+
+
+def _sort_key(dimension: str, key: str) -> Any:
+    if dimension == "page_bucket":
+        return int(key)
+    if dimension == "section":
+        # "1.05" < "1.10" < "10.01"; "unassigned" last
+        parts = key.split(".")
+        return (0, [int(p) for p in parts]) if all(p.isdigit() for p in parts) else (1, [])
+    return key
+
+
+def summarize(db: Session, result_ids_query) -> Dict[str, Any]:
+    """Sum the aggregates of the results in ``result_ids_query`` (ids, or a subquery selecting them)."""
+
+    rows = (
+        db.query(
+            ResultAggregate.dimension,
+            ResultAggregate.key,
+            func.sum(ResultAggregate.matches),
+            func.sum(ResultAggregate.confidence_sum),
+        )
+        .filter(ResultAggregate.result_id.in_(result_ids_query))
+        .group_by(ResultAggregate.dimension, ResultAggregate.key)
+        .all()
+    )
+    summary: Dict[str, Any] = {"total_matches": 0, "mean_confidence": None}
+    summary.update((field, []) for field in DIMENSIONS.values())
+    for dimension, key, matches, confidence_sum in rows:
+        mean = round(confidence_sum / matches, 4) if matches else None
+        if dimension == TOTAL:
+            summary["total_matches"] = matches
+            summary["mean_confidence"] = mean
+        elif dimension in DIMENSIONS:
+            summary[DIMENSIONS[dimension]].append({"key": key, "matches": matches, "mean_confidence": mean})
+    for dimension, field in DIMENSIONS.items():
+        if dimension == "keyword":
+            summary[field].sort(key=lambda bucket: (-bucket["matches"], bucket["key"]))
+        else:
+            summary[field].sort(key=lambda bucket: _sort_key(dimension, bucket["key"]))
+    return summary
@@ -0,0 +1,139 @@
+"""Document-level detection of repeated page furniture.
+
+Spec books print the same project header, footer and "END OF SECTION" lines
+on page after page.  Matching them on every page is wasted work, and a
+keyword inside a header would be reported once per page.  Before matching,
+``parse_document`` runs a pre-pass over all page texts:
+
+* ``BoilerplateFilter`` counts the lines near the top and bottom of each page
+  (digits masked, so "Page 12 of 300" and "Page 13 of 300" count as one
+  line). A line is boilerplate if it sits at a page edge on at least
+  ``BOILERPLATE_MIN_FRACTION`` of the pages (and at least
+  ``BOILERPLATE_MIN_PAGES`` of them), and sits mid-page less often than at
+  an edge. Boilerplate lines are stripped only where they occur at an
+  edge, never from the body of a page, so a requirement sentence that
+  happens to end a few pages is kept everywhere else. Lines that
+  ``SectionResolver`` reads as CSI hierarchy markers ("1.05 SUBMITTALS",
+  "A. ...") are never stripped.
+* ``page_digest`` hashes the stripped text, so pages that come out
+  byte-identical (repeated schedules, "intentionally left blank" sheets)
+  are normalized and matched only once.
+
+Match ``positions`` index the normalized, stripped page text that was
+matched (as they always indexed normalized text), not the raw PDF text.
+"""
+
+import hashlib
+import math
+import os
+import re
+from collections import Counter
+from typing import Iterable, List, Set, Tuple
+
+from app.utils.spec_section import SectionResolver
+
+# A line must sit at a page edge on this share of the pages, and on at least
+# BOILERPLATE_MIN_PAGES of them, to count as boilerplate; 0 pages disables stripping.
+BOILERPLATE_MIN_FRACTION = float(os.getenv("BOILERPLATE_MIN_FRACTION", "0.5"))
+BOILERPLATE_MIN_PAGES = int(os.getenv("BOILERPLATE_MIN_PAGES", "3"))
+# How many non-blank lines at each end of a page are header/footer candidates.
+BOILERPLATE_EDGE_LINES = int(os.getenv("BOILERPLATE_EDGE_LINES", "3"))
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+_HIERARCHY_RES = (
+    SectionResolver.ARTICLE_RE,
+    SectionResolver.PARAGRAPH_RE,
+    SectionResolver.SUBPARAGRAPH_RE,
+    SectionResolver.ITEM_RE,
+)
+
+
+def line_key(line: str) -> str:
+    """Comparison key for a line: whitespace collapsed, digits masked, casefolded."""
+
+    return _DIGITS.sub("#", _SPACES.sub(" ", line).strip()).casefold()
+
+
+def page_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _is_hierarchy_marker(line: str) -> bool:
+    return any(rx.match(line) for rx in _HIERARCHY_RES)
+
+
+def _edge_count(num_lines: int, edge_lines: int) -> int:
+    """Lines at each end of a page that count as header/footer positions.
+
+    Capped at a third of the page, so a short page always keeps a body.
+    """
+
+    return min(edge_lines, num_lines // 3)
+
+
+def edge_line_indexes(lines: List[str], edge_lines: int = BOILERPLATE_EDGE_LINES) -> List[int]:
+    """Indexes into ``lines`` (from ``splitlines``) that :meth:`BoilerplateFilter.strip` may drop."""
+
+    non_blank = [i for i, line in enumerate(lines) if line.strip()]
+    n = _edge_count(len(non_blank), edge_lines)
+    return sorted(set(non_blank[:n] + non_blank[-n:])) if n else []
+
+
+def _split_edges(lines: List[str], edge_lines: int) -> Tuple[List[str], List[str]]:
+    """``(edge lines, body lines)`` of a page's non-blank lines."""
+
+    n = _edge_count(len(lines), edge_lines)
+    if not n:
+        return [], lines
+    return lines[:n] + lines[-n:], lines[n:-n]
+
+
+class BoilerplateFilter:
+    """Lines repeated across a document's page edges, and a way to drop them."""
+
+    def __init__(
+        self,
+        page_texts: Iterable[str],
+        min_pages: int = BOILERPLATE_MIN_PAGES,
+        edge_lines: int = BOILERPLATE_EDGE_LINES,
+        min_fraction: float = BOILERPLATE_MIN_FRACTION,
+    ):
+        self.keys: Set[str] = set()
+        self.edge_lines = edge_lines
+        if min_pages <= 0 or edge_lines <= 0:
+            return
+
+        at_edge = Counter()
+        in_body = Counter()
+        num_pages = 0
+        for text in page_texts:
+            num_pages += 1
+            edges, body = _split_edges([ln.strip() for ln in text.splitlines() if ln.strip()], edge_lines)
+            at_edge.update({line_key(ln) for ln in edges if not _is_hierarchy_marker(ln)})
+            in_body.update({line_key(ln) for ln in body})
+        threshold = max(min_pages, math.ceil(min_fraction * num_pages))
+        self.keys = {
+            key for key, pages in at_edge.items() if pages >= threshold and in_body[key] < pages
+        }
+
+    def strip(self, text: str) -> str:
+        """Return ``text`` without the boilerplate lines at its edges (other lines untouched)."""
+
+        if not self.keys:
+            return text
+        lines = text.splitlines(keepends=True)
+        edge_positions = set(edge_line_indexes(lines, self.edge_lines))
+        if not edge_positions:
+            return text
+        kept: List[str] = []
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if (
+                i in edge_positions
+                and line_key(stripped) in self.keys
+                and not _is_hierarchy_marker(stripped)
+            ):
+                continue
+            kept.append(line)
+        return "".join(kept)
@@ -0,0 +1,189 @@
+"""Content-addressed storage for the PDFs behind saved results.
+
+A saved ``ParseResult`` records the SHA-256 of its upload in
+``document_hash`` and the bytes live once on disk at
+``DOCUMENT_STORE_DIR/<hash>.pdf``, however many results share them.  A file
+is removed after the commit that deletes the last result referencing it.
+
+A request saving the same document may have stored (or found) the file but
+not yet committed its result, so the deleter cannot see that reference.
+Storing therefore refreshes the file's mtime, and the deleter leaves files
+touched within ``DOCUMENT_DELETE_GRACE_SECONDS``; storing and deleting are
+serialized by an ``flock`` on ``DOCUMENT_STORE_DIR/.lock`` so the two cannot
+interleave, across API workers too. Files left behind that way, or by a save
+that failed after storing, are removed by :func:`sweep_unreferenced` from
+the maintenance task once they are past the grace period.
+"""
+
+import contextlib
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Iterator, List, Optional
+
+try:  # POSIX only; elsewhere storing and deleting are only serialized within a process
+    import fcntl
+except ImportError:  # pragma: no cover - depends on the platform
+    fcntl = None
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.db_models import ParseResult
+
+DOCUMENT_STORE_DIR = os.getenv("DOCUMENT_STORE_DIR", "./data/documents")
+# Longer than a save takes between storing the file and committing its result
+DOCUMENT_DELETE_GRACE_SECONDS = int(os.getenv("DOCUMENT_DELETE_GRACE_SECONDS", "600"))
+
+_PENDING_KEY = "document_store_pending_deletes"
+_SWEEP_BATCH = 500
+_thread_lock = threading.Lock()
+
+
+def document_path(document_hash: str) -> str:
+    return os.path.join(DOCUMENT_STORE_DIR, f"{document_hash}.pdf")
+
+
+@contextlib.contextmanager
+def _store_lock() -> Iterator[None]:
+    """Exclusive lock over storing and deleting documents, in this and other processes."""
+
+    os.makedirs(DOCUMENT_STORE_DIR, exist_ok=True)
+    with _thread_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(DOCUMENT_STORE_DIR, ".lock"), "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def save_document(data: bytes) -> str:
+    """Store ``data`` if it is not already present and return its hash."""
+
+    document_hash = hashlib.sha256(data).hexdigest()
+    path = document_path(document_hash)
+    # Written outside the lock; only the rename has to be serialized.
+    tmp = None
+    if not os.path.exists(path):
+        os.makedirs(DOCUMENT_STORE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=DOCUMENT_STORE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+    with _store_lock():
+        if tmp is not None:
+            os.replace(tmp, path)
+        else:
+            _touch_or_write(path, data)
+    return document_hash
+
+
+def _touch_or_write(path: str, data: bytes) -> None:
+    # Deleted between the existence check and taking the lock: write it again.
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        with open(path, "wb") as fh:
+            fh.write(data)
+
+
+def adopt_document(path: str, document_hash: str) -> str:
+    """Move a file already on disk into the store under ``document_hash``.
+
+    Used for assembled uploads, which are too large to pass through
+    :func:`save_document` in memory.  The caller supplies the SHA-256 it
+    computed while verifying the file.
+    """
+
+    target = document_path(document_hash)
+    with _store_lock():
+        if os.path.exists(target):
+            os.utime(target)
+            os.remove(path)
+        else:
+            # os.replace when both live on one filesystem, a copy otherwise
+            shutil.move(path, target)
+    return document_hash
+
+
+def open_document(document_hash: Optional[str]) -> Optional[str]:
+    """Return the on-disk path for ``document_hash`` if the file still exists."""
+
+    if not document_hash:
+        return None
+    path = document_path(document_hash)
+    return path if os.path.exists(path) else None
+
+
+@event.listens_for(ParseResult, "after_delete")
+def _queue_document_delete(mapper, connection, target):
+    if target.document_hash:
+        session = Session.object_session(target)
+        if session is not None:
+            session.info.setdefault(_PENDING_KEY, set()).add(target.document_hash)
+
+
+def _remove_if_stale(document_hash: str, now: float) -> bool:
+    """Remove the file unless it was stored within the grace period; call with the lock held."""
+
+    path = document_path(document_hash)
+    try:
+        if os.path.getmtime(path) > now - DOCUMENT_DELETE_GRACE_SECONDS:
+            return False
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _referenced(check: Session, hashes: List[str]) -> set:
+    rows = check.query(ParseResult.document_hash).filter(ParseResult.document_hash.in_(hashes)).distinct()
+    return {row.document_hash for row in rows}
+
+
+@event.listens_for(Session, "after_commit")
+def _delete_unreferenced_documents(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    # A fresh session: the committing one cannot issue SQL inside this hook.
+    check = Session(bind=session.get_bind())
+    try:
+        with _store_lock():
+            unreferenced = set(pending) - _referenced(check, list(pending))
+            now = time.time()
+            for document_hash in unreferenced:
+                _remove_if_stale(document_hash, now)
+    finally:
+        check.close()
+
+
+def sweep_unreferenced(db: Session) -> int:
+    """Remove stored files no result references, past the grace period; returns how many.
+
+    Commits ``db`` after each batch, so every batch reads fresh references.
+    """
+
+    if not os.path.isdir(DOCUMENT_STORE_DIR):
+        return 0
+    stored = [name[: -len(".pdf")] for name in os.listdir(DOCUMENT_STORE_DIR) if name.endswith(".pdf")]
+    removed = 0
+    for start in range(0, len(stored), _SWEEP_BATCH):
+        batch = stored[start : start + _SWEEP_BATCH]
+        with _store_lock():
+            now = time.time()
+            for document_hash in set(batch) - _referenced(db, batch):
+                removed += _remove_if_stale(document_hash, now)
+        db.commit()
+    return removed
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_pending_deletes(session):
+    session.info.pop(_PENDING_KEY, None)
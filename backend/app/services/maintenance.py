@@ -0,0 +1,281 @@
+"""Result retention and SQLite upkeep, run periodically in the background.
+
+Each run:
+
+1. **Retention**: deletes saved results older than the owner's maximum age,
+   or beyond the owner's newest N. The server defaults come from
+   ``RESULT_RETENTION_DAYS`` / ``RESULT_RETENTION_MAX_RESULTS``; a user's own
+   settings (``PUT /auth/me/retention``) can only make them stricter. Results
+   are deleted through the ORM, so the document store and full-text index
+   clean up after them as usual. Stored PDFs that no result references
+   any more (see ``app.services.document_store``) are swept as well.
+   Results saved before match aggregates existed are aggregated
+   (``app.services.aggregates``).
+2. **Compaction** (SQLite only): ``PRAGMA incremental_vacuum`` returns the
+   free pages left by deleted rows to the filesystem. This needs
+   ``auto_vacuum=INCREMENTAL``, which ``init_db`` sets on new databases.
+   A database created before that needs a one-off ``VACUUM`` to convert,
+   which rewrites the whole file under an exclusive lock, so it only happens
+   on request: ``python -m app.cli maintenance --convert-auto-vacuum``.
+   Until then the periodic runs skip ``incremental_vacuum``. The FTS index
+   is merged (``optimize``), and ``ANALYZE`` refreshes the planner's
+   statistics.
+
+Runs are serialized across processes with an ``flock`` on
+``MAINTENANCE_LOCK_FILE``: with several API workers, the one that gets the
+lock does the pass and the others skip it. The latest report and running
+totals of the worker that ran are exposed through ``/metrics``.
+``python -m app.cli maintenance`` performs a single run, e.g. from cron.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+try:  # POSIX only; elsewhere runs are only serialized within a process
+    import fcntl
+except ImportError:  # pragma: no cover - depends on the platform
+    fcntl = None
+
+from sqlalchemy import func, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, load_only
+
+from app.database import SessionLocal, engine
+from app.models.db_models import ParseResult, User
+from app.services import aggregates, document_store, search_index
+
+logger = logging.getLogger(__name__)
+
+# 0 means "keep forever" / "no limit"
+RESULT_RETENTION_DAYS = int(os.getenv("RESULT_RETENTION_DAYS", "0"))
+RESULT_RETENTION_MAX_RESULTS = int(os.getenv("RESULT_RETENTION_MAX_RESULTS", "0"))
+# 0 disables the background task (runs can still be started from the CLI)
+MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "3600"))
+MAINTENANCE_STARTUP_DELAY_SECONDS = int(os.getenv("MAINTENANCE_STARTUP_DELAY_SECONDS", "60"))
+# Free pages returned per run; 0 returns all of them
+MAINTENANCE_VACUUM_PAGES = int(os.getenv("MAINTENANCE_VACUUM_PAGES", "0"))
+MAINTENANCE_LOCK_FILE = os.getenv("MAINTENANCE_LOCK_FILE", "./data/maintenance.lock")
+
+_DELETE_BATCH = 200
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+def effective_limit(user_value: Optional[int], server_value: int) -> int:
+    """Combine a user's setting with the server's; 0 means unlimited."""
+
+    if not user_value:
+        return server_value
+    if not server_value:
+        return user_value
+    return min(user_value, server_value)
+
+
+def _expired_result_ids(db: Session) -> List[int]:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    # user_id -> (oldest created_at kept or None, max results or 0)
+    limits = {}
+    for user_id, user_days, user_max in db.query(User.id, User.retention_days, User.retention_max_results):
+        max_age_days = effective_limit(user_days, RESULT_RETENTION_DAYS)
+        max_results = effective_limit(user_max, RESULT_RETENTION_MAX_RESULTS)
+        if max_age_days or max_results:
+            limits[user_id] = (now - timedelta(days=max_age_days) if max_age_days else None, max_results)
+    if not limits:
+        return []
+
+    # One pass over the window query for all users, rather than one per user
+    rank = (
+        func.row_number()
+        .over(partition_by=ParseResult.user_id, order_by=(ParseResult.created_at.desc(), ParseResult.id.desc()))
+        .label("rank")
+    )
+    ranked = db.query(ParseResult.id, ParseResult.user_id, ParseResult.created_at, rank).subquery()
+    expired: List[int] = []
+    for result_id, user_id, created_at, position in db.query(ranked).yield_per(1000):
+        limit = limits.get(user_id)
+        if limit is None:
+            continue
+        cutoff, max_results = limit
+        if (cutoff is not None and created_at < cutoff) or (max_results and position > max_results):
+            expired.append(result_id)
+    return expired
+
+
+def apply_retention(db: Session) -> int:
+    """Delete results past their owner's retention limits; returns how many."""
+
+    expired = _expired_result_ids(db)
+    for start in range(0, len(expired), _DELETE_BATCH):
+        batch = expired[start : start + _DELETE_BATCH]
+        # Only what the delete listeners need; results_json can be megabytes.
+        results = (
+            db.query(ParseResult)
+            .options(load_only(ParseResult.id, ParseResult.user_id, ParseResult.document_hash))
+            .filter(ParseResult.id.in_(batch))
+            .all()
+        )
+        for result in results:
+            db.delete(result)
+        # Commit per batch so writers are never locked out for long.
+        db.commit()
+    return len(expired)
+
+
+def _pragma(conn, name: str) -> int:
+    return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def database_size(bind: Engine = engine) -> Dict[str, int]:
+    if bind.dialect.name != "sqlite":
+        return {}
+    with bind.connect() as conn:
+        page_size = _pragma(conn, "page_size")
+        return {
+            "bytes": _pragma(conn, "page_count") * page_size,
+            "free_bytes": _pragma(conn, "freelist_count") * page_size,
+        }
+
+
+def compact(bind: Engine = engine, convert_auto_vacuum: bool = False) -> Dict:
+    """Return free pages to the filesystem and refresh statistics (SQLite only).
+
+    ``convert_auto_vacuum`` switches a database without incremental
+    auto-vacuum over with a full ``VACUUM``; otherwise such a database is
+    only optimized and analyzed.
+    """
+
+    if bind.dialect.name != "sqlite":
+        return {"reclaimed_bytes": 0}
+    # VACUUM and incremental_vacuum cannot run inside a transaction.
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        before = _pragma(conn, "page_count") * _pragma(conn, "page_size")
+        converted = False
+        incremental = _pragma(conn, "auto_vacuum") == _AUTO_VACUUM_INCREMENTAL
+        if not incremental and convert_auto_vacuum:
+            logger.info("Switching the database to auto_vacuum=INCREMENTAL (one-off VACUUM)")
+            conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.exec_driver_sql("VACUUM")
+            converted = incremental = True
+        elif incremental:
+            pages = f"({MAINTENANCE_VACUUM_PAGES})" if MAINTENANCE_VACUUM_PAGES else ""
+            # incremental_vacuum frees one page per step and execute() steps only
+            # once; executescript steps each statement to completion.
+            conn.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum{pages};")
+        if search_index.is_available():
+            conn.execute(
+                text(f"INSERT INTO {search_index.FTS_TABLE}({search_index.FTS_TABLE}) VALUES ('optimize')")
+            )
+        conn.exec_driver_sql("ANALYZE")
+        after = _pragma(conn, "page_count") * _pragma(conn, "page_size")
+    return {
+        "reclaimed_bytes": max(0, before - after),
+        "incremental_vacuum": incremental,
+        "converted_auto_vacuum": converted,
+    }
+
+
+class MaintenanceStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.failures = 0
+        self.results_deleted = 0
+        self.reclaimed_bytes = 0
+        self.last_run: Optional[Dict] = None
+
+    def record(self, report: Dict) -> None:
+        with self._lock:
+            self.runs += 1
+            self.results_deleted += report["results_deleted"]
+            self.reclaimed_bytes += report["reclaimed_bytes"]
+            self.last_run = report
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            snapshot = {
+                "runs": self.runs,
+                "failures": self.failures,
+                "results_deleted": self.results_deleted,
+                "reclaimed_bytes": self.reclaimed_bytes,
+                "last_run": self.last_run,
+            }
+        snapshot["database"] = database_size()
+        return snapshot
+
+
+maintenance_stats = MaintenanceStats()
+_run_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _process_lock(path: str = MAINTENANCE_LOCK_FILE) -> Iterator[bool]:
+    """Non-blocking exclusive ``flock`` on ``path``; yields whether it was acquired."""
+
+    if fcntl is None:
+        yield True
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as fh:
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def run_maintenance(convert_auto_vacuum: bool = False) -> Optional[Dict]:
+    """One retention + compaction pass; returns its report, or None if another process is running one."""
+
+    with _run_lock, _process_lock() as acquired:
+        if not acquired:
+            logger.info("Skipping database maintenance; another process is running it")
+            return None
+        t0 = time.time()
+        db = SessionLocal()
+        try:
+            deleted = apply_retention(db)
+            documents_deleted = document_store.sweep_unreferenced(db)
+            aggregated = aggregates.backfill_all(db)
+        finally:
+            db.close()
+        compacted = compact(convert_auto_vacuum=convert_auto_vacuum)
+        report = {
+            "finished_at": time.time(),
+            "duration_ms": int((time.time() - t0) * 1000),
+            "results_deleted": deleted,
+            "documents_deleted": documents_deleted,
+            "results_aggregated": aggregated,
+            **compacted,
+            **{f"database_{k}": v for k, v in database_size().items()},
+        }
+        maintenance_stats.record(report)
+        return report
+
+
+async def run_periodically(
+    interval: int = MAINTENANCE_INTERVAL_SECONDS,
+    startup_delay: int = MAINTENANCE_STARTUP_DELAY_SECONDS,
+) -> None:
+    """Background task started by the app; runs maintenance every ``interval`` seconds."""
+
+    await asyncio.sleep(startup_delay)
+    while True:
+        try:
+            await asyncio.to_thread(run_maintenance)
+        except Exception:  # keep the schedule alive; the next run retries
+            maintenance_stats.record_failure()
+            logger.exception("Database maintenance failed")
+        await asyncio.sleep(interval)
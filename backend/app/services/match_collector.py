@@ -0,0 +1,146 @@
+"""Bounded-memory collection of parse matches.
+
+Each match carries roughly 1.6 KB of context, so a broad keyword set over a
+1,000-page book can build a match list of hundreds of MB.  ``MatchCollector``
+keeps matches in memory only up to ``MATCH_SPILL_THRESHOLD``; past that it
+writes everything to a temporary NDJSON file and appends new matches there.
+The JSON array is then produced by streaming the file (``iter_json``), both
+for the HTTP response and for the saved result, so memory stays flat however
+many matches a document has.
+"""
+
+import json
+import os
+import tempfile
+from typing import IO, Iterator, List, Optional, Set
+
+from app.models.records import MatchRecord, serialize_records
+from app.services.aggregates import MatchAggregates
+
+MATCH_SPILL_THRESHOLD = int(os.getenv("MATCH_SPILL_THRESHOLD", "5000"))
+MATCH_SPILL_DIR = os.getenv("MATCH_SPILL_DIR") or None
+
+_CHUNK_SIZE = 1 << 20
+
+
+class MatchCollector:
+    """Append-only match list that spills to disk past a threshold."""
+
+    def __init__(
+        self,
+        spill_threshold: int = MATCH_SPILL_THRESHOLD,
+        spill_dir: Optional[str] = MATCH_SPILL_DIR,
+    ):
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        self._records: List[MatchRecord] = []
+        self._pages: Set[int] = set()
+        self._count = 0
+        # Breakdowns stored with a saved result; kept here so spilling never re-reads them
+        self.aggregates = MatchAggregates()
+        self._spill_path: Optional[str] = None
+        self._spill: Optional[IO[str]] = None
+
+    # -- collection ---------------------------------------------------------
+
+    def append(self, record: MatchRecord) -> None:
+        self._count += 1
+        self._pages.add(record.page)
+        self.aggregates.add(
+            record.keyword, record.page, record.section_hint, record.spec_section, record.confidence
+        )
+        if self._spill is not None:
+            self._write(record)
+            return
+        self._records.append(record)
+        if len(self._records) > self.spill_threshold:
+            self._start_spill()
+
+    def _start_spill(self) -> None:
+        fd, self._spill_path = tempfile.mkstemp(prefix="matches-", suffix=".ndjson", dir=self.spill_dir)
+        self._spill = os.fdopen(fd, "w", encoding="utf-8")
+        for record in self._records:
+            self._write(record)
+        self._records = []
+
+    def _write(self, record: MatchRecord) -> None:
+        # json.dumps escapes newlines, so one record is always one line.
+        self._spill.write(json.dumps(record.to_dict()))
+        self._spill.write("\n")
+
+    def _finish_writes(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    # -- summary ------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def matched_pages(self) -> int:
+        return len(self._pages)
+
+    @property
+    def spilled(self) -> bool:
+        return self._spill_path is not None
+
+    # -- output -------------------------------------------------------------
+
+    def to_json(self) -> str:
+        """Return the whole JSON array as one string (in-memory collections only)."""
+
+        if self.spilled:
+            return b"".join(self.iter_json()).decode("utf-8")
+        return serialize_records(self._records)
+
+    def json_size(self) -> int:
+        """Exact byte length of the JSON array that ``iter_json`` produces."""
+
+        if not self.spilled:
+            return len(self.to_json().encode("utf-8"))
+        self._finish_writes()
+        # "[" + lines with each "\n" turned into "," (the last one dropped) + "]"
+        return os.path.getsize(self._spill_path) + 1 if self._count else 2
+
+    def iter_json(self, chunk_size: int = _CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield the JSON array of all matches in bounded chunks."""
+
+        if not self.spilled:
+            yield self.to_json().encode("utf-8")
+            return
+        self._finish_writes()
+        yield b"["
+        with open(self._spill_path, "rb") as fh:
+            held = b""
+            while True:
+                chunk = fh.read(chunk_size)
+                if not chunk:
+                    break
+                data = (held + chunk).replace(b"\n", b",")
+                # Hold back the final byte: it is the trailing separator at EOF.
+                held = data[-1:]
+                yield data[:-1]
+        yield b"]"
+
+    # -- ownership ----------------------------------------------------------
+
+    def __getstate__(self):
+        # Pickling hands the spill file to another process (the bulk CLI's
+        # workers); the receiving side owns it from then on and must close it.
+        self._finish_writes()
+        state = self.__dict__.copy()
+        state["_spill"] = None
+        return state
+
+    def close(self) -> None:
+        """Delete the spill file, if any."""
+
+        self._finish_writes()
+        if self._spill_path is not None:
+            try:
+                os.remove(self._spill_path)
+            except FileNotFoundError:
+                pass
+            self._spill_path = None
@@ -1,10 +1,15 @@
-import re
 from typing import List, Tuple
 
 from app.utils.keywords import REGEX_PATTERNS, KEYWORDS, ANCHOR_TERMS, PROXIMITY_CHAR_WINDOW
+from app.utils.regex_set import get_regex_set
 
+# Compiled at import so a bad or unsafe pattern fails at startup, not mid-parse
+REGEX_SET = get_regex_set(REGEX_PATTERNS)
+
+
+def find_matches(text: str) -> Tuple[List[Tuple[str, str, List[Tuple[int, int]]]], bool]:
+    """Return ``(matches, truncated)``; ``truncated`` if the regex scan ran out of budget."""
 
-def find_matches(text: str) -> List[Tuple[str, str, List[Tuple[int, int]]]]:
     results: List[Tuple[str, str, List[Tuple[int, int]]]] = []
 
     lowered = text.lower()
@@ -23,14 +28,13 @@ def find_matches(text: str) -> List[Tuple[str, str, List[Tuple[int, int]]]]:
         if positions:
             results.append((kw, 'exact', positions))
 
-    # Regex patterns
-    for pattern in REGEX_PATTERNS:
-        compiled = re.compile(pattern, flags=re.IGNORECASE)
-        positions = [(m.start(), m.end()) for m in compiled.finditer(text)]
+    # Regex patterns, compiled once; pages without a pattern's literal are skipped
+    scan = REGEX_SET.scan(text, lowered)
+    for pattern, positions in zip(REGEX_SET.patterns, scan.matches):
         if positions:
             results.append((pattern, 'regex', positions))
 
-    return results
+    return results, scan.truncated
 
 
 def compute_confidence(text: str, start: int, end: int, match_type: str) -> float:
@@ -0,0 +1,233 @@
+"""Render single pages of stored documents to images.
+
+Rendered images are kept in a size-bounded on-disk LRU cache keyed by
+document hash, page, DPI, format and the set of highlighted matches, so a
+repeat view of the same page costs a file read instead of a PyMuPDF render.
+
+Each match is highlighted where it was found, not wherever its text occurs:
+its ``start``/``end`` offsets index the page text as matched (boilerplate
+edge lines stripped, then normalized; see ``app.services.boilerplate``), and
+:func:`_locate` maps them back onto the characters of the PDF page. That
+takes the matched text, which saved results keep in the full-text index.
+Without it (or if it no longer lines up with the PDF) a match is placed at
+the occurrence of its snippet whose surrounding text best fits its context.
+"""
+
+import hashlib
+import itertools
+import os
+import unicodedata
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import fitz  # PyMuPDF
+
+from app.services.boilerplate import edge_line_indexes
+from app.utils.cache import DiskLRUCache
+from app.utils.text import normalize_text_with_mapping
+
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", "./data/render_cache")
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+MIN_DPI = 36
+MAX_DPI = 300
+DEFAULT_DPI = 110
+
+IMAGE_MEDIA_TYPES = {"png": "image/png", "webp": "image/webp"}
+
+render_cache = DiskLRUCache(RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES)
+
+
+class PageOutOfRange(Exception):
+    pass
+
+
+def webp_supported() -> bool:
+    # PyMuPDF only encodes WebP through Pillow, which is optional.
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class Highlight(NamedTuple):
+    """One match to mark: its offsets in the matched page text, and its text."""
+
+    start: int
+    end: int
+    snippet: str
+    context_before: str = ""
+    context_after: str = ""
+
+
+def cache_key(document_hash: str, page: int, dpi: int, fmt: str, highlights: Iterable[Highlight]) -> str:
+    marks = sorted({f"{h.start}:{h.end}:{h.snippet}" for h in highlights})
+    tag = hashlib.sha1("\x1f".join(marks).encode()).hexdigest()[:12] if marks else "plain"
+    return f"{document_hash}-p{page}-d{dpi}-{tag}.{fmt}"
+
+
+def _page_chars(pdf_page: fitz.Page) -> Tuple[str, List[Optional[Tuple[int, fitz.Rect]]]]:
+    """The page's ``get_text("text")`` string, with each character's line and box.
+
+    Newlines ending a line have no box.
+    """
+
+    chars: List[str] = []
+    boxes: List[Optional[Tuple[int, fitz.Rect]]] = []
+    line_no = 0
+    for block in pdf_page.get_text("rawdict", flags=fitz.TEXTFLAGS_TEXT)["blocks"]:
+        for line in block.get("lines", ()):
+            for span in line["spans"]:
+                for char in span["chars"]:
+                    chars.append(char["c"])
+                    boxes.append((line_no, fitz.Rect(char["bbox"])))
+            chars.append("\n")
+            boxes.append(None)
+            line_no += 1
+    return "".join(chars), boxes
+
+
+def _source_offsets(text: str) -> Optional[List[int]]:
+    """Map each index of ``normalize_text_with_mapping``'s canonical text to ``text``."""
+
+    offsets: List[int] = []
+    for i, ch in enumerate(text):
+        offsets.extend([i] * len(unicodedata.normalize("NFKC", ch)))
+    if len(offsets) != len(unicodedata.normalize("NFKC", text)):
+        return None  # composed across characters; no per-character map
+    return offsets
+
+
+def _align(raw: str, matched_text: str) -> Optional[List[int]]:
+    """Map each character of ``matched_text`` to its index in ``raw``.
+
+    ``matched_text`` is ``raw`` with some boilerplate edge lines dropped,
+    then normalized. Which edge lines were dropped was decided over the
+    whole document, so every combination of this page's edge lines is
+    tried, fewest first.
+    """
+
+    lines = raw.splitlines(keepends=True)
+    starts = list(itertools.accumulate((len(line) for line in lines), initial=0))
+    edges = edge_line_indexes(lines)
+    for size in range(len(edges) + 1):
+        for dropped in itertools.combinations(edges, size):
+            kept = [i for i in range(len(lines)) if i not in dropped]
+            text = "".join(lines[i] for i in kept)
+            normalized, index_map, _ = normalize_text_with_mapping(text)
+            if normalized != matched_text:
+                continue
+            canonical_to_text = _source_offsets(text)
+            if canonical_to_text is None:
+                return None
+            text_to_raw = [raw_i for i in kept for raw_i in range(starts[i], starts[i + 1])]
+            return [text_to_raw[canonical_to_text[j]] for j in index_map]
+    return None
+
+
+def _common_prefix(a: str, b: str) -> int:
+    return next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), min(len(a), len(b)))
+
+
+def _best_occurrence(normalized: str, highlight: Highlight) -> Optional[Tuple[int, int]]:
+    """``[start, end)`` in ``normalized`` of the snippet occurrence that best fits the context."""
+
+    best = None
+    at = normalized.find(highlight.snippet) if highlight.snippet else -1
+    while at != -1:
+        end = at + len(highlight.snippet)
+        fit = _common_prefix(normalized[:at][::-1], highlight.context_before[::-1]) + _common_prefix(
+            normalized[end:], highlight.context_after
+        )
+        # Ties go to the occurrence nearest the recorded offset
+        score = (fit, -abs(at - highlight.start))
+        if best is None or score > best[0]:
+            best = (score, at, end)
+        at = normalized.find(highlight.snippet, at + 1)
+    return best[1:] if best is not None else None
+
+
+def _quads(boxes: Sequence[Optional[Tuple[int, fitz.Rect]]], start: int, end: int) -> List[fitz.Quad]:
+    """One quad per text line covered by characters ``[start, end)``."""
+
+    lines = {}
+    for box in boxes[start:end]:
+        if box is not None:
+            line_no, rect = box
+            lines[line_no] = lines[line_no] | rect if line_no in lines else fitz.Rect(rect)
+    return [rect.quad for _, rect in sorted(lines.items())]
+
+
+def _locate(
+    pdf_page: fitz.Page, highlights: Sequence[Highlight], matched_text: Optional[str]
+) -> List[fitz.Quad]:
+    raw, boxes = _page_chars(pdf_page)
+    offsets = _align(raw, matched_text) if matched_text else None
+    if offsets is None:
+        # Fall back to placing snippets by their context in the whole page text
+        matched_text, index_map, _ = normalize_text_with_mapping(raw)
+        canonical_to_raw = _source_offsets(raw)
+        if canonical_to_raw is None:
+            return []
+        offsets = [canonical_to_raw[j] for j in index_map]
+        spans = [_best_occurrence(matched_text, highlight) for highlight in highlights]
+    else:
+        spans = [
+            (h.start, h.end) if 0 <= h.start < h.end <= len(offsets) else _best_occurrence(matched_text, h)
+            for h in highlights
+        ]
+    quads: List[fitz.Quad] = []
+    for span in spans:
+        if span is not None:
+            start, end = span
+            quads.extend(_quads(boxes, offsets[start], offsets[end - 1] + 1))
+    return quads
+
+
+def render_page(
+    pdf_path: str,
+    page: int,
+    dpi: int,
+    fmt: str,
+    highlights: Sequence[Highlight] = (),
+    matched_text: Optional[str] = None,
+) -> bytes:
+    """Render 1-based ``page`` of ``pdf_path`` with each match marked.
+
+    ``matched_text`` is the page text the highlights' offsets index (see the
+    module docstring).
+    """
+
+    with fitz.open(pdf_path) as doc:
+        if page < 1 or page > doc.page_count:
+            raise PageOutOfRange(page)
+        pdf_page = doc[page - 1]
+        if highlights:
+            quads = _locate(pdf_page, highlights, matched_text)
+            if quads:
+                pdf_page.add_highlight_annot(quads)
+        pix = pdf_page.get_pixmap(dpi=dpi, annots=True)
+        if fmt == "webp":
+            return pix.pil_tobytes(format="WEBP")
+        return pix.tobytes("png")
+
+
+def get_page_image(
+    document_hash: str,
+    pdf_path: str,
+    page: int,
+    dpi: int,
+    fmt: str,
+    highlights: Iterable[Highlight] = (),
+    matched_text: Optional[str] = None,
+) -> "tuple[bytes, bool]":
+    """Return ``(image_bytes, cache_hit)`` for a page, rendering on a miss."""
+
+    highlights = list(highlights)
+    key = cache_key(document_hash, page, dpi, fmt, highlights)
+    cached: Optional[bytes] = render_cache.get(key)
+    if cached is not None:
+        return cached, True
+    data = render_page(pdf_path, page, dpi, fmt, highlights, matched_text)
+    render_cache.set(key, data)
+    return data, False
@@ -0,0 +1,135 @@
+"""Registry of in-progress parses, so they can be cancelled part-way.
+
+Parses run in worker threads that cannot be interrupted from outside, so
+cancellation is cooperative. ``parse_document`` calls a job's
+:meth:`ParseJob.checkpoint` between pages. Once the job is cancelled, the
+next checkpoint raises :class:`ParseCancelled`, and the pipeline unwinds,
+closing the PyMuPDF document and any spill file on the way out.
+
+A job is cancelled when its client disconnects (the ``/parse`` route watches
+for that) or through ``POST /parse/jobs/{job_id}/cancel``.  Cancelled jobs
+are counted in :meth:`ParseJobRegistry.stats`, along with an estimate of the
+CPU time they would still have used: CPU spent so far scaled by the share of
+the document left.
+"""
+
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+# Client-chosen job ids, so a parse can be cancelled before its response exists
+JOB_ID_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+
+
+class ParseCancelled(Exception):
+    def __init__(self, reason: str):
+        super().__init__(f"Parse cancelled ({reason})")
+        self.reason = reason
+
+
+class ParseJob:
+    """One running parse; :meth:`checkpoint` runs in the parsing thread."""
+
+    def __init__(self, job_id: str, user_id: int, filename: str):
+        self.id = job_id
+        self.user_id = user_id
+        self.filename = filename
+        self.started_at = time.time()
+        self.progress = 0.0
+        self.cpu_seconds = 0.0
+        self.cancel_reason: Optional[str] = None
+        self.stopped_early = False
+        self._event = threading.Event()
+        self._cpu_start: Optional[float] = None
+
+    def cancel(self, reason: str) -> None:
+        if not self._event.is_set():
+            self.cancel_reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def started(self) -> bool:
+        """Whether parsing began (jobs may wait for admission first)."""
+        return self._cpu_start is not None
+
+    def checkpoint(self, progress: float) -> None:
+        """Record ``progress`` (0..1) and raise if the job has been cancelled."""
+
+        now = time.thread_time()
+        if self._cpu_start is None:
+            self._cpu_start = now
+        self.cpu_seconds = now - self._cpu_start
+        self.progress = progress
+        if self._event.is_set():
+            self.stopped_early = True
+            raise ParseCancelled(self.cancel_reason or "cancelled")
+
+    def cpu_seconds_saved(self) -> float:
+        """Estimated CPU the rest of the parse would have used."""
+
+        if not self.stopped_early or self.progress <= 0:
+            return 0.0
+        return self.cpu_seconds * (1 - self.progress) / self.progress
+
+
+class ParseJobRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: Dict[Tuple[int, str], ParseJob] = {}
+        self._finished = 0
+        self._cancelled: Dict[str, int] = {}
+        self._cpu_spent_cancelled = 0.0
+        self._cpu_saved = 0.0
+
+    def start(self, user_id: int, filename: str, job_id: Optional[str] = None) -> ParseJob:
+        """Register a parse; raises ``ValueError`` if ``job_id`` is already running."""
+
+        job_id = job_id or uuid.uuid4().hex
+        job = ParseJob(job_id, user_id, filename)
+        with self._lock:
+            if (user_id, job_id) in self._jobs:
+                raise ValueError(f"A parse with job_id {job_id!r} is already running")
+            self._jobs[(user_id, job_id)] = job
+        return job
+
+    def finish(self, job: ParseJob) -> None:
+        with self._lock:
+            self._jobs.pop((job.user_id, job.id), None)
+            if job.stopped_early:
+                reason = job.cancel_reason or "cancelled"
+                self._cancelled[reason] = self._cancelled.get(reason, 0) + 1
+                self._cpu_spent_cancelled += job.cpu_seconds
+                self._cpu_saved += job.cpu_seconds_saved()
+            elif job.started:
+                self._finished += 1
+
+    def cancel(self, user_id: int, job_id: str, reason: str) -> bool:
+        with self._lock:
+            job = self._jobs.get((user_id, job_id))
+        if job is None:
+            return False
+        job.cancel(reason)
+        return True
+
+    def running(self, user_id: int) -> List[ParseJob]:
+        with self._lock:
+            return [job for (owner, _), job in self._jobs.items() if owner == user_id]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "running": len(self._jobs),
+                "finished": self._finished,
+                "cancelled": sum(self._cancelled.values()),
+                "cancelled_by_reason": dict(self._cancelled),
+                "cpu_seconds_spent_on_cancelled": round(self._cpu_spent_cancelled, 3),
+                "cpu_seconds_saved_estimate": round(self._cpu_saved, 3),
+            }
+
+
+parse_jobs = ParseJobRegistry()
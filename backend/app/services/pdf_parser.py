@@ -1,18 +1,22 @@
 # app/services/pdf_parser.py
 import time
 import re
-from typing import Dict, Generator, Tuple, Iterable
+from typing import Dict, Generator, Tuple, Iterable, Union
 import fitz  # PyMuPDF
 
 SECTION_LINE_PATTERN = re.compile(r"\b\d{2}\s\d{2}\s\d{2}\b")
 
 class PDFParser:
-    def __init__(self, pdf_bytes: bytes):
-        self._pdf_bytes = pdf_bytes
+    def __init__(self, source: Union[bytes, str]):
+        # PDF bytes, or the path of a PDF on disk (assembled uploads)
+        self._source = source
 
     def _open(self):
+        if isinstance(self._source, str):
+            # PyMuPDF reads pages from the file as needed
+            return fitz.open(self._source, filetype="pdf")
         # Avoids temp-file lifetime issues entirely
-        return fitz.open(stream=self._pdf_bytes, filetype="pdf")
+        return fitz.open(stream=self._source, filetype="pdf")
 
     def iter_pages(self) -> Generator[Tuple[int, str, str], None, None]:
         last_section = ""
@@ -0,0 +1,305 @@
+"""The parse pipeline shared by the ``/parse`` route and the bulk CLI.
+
+``parse_document`` runs ``PDFParser`` -> boilerplate stripping -> text
+normalization -> ``find_matches`` -> ``SectionResolver`` over every page and
+returns a :class:`ParseOutcome`; ``save_parse_result`` persists one in the
+caller's session.  Neither knows about HTTP, so the API and ``python -m app.cli`` stay
+byte-for-byte consistent.
+"""
+
+import dataclasses
+import json
+import time
+from collections import Counter
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.db_models import ParseResult
+from app.models.records import MatchRecord
+from app.services import search_index
+from app.services.boilerplate import BoilerplateFilter, page_digest
+from app.services.match_collector import MatchCollector
+from app.services.matcher import find_matches, compute_confidence
+from app.services.pdf_parser import PDFParser
+from app.utils.keywords import SNIPPET_WINDOW, PROXIMITY_CHAR_WINDOW
+from app.utils.spec_section import SectionResolver
+from app.utils.text import normalize_text_with_mapping, window
+
+
+@dataclasses.dataclass
+class ParseOutcome:
+    """Everything a parse produced, before it is returned or saved."""
+
+    results: MatchCollector
+    num_pages: int
+    parse_time_ms: int
+    # (page, section_hint, normalized text) for the full-text index
+    pages: List[Tuple[int, str, str]]
+    # Pages whose regex scan hit REGEX_PAGE_BUDGET_MS / REGEX_MAX_MATCHES_PER_PAGE
+    regex_truncated_pages: List[int] = dataclasses.field(default_factory=list)
+
+    @property
+    def total_matches(self) -> int:
+        return len(self.results)
+
+    @property
+    def matched_pages(self) -> int:
+        return self.results.matched_pages
+
+    def close(self) -> None:
+        """Release the match spill file, if the collector spilled."""
+        self.results.close()
+
+
+class _PageHit(NamedTuple):
+    keyword: str
+    match_type: str
+    start: int
+    end: int
+    pre: str
+    snip: str
+    post: str
+    context_window: str
+    confidence: float
+    source_index: Optional[int]
+
+
+class _PageAnalysis(NamedTuple):
+    """Everything about a page that depends only on its (stripped) text."""
+
+    ntext: str
+    canonical: str
+    hits: List[_PageHit]
+    regex_truncated: bool
+
+
+def _analyze_page(page_text: str) -> _PageAnalysis:
+    ntext, index_map, canonical = normalize_text_with_mapping(page_text)
+    hits: List[_PageHit] = []
+    matches, regex_truncated = find_matches(ntext)
+    for keyword_or_pattern, match_type, positions in matches:
+        for start, end in positions:
+            pre, snip, post = window(ntext, start, end, before=SNIPPET_WINDOW, after=SNIPPET_WINDOW)
+            hits.append(
+                _PageHit(
+                    keyword_or_pattern,
+                    match_type,
+                    start,
+                    end,
+                    pre,
+                    snip,
+                    post,
+                    f"{pre}{snip}{post}",
+                    compute_confidence(ntext, start, end, match_type),
+                    index_map[start] if 0 <= start < len(index_map) else None,
+                )
+            )
+    return _PageAnalysis(ntext, canonical, hits, regex_truncated)
+
+
+def _extract_pages(
+    parser: PDFParser,
+    work_units: int,
+    checkpoint: Optional[Callable[[float], None]],
+    page_timings: Optional[Dict[int, Dict]] = None,
+) -> List[Tuple[int, str, str]]:
+    raw_pages = []
+    page_iter = parser.iter_pages()
+    try:
+        t = time.perf_counter()
+        for page in page_iter:
+            if page_timings is not None:
+                page_timings[page[0]] = {"extract_ms": (time.perf_counter() - t) * 1000, "chars": len(page[1])}
+            raw_pages.append(page)
+            if checkpoint:
+                checkpoint(len(raw_pages) / work_units)
+            t = time.perf_counter()
+    finally:
+        # Close the PyMuPDF document now, even when a checkpoint raised.
+        page_iter.close()
+    return raw_pages
+
+
+def parse_document(
+    source: Union[bytes, str],
+    collect_pages: bool = False,
+    checkpoint: Optional[Callable[[float], None]] = None,
+    page_timings: Optional[Dict[int, Dict]] = None,
+) -> ParseOutcome:
+    """Run the full match pipeline over a PDF held in memory or at a path on disk.
+
+    ``checkpoint``, if given, is called between pages with the fraction of the
+    work done so far. It may raise to abandon the parse (see
+    ``app.services.parse_jobs``); everything opened so far is released
+    before the exception propagates.
+
+    ``page_timings``, if given, is filled with each page's stage timings
+    (text extraction, matching, section resolution) for
+    ``app.services.profiling``.
+    """
+
+    t0 = time.time()
+    if checkpoint:
+        checkpoint(0.0)
+    parser = PDFParser(source)
+
+    pages: List[Tuple[int, str, str]] = []
+    # Do this once so we don't call into PyMuPDF twice later
+    num_pages = parser.num_pages()
+    # Extraction and matching each count for half of the progress reported
+    work_units = 2 * max(num_pages, 1)
+
+    # Document-level pre-pass: drop repeated headers/footers, then hash the
+    # remaining text so identical pages are only analyzed once.
+    raw_pages = _extract_pages(parser, work_units, checkpoint, page_timings)
+    boilerplate = BoilerplateFilter(page_text for _, page_text, _ in raw_pages)
+    page_texts = [boilerplate.strip(page_text) for _, page_text, _ in raw_pages]
+    digests = [page_digest(page_text) for page_text in page_texts]
+    remaining = Counter(digests)
+    # Only pages that occur again later are kept, and only until their last copy.
+    reusable: Dict[bytes, _PageAnalysis] = {}
+
+    results = MatchCollector()
+    regex_truncated_pages: List[int] = []
+    section_seed = None
+
+    try:
+        for i, ((page_num, _, section_hint), page_text, digest) in enumerate(
+            zip(raw_pages, page_texts, digests)
+        ):
+            if checkpoint:
+                checkpoint((len(raw_pages) + i) / work_units)
+            t_analyze = time.perf_counter()
+            reused = reusable.get(digest)
+            analysis = reused or _analyze_page(page_text)
+            t_sections = time.perf_counter()
+            remaining[digest] -= 1
+            if remaining[digest]:
+                reusable[digest] = analysis
+            else:
+                reusable.pop(digest, None)
+
+            if analysis.regex_truncated:
+                regex_truncated_pages.append(page_num)
+
+            # Section resolution depends on the previous page, so it is never reused.
+            section_resolver = SectionResolver(analysis.canonical, seed_state=section_seed)
+            if collect_pages:
+                pages.append((page_num, section_hint, analysis.ntext))
+            for hit in analysis.hits:
+                spec_section = (
+                    section_resolver.resolve(hit.source_index) if hit.source_index is not None else None
+                )
+                results.append(
+                    MatchRecord(
+                        hit.keyword,
+                        page_num,
+                        section_hint or None,
+                        spec_section,
+                        hit.snip,
+                        hit.pre,
+                        hit.post,
+                        hit.context_window,
+                        hit.confidence,
+                        hit.match_type,
+                        hit.start,
+                        hit.end,
+                        PROXIMITY_CHAR_WINDOW,
+                    )
+                )
+            section_seed = section_resolver.tail_state()
+            if page_timings is not None:
+                page_timings.setdefault(page_num, {}).update(
+                    analyze_ms=(t_sections - t_analyze) * 1000,
+                    sections_ms=(time.perf_counter() - t_sections) * 1000,
+                    matches=len(analysis.hits),
+                    reused=reused is not None,
+                    regex_truncated=analysis.regex_truncated,
+                )
+    except BaseException:
+        # Drop the spill file at once rather than when the collector is collected.
+        results.close()
+        raise
+
+    elapsed_ms = int((time.time() - t0) * 1000)
+    return ParseOutcome(
+        results=results,
+        num_pages=num_pages,
+        parse_time_ms=elapsed_ms,
+        pages=pages,
+        regex_truncated_pages=regex_truncated_pages,
+    )
+
+
+def save_parse_result(
+    db: Session,
+    user_id: int,
+    filename: str,
+    outcome: ParseOutcome,
+    document_hash: Optional[str] = None,
+    results_json: Optional[str] = None,
+) -> ParseResult:
+    """Persist ``outcome`` and index its page text; commits ``db``.
+
+    Pass ``results_json`` when the caller already serialized the matches (the
+    route reuses the same string for the response body).  Spilled collections
+    are streamed into the row instead of being built up as one string.
+    """
+
+    stream_results = results_json is None and outcome.results.spilled and _can_stream_blob(db)
+    if results_json is None and not stream_results:
+        results_json = outcome.results.to_json()
+
+    db_parse_result = ParseResult(
+        user_id=user_id,
+        filename=filename,
+        num_pages=outcome.num_pages,
+        parse_time_ms=outcome.parse_time_ms,
+        total_matches=outcome.total_matches,
+        matched_pages=outcome.matched_pages,
+        results_json=results_json if not stream_results else "",
+        document_hash=document_hash,
+        regex_truncated_pages=json.dumps(outcome.regex_truncated_pages) if outcome.regex_truncated_pages else None,
+    )
+
+    db.add(db_parse_result)
+    db.flush()
+    if stream_results:
+        _stream_results_json(db, db_parse_result.id, outcome.results)
+    db.add_all(outcome.results.aggregates.rows(db_parse_result.id))
+    search_index.index_pages(db, db_parse_result.id, user_id, outcome.pages)
+    db.commit()
+    db.refresh(db_parse_result)
+    return db_parse_result
+
+
+def _can_stream_blob(db: Session) -> bool:
+    bind = db.get_bind()
+    if bind.dialect.name != "sqlite":
+        return False
+    return hasattr(db.connection().connection.driver_connection, "blobopen")  # Python 3.11+
+
+
+def _stream_results_json(db: Session, result_id: int, results: MatchCollector) -> None:
+    """Write a spilled collection into ``results_json`` chunk by chunk.
+
+    SQLite can only write incrementally into a preallocated BLOB, so the row
+    first gets a ``zeroblob`` of the exact size, the JSON is written into it,
+    and a final CAST turns the value back into TEXT (inside SQLite, not in
+    Python) so ``json_each`` and ``json.loads`` keep working.
+    """
+
+    db.execute(
+        text("UPDATE parse_results SET results_json = zeroblob(:size) WHERE id = :id"),
+        {"size": results.json_size(), "id": result_id},
+    )
+    raw = db.connection().connection.driver_connection
+    with raw.blobopen("parse_results", "results_json", result_id) as blob:
+        for chunk in results.iter_json():
+            blob.write(chunk)
+    db.execute(
+        text("UPDATE parse_results SET results_json = CAST(results_json AS TEXT) WHERE id = :id"),
+        {"id": result_id},
+    )
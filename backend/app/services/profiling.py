@@ -0,0 +1,192 @@
+"""On-demand profiling of a single parse, for admins chasing a slow document.
+
+``/parse?profile=true`` (and ``/uploads/{id}/complete?profile=true``) runs
+that one parse under ``cProfile`` and ``tracemalloc`` and records each page's
+stage timings (text extraction, matching, section resolution; see
+``parse_document``). Two artifacts are written to ``PROFILE_DIR``:
+
+* ``<id>.json``: wall/CPU time, peak traced memory, the slowest pages and
+  the functions with the most cumulative time;
+* ``<id>.prof``: the raw ``pstats`` dump, for ``snakeviz`` or ``python -m pstats``.
+
+A parse that is cancelled part-way still leaves its artifacts, since a parse
+that had to be stopped is usually the one worth looking at. ``cProfile`` is
+deterministic and roughly doubles the parse's CPU time. ``tracemalloc`` is
+process-wide, so only one profiled parse runs at a time. Other requests
+running meanwhile are slowed, and their allocations count towards the peak.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.services.parse_jobs import ParseCancelled
+from app.services.pipeline import ParseOutcome, parse_document
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./data/profiles")
+# Oldest profiles are deleted beyond this many
+PROFILE_MAX_KEPT = int(os.getenv("PROFILE_MAX_KEPT", "50"))
+PROFILE_TOP_FUNCTIONS = 40
+PROFILE_SLOWEST_PAGES = 20
+
+_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def _top_functions(profiler: cProfile.Profile) -> List[Dict]:
+    stats = pstats.Stats(profiler).stats
+    ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "function": f"{file}:{line}({name})",
+            "calls": ncalls,
+            "self_ms": _ms(tottime),
+            "cumulative_ms": _ms(cumtime),
+        }
+        for (file, line, name), (_, ncalls, tottime, cumtime, _) in ranked[:PROFILE_TOP_FUNCTIONS]
+    ]
+
+
+def _page_rows(page_timings: Dict[int, Dict]) -> List[Dict]:
+    rows = []
+    for page, timing in sorted(page_timings.items()):
+        row = {"page": page, **timing}
+        for key in ("extract_ms", "analyze_ms", "sections_ms"):
+            row[key] = round(row.get(key, 0.0), 2)
+        row["total_ms"] = round(row["extract_ms"] + row["analyze_ms"] + row["sections_ms"], 2)
+        rows.append(row)
+    return rows
+
+
+def profile_parse(
+    source: Union[bytes, str],
+    collect_pages: bool,
+    checkpoint,
+    label: str,
+    user_id: int,
+) -> Tuple[ParseOutcome, Dict]:
+    """``parse_document`` under the profilers; returns the outcome and the summary.
+
+    Raises :class:`ProfilerBusy` if another profiled parse is running.
+    """
+
+    if not _lock.acquire(blocking=False):
+        raise ProfilerBusy("Another profiled parse is running; try again shortly")
+    try:
+        profile_id = uuid.uuid4().hex
+        page_timings: Dict[int, Dict] = {}
+        profiler = cProfile.Profile()
+        outcome: Optional[ParseOutcome] = None
+        cancelled: Optional[str] = None
+        error: Optional[str] = None
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            outcome = profiler.runcall(
+                parse_document, source, collect_pages, checkpoint, page_timings=page_timings
+            )
+        except ParseCancelled as e:
+            cancelled = e.reason
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            current, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            pages = _page_rows(page_timings)
+            summary = {
+                "id": profile_id,
+                "label": label,
+                "user_id": user_id,
+                "created_at": time.time(),
+                "cancelled": cancelled,
+                "error": error,
+                "wall_ms": _ms(wall),
+                "cpu_ms": _ms(cpu),
+                "peak_traced_memory_bytes": peak,
+                "retained_traced_memory_bytes": current,
+                "num_pages": outcome.num_pages if outcome else None,
+                "total_matches": outcome.total_matches if outcome else None,
+                "slowest_pages": sorted(pages, key=lambda row: row["total_ms"], reverse=True)[
+                    :PROFILE_SLOWEST_PAGES
+                ],
+                "top_functions": _top_functions(profiler),
+                "pages": pages,
+            }
+            _write(profile_id, summary, profiler)
+    finally:
+        _lock.release()
+    return outcome, summary
+
+
+def _write(profile_id: str, summary: Dict, profiler: cProfile.Profile) -> None:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(os.path.join(PROFILE_DIR, f"{profile_id}.prof"))
+    tmp = os.path.join(PROFILE_DIR, f"{profile_id}.json.tmp")
+    with open(tmp, "w") as fh:
+        json.dump(summary, fh)
+    os.replace(tmp, os.path.join(PROFILE_DIR, f"{profile_id}.json"))
+    _prune()
+
+
+def _prune() -> None:
+    for entry in list_profiles()[PROFILE_MAX_KEPT:]:
+        for suffix in (".json", ".prof"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, entry["id"] + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> List[Dict]:
+    """Stored profiles, newest first, without their per-page and per-function detail."""
+
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    entries = []
+    for name in os.listdir(PROFILE_DIR):
+        if name.endswith(".json"):
+            summary = load_profile(name[: -len(".json")])
+            if summary is not None:
+                entries.append({k: v for k, v in summary.items() if k not in ("pages", "top_functions")})
+    return sorted(entries, key=lambda entry: entry["created_at"], reverse=True)
+
+
+def _valid_id(profile_id: str) -> bool:
+    return len(profile_id) == 32 and all(c in "0123456789abcdef" for c in profile_id)
+
+
+def load_profile(profile_id: str) -> Optional[Dict]:
+    if not _valid_id(profile_id):
+        return None
+    try:
+        with open(os.path.join(PROFILE_DIR, f"{profile_id}.json")) as fh:
+            return json.load(fh)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def pstats_path(profile_id: str) -> Optional[str]:
+    if not _valid_id(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.prof")
+    return path if os.path.exists(path) else None
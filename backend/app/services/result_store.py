@@ -0,0 +1,135 @@
+"""Row-level access to saved parse results.
+
+``ParseResult.results_json`` stores every match of a document as one JSON
+array.  Loading it with ``json.loads`` is fine for the results page but not
+for exporting a 50k-match book, so this module iterates the array inside
+SQLite with ``json_each`` and pushes the page / keyword / section filters down
+into SQL.  Python only ever holds one batch of flat rows at a time.  Other
+database backends fall back to decoding the blob in Python.
+"""
+
+import dataclasses
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import Query
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.db_models import ParseResult
+
+EXPORT_COLUMNS = [
+    "keyword",
+    "page",
+    "spec_section",
+    "section_hint",
+    "match_type",
+    "confidence",
+    "start",
+    "end",
+    "snippet",
+    "context_window",
+]
+
+EXPORT_BATCH_SIZE = 500
+
+
+@dataclasses.dataclass
+class ResultFilters:
+    """Filters shared by the results detail view and the exports."""
+
+    page: Optional[int] = None
+    keyword: Optional[str] = None
+    section: Optional[str] = None
+
+    def is_empty(self) -> bool:
+        return self.page is None and not self.keyword and not self.section
+
+    def matches(self, item: Dict[str, Any]) -> bool:
+        if self.page is not None and item.get("page") != self.page:
+            return False
+        if self.keyword and (item.get("keyword") or "").lower() != self.keyword.lower():
+            return False
+        if self.section and not (item.get("spec_section") or "").startswith(self.section):
+            return False
+        return True
+
+
+def result_filters(
+    page: Optional[int] = Query(None, ge=1, description="Only matches on this page"),
+    keyword: Optional[str] = Query(None, description="Only matches for this keyword (case-insensitive)"),
+    section: Optional[str] = Query(None, description="Only matches whose spec_section starts with this prefix"),
+) -> ResultFilters:
+    """FastAPI dependency that collects the result filter query parameters."""
+    return ResultFilters(page=page, keyword=keyword, section=section)
+
+
+def _sql_filters(filters: ResultFilters) -> Tuple[str, Dict[str, Any]]:
+    clauses: List[str] = []
+    params: Dict[str, Any] = {}
+    if filters.page is not None:
+        clauses.append("json_extract(j.value, '$.page') = :page")
+        params["page"] = filters.page
+    if filters.keyword:
+        clauses.append("lower(json_extract(j.value, '$.keyword')) = lower(:keyword)")
+        params["keyword"] = filters.keyword
+    if filters.section:
+        clauses.append("substr(json_extract(j.value, '$.spec_section'), 1, :section_len) = :section")
+        params["section"] = filters.section
+        params["section_len"] = len(filters.section)
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+
+def _flatten(item: Dict[str, Any]) -> Tuple[Any, ...]:
+    positions = item.get("positions") or [{}]
+    return (
+        item.get("keyword"),
+        item.get("page"),
+        item.get("spec_section"),
+        item.get("section_hint"),
+        item.get("match_type"),
+        item.get("confidence"),
+        positions[0].get("start"),
+        positions[0].get("end"),
+        item.get("snippet"),
+        item.get("context_window"),
+    )
+
+
+def iter_export_rows(
+    db: Session, result_id: int, filters: ResultFilters
+) -> Iterator[Tuple[Any, ...]]:
+    """Yield one tuple per stored match, in ``EXPORT_COLUMNS`` order.
+
+    ``json_each`` walks the array in storage order, so rows come out in the
+    order they were saved without a sort step.
+    """
+
+    if db.get_bind().dialect.name != "sqlite":
+        result = db.get(ParseResult, result_id)
+        if result is None:
+            return
+        for item in json.loads(result.results_json):
+            if filters.matches(item):
+                yield _flatten(item)
+        return
+
+    where, params = _sql_filters(filters)
+    params["result_id"] = result_id
+    stmt = text(
+        "SELECT json_extract(j.value, '$.keyword'),"
+        " json_extract(j.value, '$.page'),"
+        " json_extract(j.value, '$.spec_section'),"
+        " json_extract(j.value, '$.section_hint'),"
+        " json_extract(j.value, '$.match_type'),"
+        " json_extract(j.value, '$.confidence'),"
+        " json_extract(j.value, '$.positions[0].start'),"
+        " json_extract(j.value, '$.positions[0].end'),"
+        " json_extract(j.value, '$.snippet'),"
+        " json_extract(j.value, '$.context_window')"
+        " FROM parse_results AS r, json_each(r.results_json) AS j"
+        f" WHERE r.id = :result_id{where}"
+    )
+    rows = db.execute(stmt, params).yield_per(EXPORT_BATCH_SIZE)
+    for row in rows:
+        yield tuple(row)
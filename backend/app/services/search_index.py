@@ -0,0 +1,166 @@
+"""Full-text index over the page text of saved documents.
+
+When a parse is saved, the normalized text of every page is written to the
+``page_text_fts`` SQLite FTS5 table next to ``parse_results``.  Searching a
+user's whole library is then a single FTS query and never touches a PDF.
+Rows are removed whenever their ``ParseResult`` is deleted, including the
+cascade from deleting a user.
+
+Only SQLite has FTS5; on other backends :func:`is_available` is false and the
+indexing calls are no-ops.
+"""
+
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models.db_models import ParseResult
+
+FTS_TABLE = "page_text_fts"
+SNIPPET_MARK_OPEN = "**"
+SNIPPET_MARK_CLOSE = "**"
+SNIPPET_TOKENS = 16
+# rowid = result_id * stride + page, so a result's rows form one rowid range
+PAGE_ROWID_STRIDE = 1_000_000
+
+_available = False
+
+_QUERY_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def ensure_schema(engine: Engine) -> None:
+    """Create the FTS5 table if the database supports it."""
+
+    global _available
+    if engine.dialect.name != "sqlite":
+        _available = False
+        return
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "body, result_id UNINDEXED, user_id UNINDEXED, page UNINDEXED,"
+                " section_hint UNINDEXED, tokenize='porter unicode61')"
+            )
+        )
+    _available = True
+
+
+def is_available() -> bool:
+    return _available
+
+
+def index_pages(
+    db: Session,
+    result_id: int,
+    user_id: int,
+    pages: Iterable[Tuple[int, Optional[str], str]],
+) -> None:
+    """Add ``(page, section_hint, text)`` rows for ``result_id`` in ``db``'s transaction."""
+
+    if not _available:
+        return
+    rows = [
+        {
+            "rowid": result_id * PAGE_ROWID_STRIDE + page,
+            "body": body,
+            "result_id": result_id,
+            "user_id": user_id,
+            "page": page,
+            "section_hint": section_hint or None,
+        }
+        for page, section_hint, body in pages
+        if body
+    ]
+    if rows:
+        db.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, body, result_id, user_id, page, section_hint)"
+                " VALUES (:rowid, :body, :result_id, :user_id, :page, :section_hint)"
+            ),
+            rows,
+        )
+
+
+def page_text(db: Session, result_id: int, page: int) -> Optional[str]:
+    """The indexed (stripped, normalized) text of one page, if it was indexed."""
+
+    if not _available:
+        return None
+    return db.execute(
+        text(f"SELECT body FROM {FTS_TABLE} WHERE rowid = :rowid"),
+        {"rowid": result_id * PAGE_ROWID_STRIDE + page},
+    ).scalar()
+
+
+def build_match_query(query: str) -> str:
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every bare word and every ``"quoted phrase"`` becomes a quoted FTS5
+    phrase, and phrases are ANDed.  Quoting keeps punctuation such as the
+    hyphens in ``cast-in-place`` from being read as FTS5 operators.
+    """
+
+    terms = []
+    for phrase, word in _QUERY_TERM.findall(query):
+        term = (phrase or word).strip()
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"')
+    return " ".join(terms)
+
+
+def search(db: Session, user_id: int, query: str, limit: int) -> List[dict]:
+    """Return the best-ranked page hits for ``user_id``, best first."""
+
+    match = build_match_query(query)
+    if not match or not _available:
+        return []
+    rows = db.execute(
+        text(
+            "SELECT f.result_id, r.filename, f.page, f.section_hint,"
+            f" snippet({FTS_TABLE}, 0, :mark_open, :mark_close, '…', :tokens) AS snippet,"
+            f" bm25({FTS_TABLE}) AS score"
+            f" FROM {FTS_TABLE} AS f"
+            " JOIN parse_results AS r ON r.id = f.result_id"
+            f" WHERE {FTS_TABLE} MATCH :match AND f.user_id = :user_id"
+            " ORDER BY score"
+            " LIMIT :limit"
+        ),
+        {
+            "match": match,
+            "user_id": user_id,
+            "limit": limit,
+            "mark_open": SNIPPET_MARK_OPEN,
+            "mark_close": SNIPPET_MARK_CLOSE,
+            "tokens": SNIPPET_TOKENS,
+        },
+    ).mappings()
+    return [
+        {
+            "result_id": row["result_id"],
+            "filename": row["filename"],
+            "page": row["page"],
+            "section_hint": row["section_hint"],
+            "snippet": row["snippet"],
+            # bm25() is lower-is-better; flip it so clients can sort descending
+            "score": round(-row["score"], 4),
+        }
+        for row in rows
+    ]
+
+
+def delete_result_pages(conn: Connection, result_id: int) -> None:
+    if _available:
+        low = result_id * PAGE_ROWID_STRIDE
+        conn.execute(
+            text(f"DELETE FROM {FTS_TABLE} WHERE rowid >= :low AND rowid < :high"),
+            {"low": low, "high": low + PAGE_ROWID_STRIDE},
+        )
+
+
+@event.listens_for(ParseResult, "after_delete")
+def _drop_deleted_result_pages(mapper, connection, target):
+    delete_result_pages(connection, target.id)
@@ -0,0 +1,336 @@
+"""Resumable, chunked uploads for PDFs too large to send in one request.
+
+A client creates an ``UploadSession`` for a file of known size and gets back
+a chunk size. It then PUTs chunks by index, in any order and as often as
+needed, each with its SHA-256. Every chunk is streamed straight to its offset
+in a preallocated ``UPLOAD_DIR/<id>.part`` file and recorded only once its
+length and checksum check out, so the status endpoint can report exactly
+which byte ranges are safely on disk. Finalizing checks that every chunk is
+present (and the whole-file digest, if one was given at creation). Parsing
+then opens the assembled file by path, so the upload is never held in
+memory.
+
+Only one request at a time may complete a session: ``claim_completion``
+marks it, so a concurrent or repeated ``/complete`` (or a chunk PUT) is
+refused while the parse runs, and ``release_completion`` clears the mark if
+the parse or save fails so the client can retry. A worker that dies
+mid-parse leaves the session claimed until it expires.
+
+Chunk writes and the claim exclude each other through an ``flock`` on the
+``.part`` file: a write holds it shared (see :func:`chunk_writer`) and the
+claim takes it exclusively, so a session with a write in flight cannot be
+claimed and a claimed one cannot be written. The claim is also re-checked
+when a write starts and when its chunk is recorded.
+
+Sessions expire ``UPLOAD_SESSION_TTL_SECONDS`` after their last chunk; their
+rows are purged whenever a new session is created and their files are removed
+after the deleting commit.
+"""
+
+import contextlib
+import hashlib
+import math
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+
+try:  # POSIX only; elsewhere only the claim re-checks keep writes and completion apart
+    import fcntl
+except ImportError:  # pragma: no cover - depends on the platform
+    fcntl = None
+
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.db_models import UploadChunk, UploadSession
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./data/uploads")
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+UPLOAD_SESSION_TTL_SECONDS = int(os.getenv("UPLOAD_SESSION_TTL_SECONDS", str(24 * 3600)))
+
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+_PENDING_KEY = "uploads_pending_deletes"
+_HASH_BLOCK = 1 << 20
+
+
+class UploadError(Exception):
+    """The request does not fit the upload session (bad index, size, ...)."""
+
+
+class ChecksumMismatch(UploadError):
+    pass
+
+
+class CompletionInProgress(UploadError):
+    """The session is being completed, so its chunks can no longer change."""
+
+
+class IncompleteUpload(UploadError):
+    def __init__(self, missing: List[int]):
+        super().__init__(f"{len(missing)} chunk(s) missing")
+        self.missing = missing
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def part_path(upload_id: str) -> str:
+    return os.path.join(UPLOAD_DIR, f"{upload_id}.part")
+
+
+def num_chunks(upload: UploadSession) -> int:
+    return math.ceil(upload.total_size / upload.chunk_size)
+
+
+def chunk_span(upload: UploadSession, index: int) -> Tuple[int, int]:
+    """Return ``(offset, length)`` of chunk ``index``."""
+
+    if not 0 <= index < num_chunks(upload):
+        raise UploadError(f"Chunk index must be between 0 and {num_chunks(upload) - 1}")
+    offset = index * upload.chunk_size
+    return offset, min(upload.chunk_size, upload.total_size - offset)
+
+
+def create_session(
+    db: Session,
+    user_id: int,
+    filename: str,
+    size: int,
+    chunk_size: Optional[int] = None,
+    sha256: Optional[str] = None,
+) -> UploadSession:
+    if size <= 0:
+        raise UploadError("Empty file")
+    if size > UPLOAD_MAX_BYTES:
+        raise UploadError(f"File exceeds the {UPLOAD_MAX_BYTES} byte upload limit")
+    chunk_size = chunk_size or UPLOAD_CHUNK_SIZE
+    if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+        raise UploadError(f"chunk_size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE} bytes")
+
+    purge_expired(db)
+    upload = UploadSession(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        filename=filename,
+        total_size=size,
+        chunk_size=chunk_size,
+        sha256=sha256.lower() if sha256 else None,
+        expires_at=_utcnow() + timedelta(seconds=UPLOAD_SESSION_TTL_SECONDS),
+    )
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    # Sparse on most filesystems; chunks are written in place at their offsets.
+    with open(part_path(upload.id), "wb") as fh:
+        fh.truncate(size)
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+    return upload
+
+
+def get_session(db: Session, upload_id: str, user_id: int) -> Optional[UploadSession]:
+    return (
+        db.query(UploadSession)
+        .filter(
+            UploadSession.id == upload_id,
+            UploadSession.user_id == user_id,
+            UploadSession.expires_at > _utcnow(),
+        )
+        .first()
+    )
+
+
+def _try_flock(fd: int, exclusive: bool) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _check_not_completing(db: Session, upload: UploadSession) -> None:
+    db.refresh(upload)
+    if upload.completing_since is not None:
+        raise CompletionInProgress("Upload is being completed")
+
+
+@contextlib.contextmanager
+def chunk_writer(db: Session, upload: UploadSession) -> Iterator[None]:
+    """Hold ``upload`` open for writing and recording one chunk.
+
+    Raises :class:`CompletionInProgress` if the session is claimed for
+    completion; while held, :func:`claim_completion` refuses the session.
+    """
+
+    try:
+        fd = os.open(part_path(upload.id), os.O_RDONLY)
+    except FileNotFoundError:
+        # Adopted into the document store by a completion that just finished
+        raise CompletionInProgress("Upload is being completed")
+    try:
+        if not _try_flock(fd, exclusive=False):
+            raise CompletionInProgress("Upload is being completed")
+        _check_not_completing(db, upload)
+        yield
+    finally:
+        os.close(fd)  # releases the lock
+
+
+async def write_chunk(upload: UploadSession, index: int, body: AsyncIterator[bytes], sha256: str) -> None:
+    """Stream one chunk from ``body`` into place, verifying its length and digest."""
+
+    offset, length = chunk_span(upload, index)
+    digest = hashlib.sha256()
+    written = 0
+    fd = os.open(part_path(upload.id), os.O_WRONLY)
+    try:
+        async for part in body:
+            if written + len(part) > length:
+                raise UploadError(f"Chunk {index} must be exactly {length} bytes")
+            # Request bodies arrive in small pieces; a positioned write of one is cheap.
+            os.pwrite(fd, part, offset + written)
+            digest.update(part)
+            written += len(part)
+    finally:
+        os.close(fd)
+    if written != length:
+        raise UploadError(f"Chunk {index} must be exactly {length} bytes")
+    if digest.hexdigest() != sha256.lower():
+        raise ChecksumMismatch(f"Chunk {index} does not match its SHA-256")
+
+
+def record_chunk(db: Session, upload: UploadSession, index: int, sha256: Optional[str]) -> None:
+    """Mark chunk ``index`` received (or, with ``sha256=None``, not received)."""
+
+    _check_not_completing(db, upload)
+    query = db.query(UploadChunk).filter(UploadChunk.upload_id == upload.id, UploadChunk.chunk_index == index)
+    if sha256 is None:
+        query.delete()
+    elif query.first() is None:
+        db.add(UploadChunk(upload_id=upload.id, chunk_index=index, sha256=sha256.lower()))
+    upload.expires_at = _utcnow() + timedelta(seconds=UPLOAD_SESSION_TTL_SECONDS)
+    try:
+        db.commit()
+    except IntegrityError:
+        # The same chunk was recorded by a concurrent retry; the bytes are identical.
+        db.rollback()
+    db.refresh(upload)
+
+
+def received_ranges(upload: UploadSession) -> List[List[int]]:
+    """Merged ``[start, end)`` byte ranges of the verified chunks."""
+
+    ranges: List[List[int]] = []
+    for chunk in upload.chunks:
+        start, length = chunk_span(upload, chunk.chunk_index)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = start + length
+        else:
+            ranges.append([start, start + length])
+    return ranges
+
+
+def missing_chunks(upload: UploadSession) -> List[int]:
+    have = {chunk.chunk_index for chunk in upload.chunks}
+    return [i for i in range(num_chunks(upload)) if i not in have]
+
+
+def assemble(upload: UploadSession, need_digest: bool) -> Tuple[str, Optional[str]]:
+    """Check the upload is complete and return ``(path, sha256 or None)``.
+
+    The whole-file digest is computed (streaming) when the caller needs it or
+    the session was created with one to verify against.
+    """
+
+    missing = missing_chunks(upload)
+    if missing:
+        raise IncompleteUpload(missing)
+    path = part_path(upload.id)
+    digest = None
+    if need_digest or upload.sha256:
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(_HASH_BLOCK), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        if upload.sha256 and digest != upload.sha256:
+            raise ChecksumMismatch("Assembled file does not match the SHA-256 given at creation")
+    return path, digest
+
+
+def claim_completion(db: Session, upload: UploadSession) -> bool:
+    """Mark ``upload`` as being completed.
+
+    False if another request already has, or a chunk is still being written.
+    """
+
+    try:
+        fd = os.open(part_path(upload.id), os.O_RDONLY)
+    except FileNotFoundError:
+        return False
+    try:
+        if not _try_flock(fd, exclusive=True):
+            return False
+        claimed = (
+            db.query(UploadSession)
+            .filter(UploadSession.id == upload.id, UploadSession.completing_since.is_(None))
+            .update({UploadSession.completing_since: _utcnow()}, synchronize_session=False)
+        )
+        db.commit()
+    finally:
+        os.close(fd)
+    return bool(claimed)
+
+
+def release_completion(db: Session, upload_id: str) -> None:
+    """Clear the completion mark after a failed completion (rolling back ``db`` first)."""
+
+    db.rollback()
+    db.query(UploadSession).filter(UploadSession.id == upload_id).update(
+        {UploadSession.completing_since: None}, synchronize_session=False
+    )
+    db.commit()
+
+
+def discard(db: Session, upload: UploadSession) -> None:
+    """Delete the session; its file goes after the commit."""
+
+    db.delete(upload)
+    db.commit()
+
+
+def purge_expired(db: Session) -> int:
+    expired = db.query(UploadSession).filter(UploadSession.expires_at <= _utcnow()).all()
+    for upload in expired:
+        db.delete(upload)
+    if expired:
+        db.commit()
+    return len(expired)
+
+
+@event.listens_for(UploadSession, "after_delete")
+def _queue_part_delete(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _delete_part_files(session):
+    for upload_id in session.info.pop(_PENDING_KEY, ()):
+        try:
+            os.remove(part_path(upload_id))
+        except FileNotFoundError:
+            pass  # already adopted into the document store
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_pending_deletes(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -1,16 +1,22 @@
 """Authentication utilities for JWT tokens and password hashing."""
 
+import asyncio
+import dataclasses
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from app.database import get_db
 from app.models.db_models import User
+from app.utils.cache import TTLCache
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -29,6 +35,50 @@ if SECRET_KEY == "your-secret-key-change-in-production":
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 
+# Verified-token cache settings (set AUTH_CACHE_TTL_SECONDS=0 to disable).
+# The cache is per process: a change to a user (password, deletion,
+# retention settings) evicts their tokens only in the worker that made it;
+# other workers keep the old snapshot for up to the TTL.
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "1024"))
+
+# Comma-separated emails of users allowed to use admin-only features (e.g. parse profiling)
+ADMIN_EMAILS = frozenset(
+    email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()
+)
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+_password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class CachedIdentity:
+    """Column snapshot of a ``User`` row, keyed in the cache by raw token.
+
+    Holds every column of ``users``, so the merged ``User`` never needs a
+    lazy load (or reports a default) for one the snapshot missed.
+    """
+
+    id: int
+    email: str
+    hashed_password: str
+    retention_days: Optional[int]
+    retention_max_results: Optional[int]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def of(cls, user: User) -> "CachedIdentity":
+        return cls(**{field.name: getattr(user, field.name) for field in dataclasses.fields(cls)})
+
+
+token_cache = TTLCache(maxsize=AUTH_CACHE_MAX_ENTRIES, ttl=AUTH_CACHE_TTL_SECONDS)
+
+_PENDING_KEY = "auth_pending_evictions"
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
@@ -40,6 +90,25 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Run :func:`verify_password` on the password executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Run :func:`get_password_hash` on the password executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
+
+def invalidate_user_tokens(user_id: int) -> int:
+    """Forget every cached token that resolves to ``user_id``."""
+    return token_cache.discard_where(lambda identity: identity.id == user_id)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -56,7 +125,17 @@ def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
-    """Get the current authenticated user from JWT token."""
+    """Get the current authenticated user from JWT token.
+
+    Tokens that were verified recently are served from ``token_cache``: the
+    cached column snapshot is merged into ``db`` without a SELECT, so the
+    returned ``User`` is attached to the request session exactly as a freshly
+    queried one would be.
+    """
+    cached = token_cache.get(token)
+    if cached is not None:
+        return _attach_cached_user(cached, db)
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -79,5 +158,62 @@ def get_current_user(
 
     if user is None:
         raise credentials_exception
+
+    exp = payload.get("exp")
+    expires_at = None
+    if exp is not None:
+        expires_at = time.monotonic() + (float(exp) - time.time())
+    token_cache.set(
+        token,
+        CachedIdentity.of(user),
+        expires_at=expires_at,
+    )
     return user
 
+
+def is_admin(user: User) -> bool:
+    return user.email.lower() in ADMIN_EMAILS
+
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Like ``get_current_user``, but only for the users listed in ``ADMIN_EMAILS``."""
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
+
+def _attach_cached_user(identity: CachedIdentity, db: Session) -> User:
+    user = User(**dataclasses.asdict(identity))
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+def _queue_token_eviction(target) -> None:
+    # Evict now, and again once the change commits: a request that misses the
+    # cache between flush and commit reads the old row and re-caches it.
+    invalidate_user_tokens(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target):
+    _queue_token_eviction(target)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_updated_user(mapper, connection, target):
+    # Any column may be in the snapshot, so any change makes it stale.
+    _queue_token_eviction(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_users(session):
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_user_tokens(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_pending_evictions(session):
+    session.info.pop(_PENDING_KEY, None)
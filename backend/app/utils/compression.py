@@ -0,0 +1,150 @@
+"""Response compression (gzip, or Brotli when the optional ``brotli`` package is installed).
+
+A saved result's JSON is mostly repeated English context text and compresses
+roughly tenfold. Starlette's ``GZipMiddleware`` compresses every response,
+including PNG page images and XLSX exports that are already compressed, and
+has no Brotli. This middleware:
+
+* picks ``br`` or ``gzip`` from ``Accept-Encoding`` (honouring ``q=0``);
+* skips bodies under ``RESPONSE_COMPRESSION_MIN_BYTES``, already-encoded
+  responses, ``304``/``204`` and already-compressed media types;
+* compresses streamed responses (CSV exports, large parse results) chunk by
+  chunk, flushing after each so clients still see data as it is produced.
+"""
+
+import os
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # optional dependency
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# 0 disables compression
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+# Brotli's high qualities are far too slow for dynamic responses
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
+
+_INCOMPRESSIBLE_PREFIXES = ("image/", "video/", "audio/", "application/zip", "application/pdf")
+_INCOMPRESSIBLE_TYPES = {"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"}
+_NO_BODY_STATUSES = {204, 304}
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Return ``"br"``, ``"gzip"`` or None for an ``Accept-Encoding`` header value."""
+
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    wildcard = accepted.get("*", 0.0)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    for encoding in candidates:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def _compressible(media_type: str) -> bool:
+    media_type = media_type.split(";", 1)[0].strip().lower()
+    return media_type not in _INCOMPRESSIBLE_TYPES and not media_type.startswith(_INCOMPRESSIBLE_PREFIXES)
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=RESPONSE_BROTLI_QUALITY)
+            self.compress: Callable[[bytes], bytes] = self._brotli.process
+            self.flush: Callable[[], bytes] = self._brotli.flush
+            self.finish: Callable[[], bytes] = self._brotli.finish
+        else:
+            self._zlib = zlib.compressobj(RESPONSE_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self.compress = self._zlib.compress
+            self.flush = lambda: self._zlib.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = self._zlib.flush
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = RESPONSE_COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.minimum_size <= 0:
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSender(send, encoding, self.minimum_size))
+
+
+class _CompressingSender:
+    """Wraps ``send`` for one response; decides on compression at the first body message."""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.compressor: Optional[_Compressor] = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                message["status"] in _NO_BODY_STATUSES
+                or "content-encoding" in headers
+                or not _compressible(headers.get("content-type", ""))
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start = message  # held until the first body message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more_body and len(body) < self.minimum_size:
+                await self.send(start)
+                await self.send(message)
+                self.passthrough = True
+                return
+            self.compressor = _Compressor(self.encoding)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(start)
+
+        if more_body:
+            chunks: List[bytes] = [self.compressor.compress(body), self.compressor.flush()]
+        else:
+            chunks = [self.compressor.compress(body), self.compressor.finish()]
+        await self.send({"type": "http.response.body", "body": b"".join(chunks), "more_body": more_body})
@@ -0,0 +1,27 @@
+"""Entity tags for conditional ``GET`` requests.
+
+ETags are weak (``W/"..."``): the same representation can be sent gzip- or
+Brotli-encoded (see :mod:`app.utils.compression`), and ``If-None-Match`` uses
+weak comparison anyway. They are computed from a resource's identity and
+version rather than its body, so a ``304`` can be answered without loading
+or serializing the body at all.
+"""
+
+import hashlib
+from typing import Any
+
+
+def weak_etag(*parts: Any) -> str:
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header value matches ``etag`` (weak comparison)."""
+
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
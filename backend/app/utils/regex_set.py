@@ -0,0 +1,191 @@
+r"""Match a set of regular expressions against page text.
+
+``RegexSet`` compiles its patterns once (per set, via :func:`get_regex_set`)
+and never recompiles per page. ``re`` is a backtracking engine with no DFA,
+so one merged alternation is not faster than separate passes; it is slower
+(see ``benchmarks/bench_regex.py``). The cost that can be avoided is scanning
+a page for a pattern that cannot occur on it. Each pattern therefore gets a
+*required literal*: a substring every match must contain, taken from the
+parsed pattern (e.g. ``"record"`` for ``\bengineer\s+of\s+record\b``).
+A page is scanned for a pattern only if the literal occurs in the
+lowercased page text. That check runs at C substring-search speed, so pages
+without a hit cost almost nothing.
+
+Guards against pathological patterns:
+
+* At construction, patterns that can match the empty string, or that nest
+  one unbounded repeat inside another (the ``(a+)+`` shape behind
+  catastrophic backtracking), raise :class:`UnsafePattern`.
+* ``scan`` stops after ``REGEX_PAGE_BUDGET_MS`` or ``REGEX_MAX_MATCHES_PER_PAGE``
+  matches and returns what it found so far, marked ``truncated`` so the
+  parse can report the page as incomplete. The budget is checked between
+  matches; the stdlib engine cannot be interrupted inside a single match,
+  which is why the construction-time checks exist.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+try:  # Python 3.11+
+    from re import _constants as _sre, _parser as _sre_parse
+except ImportError:  # pragma: no cover - older Pythons
+    import sre_constants as _sre
+    import sre_parse as _sre_parse
+
+REGEX_PAGE_BUDGET_MS = float(os.getenv("REGEX_PAGE_BUDGET_MS", "250"))
+REGEX_MAX_MATCHES_PER_PAGE = int(os.getenv("REGEX_MAX_MATCHES_PER_PAGE", "5000"))
+
+_REPEATS = {_sre.MAX_REPEAT, _sre.MIN_REPEAT, getattr(_sre, "POSSESSIVE_REPEAT", _sre.MAX_REPEAT)}
+# ASCII letters that re's IGNORECASE also matches to non-ASCII letters
+# (U+0130/U+0131, U+017F, U+212A); lower() does not map those back, so a
+# case-insensitive required literal must not contain them.
+_UNSAFE_FOLD = set("iIsSkK")
+
+
+class UnsafePattern(ValueError):
+    pass
+
+
+def _has_nested_repeat(items, in_unbounded: bool = False) -> bool:
+    for op, av in items:
+        children: List = []
+        unbounded = in_unbounded
+        if op in _REPEATS:
+            lo, hi, sub = av
+            if hi == _sre.MAXREPEAT:
+                if in_unbounded:
+                    return True
+                unbounded = True
+            children = [sub]
+        elif op == _sre.SUBPATTERN:
+            children = [av[-1]]
+        elif op == _sre.BRANCH:
+            children = av[1]
+        elif op in (_sre.ASSERT, _sre.ASSERT_NOT):
+            children = [av[1]]
+        elif op == getattr(_sre, "ATOMIC_GROUP", None):
+            children = [av]
+        elif op == _sre.GROUPREF_EXISTS:
+            children = [branch for branch in av[1:] if branch is not None]
+        if any(_has_nested_repeat(child, unbounded) for child in children):
+            return True
+    return False
+
+
+def _literal_runs(items, ignorecase: bool) -> List[str]:
+    """Substrings that every match of the parsed sequence ``items`` contains."""
+
+    runs: List[str] = []
+    current: List[str] = []
+
+    def flush():
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    for op, av in items:
+        if op == _sre.LITERAL:
+            ch = chr(av)
+            if ignorecase and (not ch.isascii() or ch in _UNSAFE_FOLD):
+                flush()
+            else:
+                current.append(ch.lower() if ignorecase else ch)
+            continue
+        flush()
+        if op == _sre.SUBPATTERN and not av[1] and not av[2]:  # no inline flag changes
+            runs.extend(_literal_runs(av[-1], ignorecase))
+        elif op in _REPEATS and av[0] >= 1:
+            runs.extend(_literal_runs(av[2], ignorecase))
+    flush()
+    return runs
+
+
+def check_pattern(pattern: str, flags: int = 0) -> Optional[str]:
+    """Raise :class:`UnsafePattern` for risky patterns; return the required literal, if any."""
+
+    parsed = _sre_parse.parse(pattern, flags)
+    if parsed.getwidth()[0] == 0:
+        raise UnsafePattern(f"Pattern {pattern!r} can match an empty string")
+    if _has_nested_repeat(parsed):
+        raise UnsafePattern(f"Pattern {pattern!r} nests unbounded repeats (catastrophic backtracking)")
+    runs = _literal_runs(parsed, bool(parsed.state.flags & re.IGNORECASE))
+    return max(runs, key=len) if runs else None
+
+
+class RegexScan(NamedTuple):
+    # (start, end) matches of every pattern, in pattern order
+    matches: List[List[Tuple[int, int]]]
+    # True if the page hit the time or match budget and later matches are missing
+    truncated: bool
+
+
+class RegexSet:
+    def __init__(
+        self,
+        patterns: Iterable[str],
+        flags: int = re.IGNORECASE,
+        budget_ms: float = REGEX_PAGE_BUDGET_MS,
+        max_matches: int = REGEX_MAX_MATCHES_PER_PAGE,
+    ):
+        self.patterns: List[str] = list(patterns)
+        self.budget = budget_ms / 1000
+        self.max_matches = max_matches
+        self._required = [check_pattern(p, flags) for p in self.patterns]
+        self._compiled = [re.compile(p, flags) for p in self.patterns]
+        self._lock = threading.Lock()
+        self.pages_over_budget = 0
+        self.patterns_skipped = 0
+
+    def scan(self, text: str, lowered: Optional[str] = None) -> RegexScan:
+        """Return the ``(start, end)`` matches of every pattern, in pattern order.
+
+        ``lowered`` is ``text.lower()``, if the caller already has it.
+        """
+
+        found: List[List[Tuple[int, int]]] = [[] for _ in self.patterns]
+        if not self.patterns:
+            return RegexScan(found, False)
+        if lowered is None:
+            lowered = text.lower()
+        deadline = time.perf_counter() + self.budget
+        total = skipped = 0
+        complete = True
+        for i, compiled in enumerate(self._compiled):
+            required = self._required[i]
+            if required is not None and required not in (lowered if compiled.flags & re.IGNORECASE else text):
+                skipped += 1
+                continue
+            for m in compiled.finditer(text):
+                if total >= self.max_matches:  # only truncated if there was one more
+                    complete = False
+                    break
+                found[i].append(m.span())
+                total += 1
+                if time.perf_counter() > deadline:
+                    complete = False
+                    break
+            if not complete:
+                break
+        with self._lock:
+            self.patterns_skipped += skipped
+            if not complete:
+                self.pages_over_budget += 1
+        return RegexScan(found, not complete)
+
+
+_sets_lock = threading.Lock()
+_sets = {}
+
+
+def get_regex_set(patterns: Sequence[str], flags: int = re.IGNORECASE) -> RegexSet:
+    """Return the compiled set for ``patterns``, building it on first use."""
+
+    key = (tuple(patterns), flags)
+    with _sets_lock:
+        regex_set = _sets.get(key)
+        if regex_set is None:
+            regex_set = _sets[key] = RegexSet(patterns, flags)
+        return regex_set
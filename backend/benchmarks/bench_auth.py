@@ -0,0 +1,109 @@
+"""Benchmark per-request authentication overhead.
+
+Compares ``get_current_user`` with the verified-token cache cold (every call
+decodes the JWT and queries ``users``) against warm cache hits, and measures
+how long the event loop stalls while bcrypt runs inline versus on the
+password executor.
+
+Usage (from ``backend/``)::
+
+    python benchmarks/bench_auth.py [--requests 2000] [--logins 8]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_auth_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models.db_models import User  # noqa: E402
+from app.utils import auth  # noqa: E402
+
+
+def _time_calls(token: str, n: int, clear_cache: bool) -> list:
+    samples = []
+    for _ in range(n):
+        if clear_cache:
+            auth.token_cache.clear()
+        db = SessionLocal()
+        try:
+            t0 = time.perf_counter()
+            auth.get_current_user(token=token, db=db)
+            samples.append((time.perf_counter() - t0) * 1e6)
+        finally:
+            db.close()
+    return samples
+
+
+async def _max_loop_lag(work) -> float:
+    """Run ``work`` while a 1 ms ticker records the worst scheduling delay."""
+
+    lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal lag
+        while not done.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - t0 - 0.001)
+
+    tick = asyncio.create_task(ticker())
+    await work()
+    done.set()
+    await tick
+    return lag * 1000
+
+
+def _report(label: str, samples: list) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"  {label:<28} mean {statistics.mean(samples):8.1f} us   p95 {p95:8.1f} us")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--logins", type=int, default=8)
+    args = ap.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    hashed = auth.get_password_hash("bench-password")
+    user = User(email="bench@example.com", hashed_password=hashed)
+    db.add(user)
+    db.commit()
+    token = auth.create_access_token({"sub": str(user.id)})
+    db.close()
+
+    print(f"get_current_user x {args.requests}")
+    _report("cache disabled (before)", _time_calls(token, args.requests, clear_cache=True))
+    auth.token_cache.clear()
+    _report("cache warm (after)", _time_calls(token, args.requests, clear_cache=False))
+
+    async def inline_logins():
+        for _ in range(args.logins):
+            auth.verify_password("bench-password", hashed)
+            await asyncio.sleep(0)
+
+    async def executor_logins():
+        await asyncio.gather(
+            *(auth.verify_password_async("bench-password", hashed) for _ in range(args.logins))
+        )
+
+    print(f"\nevent-loop stall during {args.logins} logins")
+    print(f"  {'inline bcrypt (before)':<28} max lag {asyncio.run(_max_loop_lag(inline_logins)):8.1f} ms")
+    print(f"  {'password executor (after)':<28} max lag {asyncio.run(_max_loop_lag(executor_logins)):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
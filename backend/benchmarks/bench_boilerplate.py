@@ -0,0 +1,104 @@
+"""Benchmark the boilerplate / duplicate-page pre-pass in ``parse_document``.
+
+Builds a spec book where every page carries the same project header (which
+names the Engineer of Record) and a numbered footer. Sections end with
+"END OF SECTION", and a share of the pages are repeated schedules or
+"intentionally left blank" sheets. It then compares the previous
+page-by-page loop (every page normalized and matched, boilerplate included)
+with ``parse_document``.
+
+Usage (from ``backend/``)::
+
+    python benchmarks/bench_boilerplate.py [--pages 400] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.matcher import compute_confidence, find_matches  # noqa: E402
+from app.services.pdf_parser import PDFParser  # noqa: E402
+from app.services.pipeline import parse_document  # noqa: E402
+from app.utils.keywords import SNIPPET_WINDOW  # noqa: E402
+from app.utils.spec_section import SectionResolver  # noqa: E402
+from app.utils.text import normalize_text_with_mapping, window  # noqa: E402
+
+HEADER = "RIVERSIDE MEDICAL OFFICE BUILDING - Structural Engineer of Record: Smith & Jones PE"
+BODY = (
+    "1.{article:02d} SUBMITTALS\n"
+    "A. Shop drawings shall be sealed by a Professional Engineer licensed in the state.\n"
+    "B. Contractor shall coordinate the Work with other trades and verify dimensions in the field.\n"
+    "C. Submit product data including manufacturer's technical data and installation instructions.\n"
+)
+SCHEDULE = "\n".join(f"DOOR {n:03d}  HM  3'-0\" x 7'-0\"  90 MIN  HW-{n % 7}" for n in range(40))
+
+
+def make_book(pages: int) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        if i % 10 == 9:
+            body = "THIS PAGE INTENTIONALLY LEFT BLANK"
+        elif i % 10 == 8:
+            body = SCHEDULE
+        else:
+            body = BODY.format(article=i % 10 + 1) * 3
+            if i % 10 == 7:
+                body += "END OF SECTION"
+        text = f"{HEADER}\nSECTION 03 30 00\n{body}\nIssued for Construction    Page {i + 1} of {pages}"
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(54, 54, 558, 738), text, fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def previous_loop(data: bytes) -> int:
+    """The per-page pipeline before the pre-pass; returns the match count."""
+
+    count = 0
+    section_seed = None
+    for _, page_text, _ in PDFParser(data).iter_pages():
+        ntext, index_map, canonical = normalize_text_with_mapping(page_text)
+        resolver = SectionResolver(canonical, seed_state=section_seed)
+        for _, match_type, positions in find_matches(ntext)[0]:
+            for start, end in positions:
+                window(ntext, start, end, before=SNIPPET_WINDOW, after=SNIPPET_WINDOW)
+                compute_confidence(ntext, start, end, match_type)
+                resolver.resolve(index_map[start])
+                count += 1
+        section_seed = resolver.tail_state()
+    return count
+
+
+def current(data: bytes) -> int:
+    outcome = parse_document(data)
+    try:
+        return outcome.total_matches
+    finally:
+        outcome.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--pages", type=int, default=400)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    data = make_book(args.pages)
+    print(f"{args.pages} pages, best of {args.repeat}")
+    for label, fn in (("page by page (before)", previous_loop), ("pre-pass (after)", current)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            matches = fn(data)
+            best = min(best, time.perf_counter() - t0)
+        print(f"  {label:<24} {best * 1000:8.1f} ms   {matches:6d} matches")
+
+
+if __name__ == "__main__":
+    main()
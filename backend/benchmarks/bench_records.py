@@ -0,0 +1,112 @@
+"""Benchmark match collection and serialization in the parse hot loop.
+
+Compares the previous approach (a pydantic ``ParseResultItem`` + ``Position``
+per match, ``model_dump`` for storage, then FastAPI-style validation and
+serialization of the whole ``ParseResponse``) with ``MatchRecord`` tuples
+serialized once and reused for both the stored JSON and the response body.
+
+Usage (from ``backend/``)::
+
+    python benchmarks/bench_records.py [--matches 20000] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.records import MatchRecord, serialize_records  # noqa: E402
+from app.models.schemas import DocumentMeta, ParseResponse, ParseResultItem, Position  # noqa: E402
+
+CONTEXT = ("Shop drawings shall be sealed by a Professional Engineer licensed in the state. " * 10)[:400]
+
+
+def _fields(i: int):
+    return dict(
+        keyword="Professional Engineer",
+        page=i // 25 + 1,
+        section_hint="SECTION 03 30 00 CAST-IN-PLACE CONCRETE",
+        spec_section="1.05-A-1",
+        snippet="Professional Engineer",
+        context_before=CONTEXT,
+        context_after=CONTEXT,
+        context_window=CONTEXT + "Professional Engineer" + CONTEXT,
+        confidence=0.9,
+        match_type="exact",
+        start=400,
+        end=421,
+        proximity_window=300,
+    )
+
+
+def pydantic_path(n: int) -> int:
+    results = []
+    for i in range(n):
+        f = _fields(i)
+        start, end = f.pop("start"), f.pop("end")
+        results.append(ParseResultItem(**f, positions=[Position(start=start, end=end)]))
+    stored = json.dumps([r.model_dump() for r in results])
+    response = ParseResponse(
+        document=DocumentMeta(filename="x.pdf", num_pages=n // 25, parse_time_ms=0),
+        results=results,
+        meta={"matched_pages": n // 25, "total_matches": n, "keywords_used": None},
+        result_id=1,
+    )
+    # What FastAPI does with a response_model: dump, re-validate, serialize.
+    validated = ParseResponse.model_validate(response.model_dump())
+    body = json.dumps(validated.model_dump(mode="json"))
+    return len(stored) + len(body)
+
+
+def record_path(n: int) -> int:
+    results = []
+    for i in range(n):
+        f = _fields(i)
+        results.append(
+            MatchRecord(
+                f["keyword"], f["page"], f["section_hint"], f["spec_section"], f["snippet"],
+                f["context_before"], f["context_after"], f["context_window"], f["confidence"],
+                f["match_type"], f["start"], f["end"], f["proximity_window"],
+            )
+        )
+    stored = serialize_records(results)
+    meta = {"matched_pages": n // 25, "total_matches": n, "keywords_used": None}
+    document = {"filename": "x.pdf", "num_pages": n // 25, "parse_time_ms": 0}
+    body = (
+        f'{{"document":{json.dumps(document)},"results":{stored},'
+        f'"meta":{json.dumps(meta)},"result_id":1}}'
+    )
+    return len(stored) + len(body)
+
+
+def _measure(fn, n: int, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(n)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn(n)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--matches", type=int, default=20000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{args.matches} matches, best of {args.repeat}")
+    for label, fn in (("pydantic models (before)", pydantic_path), ("MatchRecord (after)", record_path)):
+        best, peak = _measure(fn, args.matches, args.repeat)
+        print(f"  {label:<26} {best * 1000:8.1f} ms   peak {peak / 2**20:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""Concurrent load test against a running API server.
+
+Registers a pool of test users through ``/auth/register``, generates
+synthetic spec PDFs, then runs a pool of virtual clients against the server
+for a fixed duration. Each client sends a weighted mix of ``/parse``,
+``/results`` list/detail and ``/auth/login`` requests. The report gives
+throughput and p50/p95/p99 latency per route, so changes to the concurrency
+model can be compared run against run.
+
+Start a server first (a throwaway database keeps test users out of real
+data)::
+
+    DATABASE_URL=sqlite:////tmp/load.db uvicorn app.main:app --port 8000
+
+Then, from ``backend/``::
+
+    python benchmarks/load_test.py --concurrency 16 --duration 30 \\
+        --mix parse=1,list=3,detail=4,login=1 --json run.json
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.keywords import KEYWORDS  # noqa: E402
+
+ROUTES = ("parse", "list", "detail", "login")
+PASSWORD = "load-test-password"
+
+FILLER = (
+    "Contractor shall coordinate the Work with other trades and verify all dimensions "
+    "in the field before fabrication. Submit product data for each type of product "
+    "specified, including manufacturer's technical data and installation instructions. "
+)
+KEYWORD_SENTENCES = [
+    "Shop drawings shall be sealed by a {kw} licensed in the state where the Project is located.",
+    "Delegated-design calculations shall be stamped by the {kw} responsible for their preparation.",
+    "Submittals not bearing the seal of the {kw} will be returned without review.",
+]
+
+
+def make_spec_pdf(pages: int, seed: int) -> bytes:
+    """Build a spec-like PDF with section headings and scattered keyword hits."""
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for page_num in range(pages):
+        division = 3 + (page_num // 4) % 30
+        lines = [
+            f"SECTION {division:02d} {rng.randint(10, 90)}0 00",
+            "PART 1 - GENERAL",
+            f"1.{page_num % 9 + 1:02d} SUBMITTALS",
+        ]
+        for item in "ABCDEF":
+            text = FILLER
+            if rng.random() < 0.4:
+                text += rng.choice(KEYWORD_SENTENCES).format(kw=rng.choice(KEYWORDS))
+            lines.append(f"{item}. {text}")
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(54, 54, 558, 738), "\n".join(lines), fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+class Client:
+    """One keep-alive HTTP connection to the server."""
+
+    def __init__(self, base_url: str, timeout: float):
+        url = urllib.parse.urlsplit(base_url)
+        self.prefix = url.path.rstrip("/")
+        conn_cls = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self._connect = lambda: conn_cls(url.hostname, url.port, timeout=timeout)
+        self.conn = self._connect()
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None, headers: Optional[Dict] = None):
+        """Send one request and read the whole response; returns (status, body)."""
+
+        for attempt in (0, 1):
+            try:
+                self.conn.request(method, self.prefix + path, body=body, headers=headers or {})
+                resp = self.conn.getresponse()
+                return resp.status, resp.read()
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed a kept-alive connection; retry once on a fresh one.
+                self.conn.close()
+                self.conn = self._connect()
+                if attempt:
+                    raise
+
+    def post_json(self, path: str, payload: Dict, token: Optional[str] = None):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        return self.request("POST", path, json.dumps(payload).encode(), headers)
+
+    def get(self, path: str, token: str):
+        return self.request("GET", path, headers={"Authorization": f"Bearer {token}"})
+
+    def upload(self, path: str, filename: str, data: bytes, token: str):
+        boundary = uuid.uuid4().hex
+        body = b"".join(
+            [
+                f"--{boundary}\r\n".encode(),
+                f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'.encode(),
+                b"Content-Type: application/pdf\r\n\r\n",
+                data,
+                f"\r\n--{boundary}--\r\n".encode(),
+            ]
+        )
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": f"multipart/form-data; boundary={boundary}",
+        }
+        return self.request("POST", path, body, headers)
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class VirtualUser:
+    def __init__(self, email: str, token: str):
+        self.email = email
+        self.token = token
+        self.result_ids: List[int] = []
+        self.lock = threading.Lock()
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {route: [] for route in ROUTES}
+        self.statuses: Dict[str, Dict[str, int]] = {route: {} for route in ROUTES}
+        self.lock = threading.Lock()
+
+    def add(self, route: str, seconds: float, status: str) -> None:
+        with self.lock:
+            if status.startswith("2"):
+                self.samples[route].append(seconds)
+            counts = self.statuses[route]
+            counts[status] = counts.get(status, 0) + 1
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ROUTES:
+            raise argparse.ArgumentTypeError(f"unknown route {name!r} (choose from {', '.join(ROUTES)})")
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("mix needs at least one positive weight")
+    return mix
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+
+    if not sorted_samples:
+        return float("nan")
+    rank = max(1, math.ceil(pct / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def setup_users(args, pdfs: List[bytes]) -> List[VirtualUser]:
+    """Register (or reuse) the test users, log them in and give each a saved result."""
+
+    client = Client(args.base_url, args.timeout)
+    users = []
+    try:
+        for i in range(args.users):
+            email = f"{args.user_prefix}{i}@example.com"
+            status, body = client.post_json("/auth/register", {"email": email, "password": PASSWORD})
+            if status not in (201, 400):  # 400: left over from a previous run
+                raise SystemExit(f"register {email}: HTTP {status} {body[:200]!r}")
+            status, body = client.post_json("/auth/login", {"email": email, "password": PASSWORD})
+            if status != 200:
+                raise SystemExit(f"login {email}: HTTP {status} {body[:200]!r}")
+            user = VirtualUser(email, json.loads(body)["access_token"])
+
+            status, body = client.get("/results", user.token)
+            if status == 200:
+                user.result_ids = [r["id"] for r in json.loads(body)]
+            if not user.result_ids:
+                status, body = client.upload("/parse?save=true", "seed.pdf", pdfs[i % len(pdfs)], user.token)
+                if status != 200:
+                    raise SystemExit(f"seed parse for {email}: HTTP {status} {body[:200]!r}")
+                user.result_ids.append(json.loads(body)["result_id"])
+            users.append(user)
+    finally:
+        client.close()
+    return users
+
+
+def run_worker(worker_id: int, args, users: List[VirtualUser], pdfs: List[bytes],
+               recorder: Recorder, started: float, deadline: float) -> None:
+    rng = random.Random(args.seed * 1000 + worker_id)
+    routes = list(args.mix)
+    weights = [args.mix[r] for r in routes]
+    user = users[worker_id % len(users)]
+    client = Client(args.base_url, args.timeout)
+    try:
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            route = rng.choices(routes, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                status, body = _send(route, client, user, pdfs, rng, args.save_ratio)
+                status = str(status)
+            except Exception as e:  # timeouts, refused connections, ...
+                status, body = type(e).__name__, b""
+            elapsed = time.perf_counter() - t0
+            if t0 - started >= args.warmup:
+                recorder.add(route, elapsed, status)
+            if route == "parse" and status == "200":
+                result_id = json.loads(body).get("result_id")
+                if result_id is not None:
+                    with user.lock:
+                        user.result_ids.append(result_id)
+    finally:
+        client.close()
+
+
+def _send(route: str, client: Client, user: VirtualUser, pdfs: List[bytes],
+          rng: random.Random, save_ratio: float) -> Tuple[int, bytes]:
+    if route == "parse":
+        save = "true" if rng.random() < save_ratio else "false"
+        return client.upload(f"/parse?save={save}", "spec.pdf", rng.choice(pdfs), user.token)
+    if route == "list":
+        return client.get("/results", user.token)
+    if route == "detail":
+        with user.lock:
+            result_id = rng.choice(user.result_ids)
+        return client.get(f"/results/{result_id}", user.token)
+    return client.post_json("/auth/login", {"email": user.email, "password": PASSWORD})
+
+
+def report(recorder: Recorder, measured_seconds: float) -> Dict:
+    rows = {}
+    for route in ROUTES:
+        counts = recorder.statuses[route]
+        if not counts:
+            continue
+        samples = sorted(recorder.samples[route])
+        rows[route] = {
+            "requests": sum(counts.values()),
+            "ok": len(samples),
+            "errors": {k: v for k, v in counts.items() if not k.startswith("2")},
+            "rps": len(samples) / measured_seconds,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+            "max_ms": samples[-1] * 1000 if samples else float("nan"),
+        }
+
+    print(f"\n{'route':<8} {'ok':>7} {'err':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for route, row in rows.items():
+        print(
+            f"{route:<8} {row['ok']:>7} {sum(row['errors'].values()):>6} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}"
+        )
+    total_ok = sum(row["ok"] for row in rows.values())
+    print(f"{'total':<8} {total_ok:>7} {'':>6} {total_ok / measured_seconds:>8.1f}")
+    for route, row in rows.items():
+        if row["errors"]:
+            detail = ", ".join(f"{k}: {v}" for k, v in sorted(row["errors"].items()))
+            print(f"  {route} errors: {detail}")
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--base-url", default="http://127.0.0.1:8000/api/v1")
+    ap.add_argument("--users", type=int, default=8, help="Test accounts to register")
+    ap.add_argument("--concurrency", type=int, default=16, help="Virtual clients sending requests")
+    ap.add_argument("--duration", type=float, default=30.0, help="Seconds to run, warmup included")
+    ap.add_argument("--warmup", type=float, default=3.0, help="Seconds excluded from the report")
+    ap.add_argument("--mix", type=parse_mix, default=parse_mix("parse=1,list=3,detail=4,login=1"),
+                    help="Route weights, e.g. parse=1,list=3,detail=4,login=1")
+    ap.add_argument("--pages", type=int, default=20, help="Pages per synthetic PDF")
+    ap.add_argument("--documents", type=int, default=4, help="Distinct synthetic PDFs")
+    ap.add_argument("--save-ratio", type=float, default=0.25, help="Fraction of parses sent with save=true")
+    ap.add_argument("--user-prefix", default="loadtest+")
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", metavar="PATH", help="Also write the report as JSON")
+    args = ap.parse_args()
+    if args.warmup >= args.duration:
+        ap.error("--warmup must be shorter than --duration")
+
+    pdfs = [make_spec_pdf(args.pages, args.seed + i) for i in range(args.documents)]
+    print(f"generated {len(pdfs)} PDF(s) of {args.pages} pages "
+          f"({sum(map(len, pdfs)) // len(pdfs) // 1024} KiB avg)", file=sys.stderr)
+    users = setup_users(args, pdfs)
+    print(f"{len(users)} user(s) ready; running {args.concurrency} client(s) for {args.duration:g}s "
+          f"(first {args.warmup:g}s not counted)", file=sys.stderr)
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=run_worker, args=(i, args, users, pdfs, recorder, started, deadline), daemon=True)
+        for i in range(args.concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # Requests still in flight at the deadline finish late; count the real window.
+    measured = time.perf_counter() - started - args.warmup
+
+    rows = report(recorder, measured)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "config": {k: v for k, v in vars(args).items() if k != "json"},
+                    "measured_seconds": measured,
+                    "routes": rows,
+                },
+                fh,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
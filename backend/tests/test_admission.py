@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionRejected
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_admits_immediately_within_budget():
+    async def scenario():
+        ctl = AdmissionController(max_active=2, max_bytes=100)
+        await ctl.acquire(1, 40)
+        await ctl.acquire(2, 40)
+        assert (ctl.active, ctl.inflight_bytes) == (2, 80)
+        ctl.release(40)
+        assert (ctl.active, ctl.inflight_bytes) == (1, 40)
+
+    _run(scenario())
+
+
+def test_small_request_is_granted_past_a_blocked_large_waiter():
+    async def scenario():
+        ctl = AdmissionController(max_active=3, max_bytes=100, queue_timeout=0.5)
+        await ctl.acquire(1, 60)
+        large = asyncio.create_task(ctl.acquire(2, 60))  # over the byte budget: waits
+        await _settle()
+        assert ctl.stats()["queue_depth"] == 1
+        # Fits in what is left; must not wait for the next release.
+        await asyncio.wait_for(ctl.acquire(3, 10), timeout=0.1)
+        assert (ctl.active, ctl.inflight_bytes) == (2, 70)
+        assert not large.done()
+        ctl.release(60)
+        await asyncio.wait_for(large, timeout=0.1)
+        assert (ctl.active, ctl.inflight_bytes) == (2, 70)
+
+    _run(scenario())
+
+
+def test_waiters_are_granted_round_robin_across_users():
+    async def scenario():
+        ctl = AdmissionController(max_active=1, max_bytes=100, max_queued_per_user=5)
+        await ctl.acquire(0, 1)
+        order = []
+
+        async def wait(user_id):
+            await ctl.acquire(user_id, 1)
+            order.append(user_id)
+
+        tasks = [asyncio.create_task(wait(user_id)) for user_id in (1, 1, 1, 2, 3)]
+        await _settle()
+        assert ctl.stats()["queue_depth"] == 5
+        for _ in tasks:
+            ctl.release(1)
+            await _settle()
+        await asyncio.gather(*tasks)
+        assert order == [1, 2, 3, 1, 1]
+
+    _run(scenario())
+
+
+def test_full_queue_and_per_user_limit_reject_with_retry_after():
+    async def scenario():
+        ctl = AdmissionController(max_active=1, max_bytes=100, max_queue=2, max_queued_per_user=1)
+        await ctl.acquire(0, 1)
+        waiting = [asyncio.create_task(ctl.acquire(1, 1))]
+        await _settle()
+        with pytest.raises(AdmissionRejected) as per_user:
+            await ctl.acquire(1, 1)
+        assert per_user.value.retry_after >= 1
+        waiting.append(asyncio.create_task(ctl.acquire(2, 1)))
+        await _settle()
+        with pytest.raises(AdmissionRejected, match="queue is full"):
+            await ctl.acquire(3, 1)
+        assert ctl.rejected_total == 2
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        assert ctl.stats()["queue_depth"] == 0
+
+    _run(scenario())
+
+
+def test_timed_out_waiter_leaves_the_queue():
+    async def scenario():
+        ctl = AdmissionController(max_active=1, max_bytes=100, queue_timeout=0.05)
+        await ctl.acquire(0, 1)
+        with pytest.raises(AdmissionRejected, match="Timed out"):
+            await ctl.acquire(1, 1)
+        assert ctl.stats()["queue_depth"] == 0
+        ctl.release(1)
+        assert ctl.active == 0
+
+    _run(scenario())
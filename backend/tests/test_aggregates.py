@@ -0,0 +1,41 @@
+from app.models.db_models import ResultAggregate, User
+from app.services import aggregates, pipeline
+
+PAGE = "SECTION 03 30 00\n1.05 SUBMITTALS\nA. Calculations shall be sealed by a Professional Engineer."
+
+
+def _saved_results(db, make_pdf, count):
+    user = User(email="summary@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    ids = []
+    for n in range(count):
+        outcome = pipeline.parse_document(make_pdf([PAGE] * (n + 1)))
+        try:
+            ids.append(pipeline.save_parse_result(db, user.id, f"spec-{n}.pdf", outcome).id)
+        finally:
+            outcome.close()
+    return user, ids
+
+
+def test_saved_results_are_aggregated_at_save_time(db, make_pdf):
+    user, ids = _saved_results(db, make_pdf, 2)
+    summary = aggregates.summarize(db, ids)
+    assert summary["total_matches"] == 2 * (1 + 2)
+    assert {b["key"] for b in summary["by_keyword"]} == {"Sealed by", "Professional Engineer"}
+    assert [b["key"] for b in summary["by_division"]] == ["03"]
+    assert aggregates.ensure_aggregated(db, user.id) == 0
+
+
+def test_request_backfill_is_capped_and_maintenance_finishes_it(db, make_pdf):
+    user, ids = _saved_results(db, make_pdf, 3)
+    expected = aggregates.summarize(db, ids)
+    # As if saved before aggregation existed
+    db.query(ResultAggregate).delete()
+    db.commit()
+
+    assert aggregates.ensure_aggregated(db, user.id, limit=1) == 2
+    assert aggregates.summarize(db, ids)["total_matches"] == 2 * 3  # newest result only
+    assert aggregates.backfill_all(db) == 2
+    assert aggregates.summarize(db, ids) == expected
+    assert aggregates.ensure_aggregated(db, user.id, limit=1) == 0
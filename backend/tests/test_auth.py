@@ -0,0 +1,80 @@
+import dataclasses
+
+import pytest
+from sqlalchemy import event, inspect
+
+from app.models.db_models import User
+from app.utils import auth
+
+
+@pytest.fixture
+def token_cache(monkeypatch):
+    cache = auth.TTLCache(maxsize=16, ttl=60)
+    monkeypatch.setattr(auth, "token_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="cached@example.com", hashed_password="x", retention_days=30, retention_max_results=5)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _token(user):
+    return auth.create_access_token({"sub": str(user.id)})
+
+
+def test_snapshot_covers_every_user_column():
+    columns = {attr.key for attr in inspect(User).column_attrs}
+    assert {field.name for field in dataclasses.fields(auth.CachedIdentity)} == columns
+
+
+def test_cached_user_keeps_all_columns_without_a_query(db, user, token_cache):
+    token = _token(user)
+    auth.get_current_user(token, db)
+    db.expunge_all()
+
+    statements = []
+    listen = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.get_bind(), "before_cursor_execute", listen)
+    try:
+        cached = auth.get_current_user(token, db)
+        assert (cached.email, cached.retention_days, cached.retention_max_results) == (
+            "cached@example.com",
+            30,
+            5,
+        )
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listen)
+    assert statements == []
+
+
+def test_any_update_evicts_cached_tokens(db, user, token_cache):
+    token = _token(user)
+    auth.get_current_user(token, db)
+    assert token_cache.get(token) is not None
+    user.retention_days = 7
+    db.commit()
+    assert token_cache.get(token) is None
+    assert auth.get_current_user(token, db).retention_days == 7
+
+
+def test_delete_evicts_tokens_recached_before_commit(db, user, token_cache):
+    token = _token(user)
+    user_id = user.id
+    db.delete(user)
+    db.flush()
+    # A concurrent request between flush and commit still sees the old row.
+    token_cache.set(token, auth.CachedIdentity.of(user))
+    db.commit()
+    assert token_cache.get(token) is None
+    assert db.get(User, user_id) is None
+
+
+def test_rollback_drops_pending_evictions(db, user, token_cache):
+    user.retention_days = 1
+    db.flush()
+    db.rollback()
+    assert not db.info.get(auth._PENDING_KEY)
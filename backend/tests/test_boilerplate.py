@@ -0,0 +1,100 @@
+import json
+
+from app.services import pipeline
+from app.services.boilerplate import BoilerplateFilter, line_key
+
+HEADER = "ACME TOWER - PROJECT NO. 2231"
+SENTENCE = "Calculations shall be sealed by a Professional Engineer."
+BODY = [
+    "Contractor shall coordinate the Work with other trades.",
+    "Submit product data for each type of product specified.",
+    "Verify all dimensions in the field before fabrication.",
+    "Provide materials complying with referenced standards.",
+]
+
+
+TRADES = ["concrete", "masonry", "steel", "carpentry", "roofing", "glazing", "painting", "plumbing", "electrical", "earthwork"]
+
+
+def _filler(n):
+    # Distinct on every page, like real body text
+    return f"Coordinate {TRADES[n % 10]} work as indicated on the Drawings."
+
+
+def _page(n, sentence_at_bottom):
+    lines = [HEADER, _filler(n), *BODY[:2]]
+    if not sentence_at_bottom:
+        lines.append(SENTENCE)
+    lines += [*BODY[2:], _filler(n + 5)]
+    if sentence_at_bottom:
+        lines.append(SENTENCE)
+    lines.append(f"Page {n} of 10")
+    return "\n".join(lines)
+
+
+def _book():
+    return [_page(n, sentence_at_bottom=n <= 3) for n in range(1, 11)]
+
+
+def test_running_header_and_page_numbers_are_stripped():
+    pages = _book()
+    bp = BoilerplateFilter(pages, min_pages=3, edge_lines=1, min_fraction=0.5)
+    assert bp.keys == {line_key(HEADER), line_key("Page 1 of 10")}
+    stripped = bp.strip(pages[4])
+    assert HEADER not in stripped
+    assert "Page 5 of 10" not in stripped
+    assert _filler(5) in stripped and SENTENCE in stripped
+
+
+def test_sentence_at_bottom_of_a_few_pages_is_not_boilerplate():
+    pages = _book()
+    bp = BoilerplateFilter(pages, min_pages=3, edge_lines=3, min_fraction=0.5)
+    assert line_key(SENTENCE) not in bp.keys
+    assert all(SENTENCE in bp.strip(page) for page in pages)
+
+
+def test_boilerplate_key_is_kept_mid_page():
+    edge_only = [f"{HEADER}\n{_filler(n)}\n{BODY[1]}\n{_filler(n + 5)}" for n in range(6)]
+    bp = BoilerplateFilter(edge_only, min_pages=3, edge_lines=1, min_fraction=0.5)
+    assert line_key(HEADER) in bp.keys
+    page = f"{BODY[0]}\n{HEADER}\n{BODY[1]}\n{BODY[2]}\n{BODY[3]}"
+    assert HEADER in bp.strip(page)
+
+
+def test_threshold_scales_with_document_length():
+    # On 3 of 10 pages: enough for min_pages=3, not for half the document.
+    pages = [
+        f"Edge line\n{_filler(n)}\n{BODY[1]}\n{_filler(n + 5)}" if n < 3 else f"{_filler(n)}\n{BODY[1]}\n{_filler(n + 5)}"
+        for n in range(10)
+    ]
+    assert line_key("Edge line") not in BoilerplateFilter(pages, 3, 1, 0.5).keys
+    assert line_key("Edge line") in BoilerplateFilter(pages, 3, 1, 0.0).keys
+
+
+def test_short_pages_keep_their_body():
+    pages = [f"{HEADER}\n{SENTENCE}" for _ in range(5)] + [f"{HEADER}\nx\ny" for _ in range(5)]
+    bp = BoilerplateFilter(pages, min_pages=3, edge_lines=3, min_fraction=0.5)
+    # Two-line pages have no edge positions at all, so nothing is stripped from them.
+    assert line_key(SENTENCE) not in bp.keys
+    assert bp.strip(pages[0]) == pages[0]
+
+
+def test_hierarchy_markers_are_never_stripped():
+    pages = [f"1.05 SUBMITTALS\n{_filler(n)}\n{BODY[1]}\n{_filler(n + 5)}" for n in range(5)]
+    assert not BoilerplateFilter(pages, 3, 1, 0.5).keys
+
+
+def test_disabled_with_zero_min_pages():
+    assert not BoilerplateFilter(_book(), min_pages=0).keys
+
+
+def test_parse_keeps_requirement_sentences(make_pdf):
+    outcome = pipeline.parse_document(make_pdf(_book()))
+    try:
+        results = json.loads(outcome.results.to_json())
+        sentence_matches = [r for r in results if r["snippet"].lower() in ("sealed by", "professional engineer")]
+        # Two keywords in the sentence, on every one of the ten pages.
+        assert len(sentence_matches) == 20
+        assert outcome.matched_pages == 10
+    finally:
+        outcome.close()
@@ -0,0 +1,137 @@
+import json
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app import cli
+from app.models.db_models import ParseResult, User
+from app.services import document_store
+
+
+def _write(path, lines, torn=b""):
+    path.write_bytes(b"".join(json.dumps(line).encode() + b"\n" for line in lines) + torn)
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_bytes().splitlines()]
+
+
+def test_torn_final_line_is_dropped(tmp_path):
+    out = tmp_path / "out.ndjson"
+    _write(out, [{"path": "a.pdf", "total_matches": 1}], torn=b'{"path": "b.pdf", "tot')
+    assert cli._load_done_paths(str(out), retry_errors=False) == {"a.pdf"}
+    assert _records(out) == [{"path": "a.pdf", "total_matches": 1}]
+
+
+def test_torn_only_line_leaves_an_empty_file(tmp_path):
+    out = tmp_path / "out.ndjson"
+    out.write_bytes(b'{"path": "a.p' * 10000)
+    assert cli._load_done_paths(str(out), retry_errors=False) == set()
+    assert out.read_bytes() == b""
+
+
+def test_errors_count_as_done_unless_retried(tmp_path):
+    out = tmp_path / "out.ndjson"
+    lines = [{"path": "a.pdf", "total_matches": 1}, {"path": "b.pdf", "error": "RuntimeError: bad"}]
+    _write(out, lines)
+    assert cli._load_done_paths(str(out), retry_errors=False) == {"a.pdf", "b.pdf"}
+    assert _records(out) == lines
+
+    assert cli._load_done_paths(str(out), retry_errors=True) == {"a.pdf"}
+    assert _records(out) == lines[:1]
+
+
+def test_retried_file_keeps_one_record(tmp_path, make_pdf):
+    specs = tmp_path / "specs"
+    specs.mkdir()
+    (specs / "good.pdf").write_bytes(make_pdf(["Sealed by the Engineer."]))
+    (specs / "late.pdf").write_bytes(b"not a pdf")
+    out = tmp_path / "out.ndjson"
+    argv = ["bulk-parse", str(specs), "--out", str(out), "--workers", "1"]
+
+    assert cli.main(argv) == 1
+    assert sorted((r["path"], "error" in r) for r in _records(out)) == [("good.pdf", False), ("late.pdf", True)]
+
+    (specs / "late.pdf").write_bytes(make_pdf(["Stamped by a Professional Engineer."]))
+    assert cli.main(argv + ["--retry-errors"]) == 0
+    records = _records(out)
+    assert sorted(r["path"] for r in records) == ["good.pdf", "late.pdf"]
+    assert not any("error" in r for r in records)
+
+
+@pytest.fixture
+def save_as(db, tmp_path, monkeypatch):
+    """Point ``--save-as`` at the test database and return the user's email."""
+
+    db.add(User(email="bulk@example.com", hashed_password="x"))
+    db.commit()
+    monkeypatch.setattr(cli, "init_db", lambda: None)
+    monkeypatch.setattr(cli, "SessionLocal", lambda: Session(bind=db.get_bind()))
+    monkeypatch.setattr(document_store, "DOCUMENT_STORE_DIR", str(tmp_path / "documents"))
+    return "bulk@example.com"
+
+
+def _specs(tmp_path, make_pdf, names):
+    specs = tmp_path / "specs"
+    specs.mkdir()
+    for name in names:
+        (specs / name).write_bytes(make_pdf([f"{name} shall be sealed by the Engineer."]))
+    return specs
+
+
+def test_failed_save_is_recorded_and_the_run_continues(tmp_path, make_pdf, db, save_as, monkeypatch):
+    specs = _specs(tmp_path, make_pdf, ["a.pdf", "b.pdf"])
+    out = tmp_path / "out.ndjson"
+    save_parse_result = cli.save_parse_result
+
+    def flaky_save(session, user_id, filename, *args, **kwargs):
+        if filename == "a.pdf":
+            session.add(ParseResult(user_id=user_id, filename="half-written"))
+            raise RuntimeError("database is locked")
+        return save_parse_result(session, user_id, filename, *args, **kwargs)
+
+    monkeypatch.setattr(cli, "save_parse_result", flaky_save)
+    argv = ["bulk-parse", str(specs), "--out", str(out), "--save-as", save_as, "--workers", "1"]
+    assert cli.main(argv) == 1
+    records = {r["path"]: r for r in _records(out)}
+    assert records["a.pdf"]["error"] == "RuntimeError: database is locked"
+    assert records["b.pdf"]["result_id"]
+    assert [r.filename for r in db.query(ParseResult)] == ["b.pdf"]
+
+
+def test_store_failure_closes_the_outcome(tmp_path, make_pdf, monkeypatch):
+    path = tmp_path / "a.pdf"
+    path.write_bytes(make_pdf(["Sealed by the Engineer."]))
+    parse_document = cli.parse_document
+    closed = []
+
+    def tracked_parse(*args, **kwargs):
+        outcome = parse_document(*args, **kwargs)
+        outcome.close = lambda: closed.append(True)
+        return outcome
+
+    def failing_store(data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(cli, "parse_document", tracked_parse)
+    monkeypatch.setattr(document_store, "save_document", failing_store)
+    monkeypatch.setattr(cli, "_worker_store_documents", True)
+    assert cli._parse_file(str(path), "a.pdf") == {"path": "a.pdf", "error": "OSError: disk full"}
+    assert closed == [True]
+
+
+def test_saved_file_missing_from_the_ndjson_is_written_without_saving_again(tmp_path, make_pdf, db, save_as):
+    specs = _specs(tmp_path, make_pdf, ["a.pdf"])
+    out = tmp_path / "out.ndjson"
+    argv = ["bulk-parse", str(specs), "--out", str(out), "--save-as", save_as, "--workers", "1"]
+    assert cli.main(argv) == 0
+    first = _records(out)
+    # As if the run died after saving but before appending the line
+    out.write_bytes(b"")
+
+    assert cli.main(argv) == 0
+    again = _records(out)
+    assert [r["path"] for r in again] == ["a.pdf"]
+    assert again[0]["result_id"] == first[0]["result_id"]
+    assert again[0]["results"] == first[0]["results"]
+    assert db.query(ParseResult).count() == 1
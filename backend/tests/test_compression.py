@@ -0,0 +1,104 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.utils import compression
+
+BIG = "Calculations shall be sealed by a Professional Engineer. " * 200
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(compression.CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/big")
+    def big():
+        return PlainTextResponse(BIG)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("short")
+
+    @app.get("/png")
+    def png():
+        return Response(BIG.encode(), media_type="image/png")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((line.encode() for line in [BIG[:100]] * 50), media_type="text/csv")
+
+    return TestClient(app)
+
+
+def _get(client, path, accept):
+    # Read the raw body, so the test sees what was actually sent
+    with client.stream("GET", path, headers={"Accept-Encoding": accept}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", "gzip"),
+        ("gzip, deflate", "gzip"),
+        ("gzip;q=0", None),
+        ("gzip;q=0, *", None),
+        ("*", "gzip"),
+        ("identity", None),
+        ("deflate, compress", None),
+        ("", None),
+    ],
+)
+def test_choose_encoding_without_brotli(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert compression.choose_encoding(header) == expected
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [("br, gzip", "br"), ("gzip, br;q=0", "gzip"), ("br;q=0, gzip;q=0", None), ("*", "br")],
+)
+def test_choose_encoding_prefers_brotli_when_installed(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, "brotli", object())
+    assert compression.choose_encoding(header) == expected
+
+
+def test_gzip_response_round_trips(client):
+    response, raw = _get(client, "/big", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(raw) < len(BIG)
+    assert gzip.decompress(raw).decode() == BIG
+
+
+def test_brotli_response_round_trips(client):
+    brotli = pytest.importorskip("brotli")
+    response, raw = _get(client, "/big", "br, gzip")
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(raw).decode() == BIG
+
+
+@pytest.mark.parametrize("accept", ["gzip;q=0", "deflate"])
+def test_refused_or_unsupported_encoding_is_sent_plain(client, monkeypatch, accept):
+    monkeypatch.setattr(compression, "brotli", None)
+    response, raw = _get(client, "/big", accept)
+    assert "content-encoding" not in response.headers
+    assert raw.decode() == BIG
+
+
+@pytest.mark.parametrize("path", ["/small", "/png"])
+def test_small_and_compressed_bodies_are_sent_plain(client, path):
+    response, raw = _get(client, path, "gzip")
+    assert "content-encoding" not in response.headers
+    assert raw == client.get(path, headers={"Accept-Encoding": "identity"}).content
+
+
+def test_streamed_body_is_compressed_chunk_by_chunk(client):
+    response, raw = _get(client, "/stream", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(raw).decode() == BIG[:100] * 50
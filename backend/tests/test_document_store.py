@@ -0,0 +1,94 @@
+import os
+import time
+
+import pytest
+
+from app.models.db_models import ParseResult, User
+from app.services import document_store
+
+PDF = b"%PDF-1.4 stored document"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_store, "DOCUMENT_STORE_DIR", str(tmp_path / "documents"))
+    monkeypatch.setattr(document_store, "DOCUMENT_DELETE_GRACE_SECONDS", 600)
+    return tmp_path / "documents"
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="owner@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _result(db, user, document_hash):
+    result = ParseResult(
+        user_id=user.id,
+        filename="spec.pdf",
+        num_pages=1,
+        parse_time_ms=1,
+        total_matches=0,
+        matched_pages=0,
+        results_json="[]",
+        document_hash=document_hash,
+    )
+    db.add(result)
+    db.commit()
+    return result
+
+
+def _age(document_hash, seconds=3600):
+    path = document_store.document_path(document_hash)
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_last_reference_deleted_removes_the_file(db, store, user):
+    document_hash = document_store.save_document(PDF)
+    first, second = _result(db, user, document_hash), _result(db, user, document_hash)
+    _age(document_hash)
+    db.delete(first)
+    db.commit()
+    assert document_store.open_document(document_hash)
+    db.delete(second)
+    db.commit()
+    assert document_store.open_document(document_hash) is None
+
+
+def test_file_reused_by_an_uncommitted_save_survives_the_delete(db, store, user):
+    document_hash = document_store.save_document(PDF)
+    old = _result(db, user, document_hash)
+    _age(document_hash)
+    # Another request stores the same bytes, then the old result is deleted
+    # before that request commits its result.
+    assert document_store.save_document(PDF) == document_hash
+    db.delete(old)
+    db.commit()
+    _result(db, user, document_hash)
+    assert document_store.open_document(document_hash)
+
+
+def test_sweep_removes_only_stale_unreferenced_files(db, store, user):
+    kept = document_store.save_document(PDF)
+    _result(db, user, kept)
+    orphan = document_store.save_document(b"%PDF-1.4 orphan")
+    recent = document_store.save_document(b"%PDF-1.4 being saved")
+    for document_hash in (kept, orphan):
+        _age(document_hash)
+
+    assert document_store.sweep_unreferenced(db) == 1
+    assert document_store.open_document(kept)
+    assert document_store.open_document(orphan) is None
+    assert document_store.open_document(recent)
+
+
+def test_save_rewrites_a_file_deleted_underneath_it(store):
+    document_hash = document_store.save_document(PDF)
+    path = document_store.document_path(document_hash)
+    os.remove(path)
+    document_store._touch_or_write(path, PDF)
+    with open(path, "rb") as fh:
+        assert fh.read() == PDF
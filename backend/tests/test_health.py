@@ -0,0 +1,13 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_health_is_public():
+    assert client.get("/api/v1/health").json() == {"status": "ok"}
+
+
+def test_metrics_requires_authentication():
+    assert client.get("/api/v1/metrics").status_code == 401
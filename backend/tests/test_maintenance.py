@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+from app.models.db_models import ParseResult, User
+from app.services import maintenance
+
+
+def _add_results(db, user, ages_days):
+    now = datetime.utcnow()
+    results = [
+        ParseResult(
+            user_id=user.id,
+            filename=f"spec-{age}.pdf",
+            num_pages=1,
+            parse_time_ms=1,
+            total_matches=0,
+            matched_pages=0,
+            results_json="[]",
+            created_at=now - timedelta(days=age),
+        )
+        for age in ages_days
+    ]
+    db.add_all(results)
+    db.commit()
+    return {age: result.id for age, result in zip(ages_days, results)}
+
+
+def _user(db, email, **retention):
+    user = User(email=email, hashed_password="x", **retention)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_expired_results_per_user_limits(db, monkeypatch):
+    monkeypatch.setattr(maintenance, "RESULT_RETENTION_DAYS", 0)
+    monkeypatch.setattr(maintenance, "RESULT_RETENTION_MAX_RESULTS", 0)
+    by_age = _user(db, "age@example.com", retention_days=30)
+    by_count = _user(db, "count@example.com", retention_max_results=2)
+    unlimited = _user(db, "keep@example.com")
+    aged = _add_results(db, by_age, [1, 40, 90])
+    counted = _add_results(db, by_count, [1, 2, 3, 4])
+    _add_results(db, unlimited, [1, 400])
+
+    expired = set(maintenance._expired_result_ids(db))
+    assert expired == {aged[40], aged[90], counted[3], counted[4]}
+
+
+def test_server_default_applies_and_user_can_only_tighten(db, monkeypatch):
+    monkeypatch.setattr(maintenance, "RESULT_RETENTION_DAYS", 0)
+    monkeypatch.setattr(maintenance, "RESULT_RETENTION_MAX_RESULTS", 3)
+    looser = _user(db, "loose@example.com", retention_max_results=10)
+    stricter = _user(db, "strict@example.com", retention_max_results=1)
+    loose = _add_results(db, looser, [1, 2, 3, 4])
+    strict = _add_results(db, stricter, [1, 2])
+
+    assert set(maintenance._expired_result_ids(db)) == {loose[4], strict[2]}
+
+
+def test_no_limits_expires_nothing(db, monkeypatch):
+    monkeypatch.setattr(maintenance, "RESULT_RETENTION_DAYS", 0)
+    monkeypatch.setattr(maintenance, "RESULT_RETENTION_MAX_RESULTS", 0)
+    _add_results(db, _user(db, "a@example.com"), [1, 1000])
+    assert maintenance._expired_result_ids(db) == []
+
+
+def test_process_lock_is_exclusive(tmp_path):
+    path = str(tmp_path / "maintenance.lock")
+    with maintenance._process_lock(path) as first:
+        assert first
+        with maintenance._process_lock(path) as second:
+            assert not second
+    with maintenance._process_lock(path) as again:
+        assert again
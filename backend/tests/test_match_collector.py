@@ -0,0 +1,83 @@
+import json
+import os
+import pickle
+
+import pytest
+
+from app.models.db_models import ParseResult, User
+from app.models.records import MatchRecord
+from app.services import pipeline
+from app.services.match_collector import MatchCollector
+
+
+def _record(n):
+    context = f'line one\nline "two" é— #{n}'
+    return MatchRecord(
+        "Sealed by", n % 4 + 1, "SECTION 03 30 00", "1.05-A", "sealed by",
+        context, context[::-1], context * 2, 0.85, "exact", n, n + 9, 200,
+    )
+
+
+def _collector(count, threshold, tmp_path):
+    collector = MatchCollector(spill_threshold=threshold, spill_dir=str(tmp_path))
+    for n in range(count):
+        collector.append(_record(n))
+    return collector
+
+
+@pytest.mark.parametrize("count", [0, 1, 3, 4, 25])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_spilled_json_matches_in_memory_json(tmp_path, count, chunk_size):
+    expected = _collector(count, 10_000, tmp_path)
+    spilled = _collector(count, 3, tmp_path)
+    assert not expected.spilled
+    assert spilled.spilled == (count > 3)
+    try:
+        body = b"".join(spilled.iter_json(chunk_size=chunk_size))
+        assert json.loads(body) == json.loads(expected.to_json())
+        assert len(body) == spilled.json_size()
+        assert spilled.to_json() == body.decode("utf-8")
+        assert (len(spilled), spilled.matched_pages) == (count, min(count, 4))
+    finally:
+        spilled.close()
+
+
+def test_records_added_after_spilling_are_kept(tmp_path):
+    collector = _collector(5, 2, tmp_path)
+    try:
+        body = json.loads(collector.to_json())
+        assert [item["positions"][0]["start"] for item in body] == list(range(5))
+        assert collector.aggregates.counts[("total", "")][0] == 5
+    finally:
+        collector.close()
+
+
+def test_close_removes_the_spill_file(tmp_path):
+    collector = _collector(5, 2, tmp_path)
+    assert os.listdir(tmp_path)
+    collector.close()
+    collector.close()  # idempotent
+    assert os.listdir(tmp_path) == []
+
+
+def test_pickled_collector_takes_over_the_spill_file(tmp_path):
+    collector = _collector(5, 2, tmp_path)
+    copy = pickle.loads(pickle.dumps(collector))
+    assert json.loads(copy.to_json()) == json.loads(collector.to_json())
+    copy.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_spilled_collection_is_streamed_into_the_saved_row(db, tmp_path):
+    user = User(email="spill@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    collector = _collector(25, 3, tmp_path)
+    outcome = pipeline.ParseOutcome(results=collector, num_pages=4, parse_time_ms=1, pages=[])
+    try:
+        saved = pipeline.save_parse_result(db, user.id, "spill.pdf", outcome)
+        stored = db.query(ParseResult.results_json).filter(ParseResult.id == saved.id).scalar()
+        assert isinstance(stored, str)
+        assert json.loads(stored) == json.loads(collector.to_json())
+    finally:
+        outcome.close()
@@ -0,0 +1,112 @@
+import json
+
+import fitz  # PyMuPDF
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.main import app
+from app.models.db_models import User
+from app.routers.results import _highlight
+from app.services import document_store, page_renderer
+from app.services.pipeline import parse_document, save_parse_result
+from app.services.result_store import EXPORT_COLUMNS, ResultFilters, iter_export_rows
+from app.utils.auth import get_current_user
+
+# The header repeats on every page and is stripped before matching, but it
+# contains a keyword: only the body occurrence may be highlighted.
+HEADER = "ACME TOWER - Professional Engineer of Record"
+PAGES = [
+    f"{HEADER}\nSECTION 03 30 00\n1.05 SUBMITTALS\n"
+    f"A. Item {i} calculations shall be sealed by a Professional Engineer.\n"
+    f"B. Other {i} text.\nC. More {i} body.\nD. End {i} body."
+    for i in range(4)
+]
+
+
+@pytest.fixture
+def parsed(make_pdf):
+    data = make_pdf(PAGES)
+    outcome = parse_document(data, collect_pages=True)
+    try:
+        yield data, outcome
+    finally:
+        outcome.close()
+
+
+def _page_highlights(outcome, page):
+    return [
+        page_renderer.Highlight(
+            item["positions"][0]["start"],
+            item["positions"][0]["end"],
+            item["snippet"],
+            item["context_before"],
+            item["context_after"],
+        )
+        for item in json.loads(outcome.results.to_json())
+        if item["page"] == page
+    ]
+
+
+def _marked_text(pdf_page, quads):
+    return sorted(pdf_page.get_textbox(quad.rect).strip() for quad in quads)
+
+
+@pytest.mark.parametrize("with_matched_text", [True, False])
+def test_only_the_matched_occurrence_is_highlighted(parsed, with_matched_text):
+    data, outcome = parsed
+    matched_text = outcome.pages[1][2] if with_matched_text else None
+    highlights = _page_highlights(outcome, 2)
+    assert sorted(h.snippet for h in highlights) == ["Professional Engineer", "sealed by"]
+
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        pdf_page = doc[1]
+        (header,) = pdf_page.search_for(HEADER)
+        quads = page_renderer._locate(pdf_page, highlights, matched_text)
+        assert len(quads) == 2
+        assert all(not quad.rect.intersects(header) for quad in quads)
+        assert _marked_text(pdf_page, quads) == ["Professional Engineer", "sealed by"]
+
+
+def test_offsets_map_through_stripped_lines(parsed):
+    data, outcome = parsed
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        raw, _ = page_renderer._page_chars(doc[0])
+        assert raw == doc[0].get_text("text")
+    matched_text = outcome.pages[0][2]
+    offsets = page_renderer._align(raw, matched_text)
+    start = matched_text.index("Professional Engineer")
+    assert raw[offsets[start] : offsets[start + 20] + 1] == "Professional Engineer"
+    assert offsets[start] > raw.index("1.05 SUBMITTALS")
+
+
+def test_page_image_route_passes_each_match_position(db, parsed, tmp_path, monkeypatch):
+    data, outcome = parsed
+    monkeypatch.setattr(document_store, "DOCUMENT_STORE_DIR", str(tmp_path / "documents"))
+    monkeypatch.setattr(page_renderer, "render_cache", page_renderer.DiskLRUCache(str(tmp_path / "cache"), 1 << 20))
+    user = User(email="viewer@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    result = save_parse_result(db, user.id, "spec.pdf", outcome, document_hash=document_store.save_document(data))
+
+    rows = [dict(zip(EXPORT_COLUMNS, row)) for row in iter_export_rows(db, result.id, ResultFilters(page=3))]
+    assert [_highlight(row) for row in rows] == _page_highlights(outcome, 3)
+
+    calls = []
+
+    def render_page(pdf_path, page, dpi, fmt, highlights, matched_text):
+        calls.append((page, highlights, matched_text))
+        return b"image"
+
+    monkeypatch.setattr(page_renderer, "render_page", render_page)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: db.get(User, user.id)
+    try:
+        client = TestClient(app)
+        first = client.get(f"/api/v1/results/{result.id}/pages/3/image")
+        again = client.get(f"/api/v1/results/{result.id}/pages/3/image")
+    finally:
+        app.dependency_overrides.clear()
+    assert (first.status_code, first.headers["x-render-cache"]) == (200, "miss")
+    assert again.headers["x-render-cache"] == "hit"
+    assert calls == [(3, _page_highlights(outcome, 3), outcome.pages[2][2])]
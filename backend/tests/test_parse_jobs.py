@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.main import app
+from app.models.db_models import User
+from app.routers import parse as parse_router
+from app.services import pipeline
+from app.services.match_collector import MatchCollector
+from app.services.parse_jobs import ParseCancelled, ParseJobRegistry
+from app.utils.auth import get_current_user
+
+PAGE = "SECTION 03 30 00\n1.05 SUBMITTALS\nA. Calculations shall be sealed by a Professional Engineer."
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = ParseJobRegistry()
+    monkeypatch.setattr(parse_router, "parse_jobs", registry)
+    return registry
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="canceller@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def override(db, user):
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: db.get(User, user.id)
+    try:
+        yield
+    finally:
+        app.dependency_overrides.clear()
+
+
+def _post_pdf(client, pdf, **params):
+    return client.post("/api/v1/parse", params=params, files={"file": ("spec.pdf", pdf, "application/pdf")})
+
+
+def test_checkpoint_raises_once_cancelled():
+    registry = ParseJobRegistry()
+    job = registry.start(1, "spec.pdf", "job-1")
+    job.checkpoint(0.25)
+    assert registry.cancel(1, "job-1", "cancelled_by_user")
+    assert not registry.cancel(2, "job-1", "cancelled_by_user")  # another user's job
+    with pytest.raises(ParseCancelled, match="cancelled_by_user"):
+        job.checkpoint(0.5)
+    registry.finish(job)
+    stats = registry.stats()
+    assert stats["running"] == 0
+    assert stats["finished"] == 0
+    assert stats["cancelled"] == 1
+    assert stats["cancelled_by_reason"] == {"cancelled_by_user": 1}
+    # Half the document was left, so about as much CPU again was saved
+    assert job.cpu_seconds_saved() == pytest.approx(job.cpu_seconds)
+
+
+def test_duplicate_job_id_is_refused(registry, user, override, make_pdf):
+    running = registry.start(user.id, "other.pdf", "dup")
+    try:
+        response = _post_pdf(TestClient(app), make_pdf([PAGE]), job_id="dup")
+        assert response.status_code == 409
+    finally:
+        registry.finish(running)
+    assert _post_pdf(TestClient(app), make_pdf([PAGE]), job_id="dup").status_code == 200
+    assert registry.stats()["finished"] == 1
+
+
+def test_cancel_endpoint_stops_the_parse_and_closes_its_spill_file(
+    registry, user, override, make_pdf, tmp_path, monkeypatch
+):
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    collectors = []
+
+    def spilling_collector():
+        collectors.append(MatchCollector(spill_threshold=0, spill_dir=str(spill_dir)))
+        return collectors[-1]
+
+    monkeypatch.setattr(pipeline, "MatchCollector", spilling_collector)
+
+    reached = threading.Event()
+    parse_document = parse_router.parse_document
+
+    def gated_parse(source, collect_pages, checkpoint):
+        job = checkpoint.__self__
+
+        def gated(progress):
+            # Hold the parse after the first page's matches, until it is cancelled
+            if progress >= 0.75 and not reached.is_set():
+                reached.set()
+                deadline = time.monotonic() + 5
+                while not job.cancelled and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            checkpoint(progress)
+
+        return parse_document(source, collect_pages, gated)
+
+    monkeypatch.setattr(parse_router, "parse_document", gated_parse)
+
+    responses = []
+    request = threading.Thread(
+        target=lambda: responses.append(_post_pdf(TestClient(app), make_pdf([PAGE, PAGE + " Again."]), job_id="long"))
+    )
+    request.start()
+    assert reached.wait(5)
+    client = TestClient(app)
+    assert [job["job_id"] for job in client.get("/api/v1/parse/jobs").json()] == ["long"]
+    assert collectors[0].spilled and list(spill_dir.iterdir())
+
+    cancel = client.post("/api/v1/parse/jobs/long/cancel")
+    assert cancel.status_code == 202
+    request.join(5)
+
+    assert responses[0].status_code == parse_router.STATUS_PARSE_CANCELLED
+    assert list(spill_dir.iterdir()) == []
+    stats = registry.stats()
+    assert (stats["running"], stats["cancelled"]) == (0, 1)
+    assert stats["cancelled_by_reason"] == {"cancelled_by_user": 1}
+    assert client.post("/api/v1/parse/jobs/long/cancel").status_code == 404
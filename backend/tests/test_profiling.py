@@ -0,0 +1,77 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.main import app
+from app.models.db_models import User
+from app.services import profiling
+from app.utils import auth
+from app.utils.auth import get_current_user
+
+PAGE = "SECTION 03 30 00\n1.05 SUBMITTALS\nA. Calculations shall be sealed by a Professional Engineer."
+
+
+@pytest.fixture
+def current(db, monkeypatch):
+    """Which user the requests run as; the admin unless a test switches it."""
+
+    monkeypatch.setattr(auth, "ADMIN_EMAILS", frozenset({"admin@example.com"}))
+    users = {email: User(email=email, hashed_password="x") for email in ("admin@example.com", "user@example.com")}
+    db.add_all(users.values())
+    db.commit()
+    return {"user": users["admin@example.com"], "users": users}
+
+
+@pytest.fixture
+def client(db, current, tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path / "profiles"))
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: current["user"]
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def _profile(client, pdf):
+    return client.post("/api/v1/parse?profile=true", files={"file": ("spec.pdf", pdf, "application/pdf")})
+
+
+def test_profiling_is_admin_only(client, current, make_pdf):
+    current["user"] = current["users"]["user@example.com"]
+    assert _profile(client, make_pdf([PAGE])).status_code == 403
+    assert client.get("/api/v1/admin/profiles").status_code == 403
+    assert profiling.list_profiles() == []
+
+
+def test_profile_is_written_and_served(client, make_pdf):
+    response = _profile(client, make_pdf([PAGE, PAGE]))
+    assert response.status_code == 200
+    summary = response.json()["meta"]["profile"]
+    profile_id = summary["id"]
+
+    listed = client.get("/api/v1/admin/profiles").json()
+    assert [entry["id"] for entry in listed] == [profile_id]
+    detail = client.get(f"/api/v1/admin/profiles/{profile_id}").json()
+    assert [row["page"] for row in detail["pages"]] == [1, 2]
+    assert detail["top_functions"]
+    assert detail["total_matches"] == response.json()["meta"]["total_matches"]
+    pstats = client.get(f"/api/v1/admin/profiles/{profile_id}/pstats")
+    assert pstats.status_code == 200 and pstats.content
+
+
+def test_concurrent_profile_is_refused(client, make_pdf):
+    assert profiling._lock.acquire(blocking=False)
+    try:
+        assert _profile(client, make_pdf([PAGE])).status_code == 409
+    finally:
+        profiling._lock.release()
+    assert _profile(client, make_pdf([PAGE])).status_code == 200
+
+
+def test_oldest_profiles_are_pruned(client, make_pdf, tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_MAX_KEPT", 2)
+    ids = [_profile(client, make_pdf([PAGE])).json()["meta"]["profile"]["id"] for _ in range(3)]
+    assert [entry["id"] for entry in profiling.list_profiles()] == ids[:0:-1]
+    remaining = sorted(path.name for path in (tmp_path / "profiles").iterdir())
+    assert remaining == sorted(f"{profile_id}{suffix}" for profile_id in ids[1:] for suffix in (".json", ".prof"))
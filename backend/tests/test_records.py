@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from app.models.records import MatchRecord, serialize_records
+from app.models.schemas import ParseResultItem
+from app.services.match_collector import MatchCollector
+
+RECORDS = [
+    MatchRecord(
+        "Professional Engineer", 3, None, None, "Professional Engineer", "sealed by a ", ".",
+        "sealed by a Professional Engineer.", 1.0, "exact", 12, 33, None,
+    ),
+    MatchRecord(
+        "Sealed by", 4, "SUBMITTALS", "03 30 00", "sealed by", "Calculations ", " a PE",
+        "Calculations sealed by a PE", 0.875, "fuzzy", 0, 9, 120,
+    ),
+    MatchRecord(
+        "stamp", 5, "QUALITY ASSURANCE", None, "stamped – \"signed\"", "", "\n", "stamped – \"signed\"\n",
+        0.1 + 0.2, "regex", 7, 14, None,
+    ),
+]
+
+
+@pytest.mark.parametrize("spill_threshold", [100, 0])
+def test_json_has_the_parse_result_item_shape(spill_threshold, tmp_path):
+    collector = MatchCollector(spill_threshold=spill_threshold, spill_dir=str(tmp_path))
+    for record in RECORDS:
+        collector.append(record)
+    try:
+        items = json.loads(collector.to_json())
+    finally:
+        collector.close()
+
+    assert len(items) == len(RECORDS)
+    for item in items:
+        model = ParseResultItem(**item)
+        # Same names, same order, None kept as null rather than dropped
+        assert list(item) == list(ParseResultItem.model_fields)
+        assert item == model.model_dump()
+        # Floats round-trip exactly as pydantic would encode them
+        assert item == json.loads(model.model_dump_json())
+
+
+def test_serialize_records_matches_the_collector():
+    collector = MatchCollector()
+    for record in RECORDS:
+        collector.append(record)
+    assert collector.to_json() == serialize_records(RECORDS)
+    assert json.loads(serialize_records([])) == []
@@ -0,0 +1,81 @@
+import re
+
+import pytest
+
+from app.services import matcher, pipeline
+from app.utils.regex_set import RegexSet, UnsafePattern, check_pattern
+
+PATTERNS = [
+    r"\bprofessional\s+engineer(s)?\b",
+    r"\b(seal(ed)?|stamp(ed)?)\s+by\b",
+    r"\bengineer\s+of\s+record\b",
+    r"\bpe\s+(seal|stamp|registration)\b",
+]
+TEXT = (
+    "Calculations shall be sealed by a Professional  Engineer. The Engineer of Record "
+    "reviews drawings stamped by others. PE stamp required. Professional engineers only."
+)
+
+
+@pytest.mark.parametrize(
+    "pattern, literal",
+    [
+        (r"\bengineer\s+of\s+record\b", "record"),
+        (r"\bprofessional\s+engineer(s)?\b", "profe"),  # "s" folds to U+017F, so runs stop there
+        (r"\b(seal(ed)?|stamp(ed)?)\s+by\b", "by"),
+        (r"\d{3}-\d{4}", "-"),
+        (r"(?-i:Engineer)\d+", None),  # groups with inline flags are not looked into
+        (r"\d+(st|nd)", None),
+    ],
+)
+def test_required_literal(pattern, literal):
+    assert check_pattern(pattern, re.IGNORECASE) == literal
+
+
+@pytest.mark.parametrize("pattern", [r"(a+)+b", r"(\w*)*x", r"x?", r"(?:ab)*"])
+def test_unsafe_patterns_are_rejected(pattern):
+    with pytest.raises(UnsafePattern):
+        RegexSet([pattern])
+
+
+def test_scan_matches_plain_finditer():
+    scan = RegexSet(PATTERNS).scan(TEXT)
+    expected = [[m.span() for m in re.finditer(p, TEXT, re.IGNORECASE)] for p in PATTERNS]
+    assert scan.matches == expected
+    assert all(scan.matches) and not scan.truncated
+
+
+def test_pages_without_the_literal_are_skipped():
+    rs = RegexSet(PATTERNS)
+    scan = rs.scan("Nothing relevant on this page.")
+    assert scan.matches == [[], [], [], []]
+    assert rs.patterns_skipped == len(PATTERNS)
+
+
+def test_case_folded_letters_still_match():
+    # U+212A KELVIN SIGN matches "k" under IGNORECASE but lowercases to itself
+    rs = RegexSet([r"\bmarker\s+kit\b"])
+    assert rs.scan("Provide a MARKER KIT.").matches == [[(10, 20)]]
+
+
+def test_match_budget_truncates_and_is_reported():
+    rs = RegexSet(PATTERNS, max_matches=2)
+    scan = rs.scan(TEXT)
+    assert scan.truncated
+    assert sum(map(len, scan.matches)) == 2
+    assert rs.pages_over_budget == 1
+
+
+def test_exactly_max_matches_is_not_truncated():
+    rs = RegexSet(PATTERNS, max_matches=2)
+    assert not rs.scan("Sealed by the Engineer of Record.").truncated
+
+
+def test_parse_lists_truncated_pages(make_pdf, monkeypatch):
+    monkeypatch.setattr(matcher, "REGEX_SET", RegexSet(PATTERNS, max_matches=2))
+    pages = ["Nothing to see here.", TEXT, "Sealed by the Engineer of Record."]
+    outcome = pipeline.parse_document(make_pdf(pages))
+    try:
+        assert outcome.regex_truncated_pages == [2]
+    finally:
+        outcome.close()
@@ -0,0 +1,78 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.main import app
+from app.models.db_models import User
+from app.services.pipeline import parse_document, save_parse_result
+from app.utils.auth import get_current_user
+
+PAGES = [
+    "SECTION 03 30 00\n1.05 SUBMITTALS\nA. Calculations shall be sealed by a Professional Engineer.",
+    "SECTION 05 12 00\n1.04 QUALITY ASSURANCE\nA. Drawings shall be sealed by the Professional Engineer of record.",
+]
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="results@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def client(db, user):
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: db.get(User, user.id)
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def result_id(db, user, make_pdf):
+    outcome = parse_document(make_pdf(PAGES), collect_pages=True)
+    try:
+        return save_parse_result(db, user.id, "spec.pdf", outcome).id
+    finally:
+        outcome.close()
+
+
+def test_matching_etag_gets_304_without_a_body(client, result_id):
+    first = client.get(f"/api/v1/results/{result_id}")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    again = client.get(f"/api/v1/results/{result_id}", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    assert client.get(f"/api/v1/results/{result_id}", headers={"If-None-Match": 'W/"other"'}).status_code == 200
+
+
+def test_filters_change_the_etag(client, result_id):
+    url = f"/api/v1/results/{result_id}"
+    full = client.get(url)
+    page = client.get(url, params={"page": 2})
+    assert {r["page"] for r in page.json()["results"]} == {2}
+    assert page.headers["etag"] != full.headers["etag"]
+    assert client.get(url, params={"page": 2}, headers={"If-None-Match": full.headers["etag"]}).status_code == 200
+    # Keywords compare case-insensitively, and so do their ETags
+    keyword = full.json()["results"][0]["keyword"]
+    assert (
+        client.get(url, params={"keyword": keyword.upper()}).headers["etag"]
+        == client.get(url, params={"keyword": keyword.lower()}).headers["etag"]
+    )
+
+
+def test_result_detail_is_compressed_for_clients_that_accept_it(client, result_id, monkeypatch):
+    from app.utils import compression
+
+    monkeypatch.setattr(compression, "brotli", None)
+    response = client.get(f"/api/v1/results/{result_id}", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["id"] == result_id
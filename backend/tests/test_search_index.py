@@ -0,0 +1,106 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.database import get_db
+from app.main import app
+from app.models.db_models import ParseResult, User
+from app.services import search_index
+from app.utils.auth import get_current_user
+
+STRIDE = search_index.PAGE_ROWID_STRIDE
+
+
+@pytest.fixture
+def users(db):
+    users = [User(email=f"reader{i}@example.com", hashed_password="x") for i in range(2)]
+    db.add_all(users)
+    db.commit()
+    return users
+
+
+def _save(db, user, pages, filename="spec.pdf"):
+    """A saved result with its ``(page, section_hint, text)`` rows indexed."""
+
+    result = ParseResult(
+        user_id=user.id,
+        filename=filename,
+        num_pages=len(pages),
+        total_matches=0,
+        matched_pages=0,
+        parse_time_ms=1,
+        results_json="[]",
+    )
+    db.add(result)
+    db.flush()
+    search_index.index_pages(db, result.id, user.id, pages)
+    db.commit()
+    return result
+
+
+def _rowids(db):
+    return [row[0] for row in db.execute(text(f"SELECT rowid FROM {search_index.FTS_TABLE} ORDER BY rowid"))]
+
+
+@pytest.fixture
+def search_as(db):
+    """GET /search as the given user."""
+
+    current = {}
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: current["user"]
+    client = TestClient(app)
+
+    def get(user, **params):
+        current["user"] = user
+        return client.get("/api/v1/search", params=params)
+
+    try:
+        yield get
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_build_match_query_quotes_every_term():
+    assert search_index.build_match_query('cast-in-place "shop drawings" NOT') == (
+        '"cast-in-place" "shop drawings" "NOT"'
+    )
+    assert search_index.build_match_query('say "a ""quote"""') == '"say" "a" "quote"'
+    assert search_index.build_match_query("   ") == ""
+
+
+def test_search_only_returns_the_callers_pages(db, users, search_as):
+    mine = _save(db, users[0], [(1, "03 30 00", "concrete shall be sealed by the engineer")], "mine.pdf")
+    _save(db, users[1], [(1, None, "sealed concrete submittals")], "theirs.pdf")
+
+    response = search_as(users[0], q="sealed concrete")
+    assert response.status_code == 200
+    hits = response.json()["hits"]
+    assert [(hit["result_id"], hit["filename"], hit["page"], hit["section_hint"]) for hit in hits] == [
+        (mine.id, "mine.pdf", 1, "03 30 00")
+    ]
+    assert "**sealed**" in hits[0]["snippet"]
+    assert [hit["filename"] for hit in search_as(users[1], q="sealed").json()["hits"]] == ["theirs.pdf"]
+    assert search_as(users[0], q="submittals").json()["hits"] == []
+
+
+def test_rowids_keep_each_result_in_its_own_range(db, users):
+    first = _save(db, users[0], [(1, None, "first page one"), (STRIDE - 1, None, "first last page")])
+    second = _save(db, users[0], [(1, None, "second page one")])
+    assert _rowids(db) == [first.id * STRIDE + 1, first.id * STRIDE + STRIDE - 1, second.id * STRIDE + 1]
+    assert first.id * STRIDE + STRIDE - 1 < second.id * STRIDE
+
+    db.delete(first)
+    db.commit()
+    # The highest page of the deleted result goes; the next result's first page stays
+    assert _rowids(db) == [second.id * STRIDE + 1]
+    assert [hit["result_id"] for hit in search_index.search(db, users[0].id, "page", 10)] == [second.id]
+
+
+def test_deleting_a_user_drops_their_pages(db, users):
+    _save(db, users[0], [(1, None, "sealed by the engineer"), (2, None, "more sealed text")])
+    kept = _save(db, users[1], [(1, None, "sealed as well")])
+    db.delete(users[0])
+    db.commit()
+    assert _rowids(db) == [kept.id * STRIDE + 1]
+    assert search_index.search(db, users[0].id, "sealed", 10) == []
@@ -0,0 +1,145 @@
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.main import app
+from app.models.db_models import ParseResult, UploadSession, User
+from app.routers import parse as parse_router
+from app.services import document_store, uploads
+from app.utils.auth import get_current_user
+
+CHUNK = uploads.MIN_CHUNK_SIZE
+
+
+@pytest.fixture
+def pdf(make_pdf):
+    text = "SECTION 03 30 00\n1.05 SUBMITTALS\nA. Calculations shall be sealed by a Professional Engineer."
+    return make_pdf([text] * 3)
+
+
+@pytest.fixture
+def client(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(document_store, "DOCUMENT_STORE_DIR", str(tmp_path / "documents"))
+    user = User(email="uploader@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: db.get(User, user.id)
+    try:
+        yield TestClient(app, raise_server_exceptions=False)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def _upload(client, data):
+    created = client.post("/api/v1/uploads", json={"filename": "spec.pdf", "size": len(data), "chunk_size": CHUNK})
+    assert created.status_code == 201
+    upload_id = created.json()["upload_id"]
+    for index in range(0, len(data), CHUNK):
+        chunk = data[index : index + CHUNK]
+        put = client.put(
+            f"/api/v1/uploads/{upload_id}/chunks/{index // CHUNK}",
+            content=chunk,
+            headers={"X-Chunk-SHA256": hashlib.sha256(chunk).hexdigest()},
+        )
+        assert put.status_code == 200
+    return upload_id
+
+
+def test_complete_saves_and_stores_the_document(client, db, pdf):
+    upload_id = _upload(client, pdf)
+    done = client.post(f"/api/v1/uploads/{upload_id}/complete?save=true")
+    assert done.status_code == 200
+    body = done.json()
+    assert body["meta"]["total_matches"] == 6
+    result = db.get(ParseResult, body["result_id"])
+    assert result.document_hash == hashlib.sha256(pdf).hexdigest()
+    assert document_store.open_document(result.document_hash)
+    assert db.get(UploadSession, upload_id) is None
+
+    # The session is gone: a repeated complete is a clean 404
+    assert client.post(f"/api/v1/uploads/{upload_id}/complete?save=true").status_code == 404
+
+
+def test_complete_while_another_is_running_is_refused(client, db, pdf):
+    upload_id = _upload(client, pdf)
+    assert uploads.claim_completion(db, db.get(UploadSession, upload_id))
+    assert client.post(f"/api/v1/uploads/{upload_id}/complete").status_code == 409
+    chunk = pdf[:CHUNK]
+    put = client.put(
+        f"/api/v1/uploads/{upload_id}/chunks/0",
+        content=chunk,
+        headers={"X-Chunk-SHA256": hashlib.sha256(chunk).hexdigest()},
+    )
+    assert put.status_code == 409
+
+
+def test_failed_save_leaves_the_upload_for_a_retry(client, db, pdf, monkeypatch):
+    upload_id = _upload(client, pdf)
+    save_parse_result = parse_router.save_parse_result
+
+    def failing_save(*args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(parse_router, "save_parse_result", failing_save)
+    assert client.post(f"/api/v1/uploads/{upload_id}/complete?save=true").status_code == 500
+    # Nothing was moved into the store and the session can be completed again
+    assert document_store.open_document(hashlib.sha256(pdf).hexdigest()) is None
+    assert db.get(UploadSession, upload_id).completing_since is None
+
+    monkeypatch.setattr(parse_router, "save_parse_result", save_parse_result)
+    retry = client.post(f"/api/v1/uploads/{upload_id}/complete?save=true")
+    assert retry.status_code == 200
+    assert document_store.open_document(hashlib.sha256(pdf).hexdigest())
+
+
+def test_incomplete_upload_reports_missing_chunks_and_stays_completable(client, db, pdf):
+    created = client.post("/api/v1/uploads", json={"filename": "spec.pdf", "size": len(pdf), "chunk_size": CHUNK})
+    upload_id = created.json()["upload_id"]
+    missing = client.post(f"/api/v1/uploads/{upload_id}/complete")
+    assert missing.status_code == 409
+    assert missing.json()["detail"]["missing_chunks"]
+    db.expire_all()
+    assert db.get(UploadSession, upload_id).completing_since is None
+
+
+def test_complete_is_refused_while_a_chunk_is_being_written(client, db, pdf):
+    upload_id = _upload(client, pdf)
+    upload = db.get(UploadSession, upload_id)
+    with uploads.chunk_writer(db, upload):
+        assert client.post(f"/api/v1/uploads/{upload_id}/complete").status_code == 409
+        db.expire_all()
+        assert db.get(UploadSession, upload_id).completing_since is None
+    assert client.post(f"/api/v1/uploads/{upload_id}/complete").status_code == 200
+
+
+def test_chunk_cannot_be_recorded_once_completion_is_claimed(client, db, pdf):
+    upload_id = _upload(client, pdf)
+    upload = db.get(UploadSession, upload_id)
+    with uploads.chunk_writer(db, upload):
+        # As a claim made without the file lock would (e.g. without fcntl)
+        upload.completing_since = uploads._utcnow()
+        db.commit()
+        with pytest.raises(uploads.CompletionInProgress):
+            uploads.record_chunk(db, upload, 0, "0" * 64)
+    with pytest.raises(uploads.CompletionInProgress):
+        with uploads.chunk_writer(db, upload):
+            pass
+    assert len(upload.chunks) == len(range(0, len(pdf), CHUNK))
+
+
+def test_failure_after_the_result_is_saved_does_not_allow_a_second_save(client, db, pdf, monkeypatch):
+    upload_id = _upload(client, pdf)
+
+    def failing_adopt(path, document_hash):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(document_store, "adopt_document", failing_adopt)
+    assert client.post(f"/api/v1/uploads/{upload_id}/complete?save=true").status_code == 500
+    assert db.query(ParseResult).count() == 1
+    assert db.get(UploadSession, upload_id) is None
+    assert client.post(f"/api/v1/uploads/{upload_id}/complete?save=true").status_code == 404
+    assert db.query(ParseResult).count() == 1
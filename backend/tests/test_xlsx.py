@@ -0,0 +1,55 @@
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from app.routers.results import _content_disposition
+from app.utils.xlsx import iter_xlsx
+
+NS = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+def _workbook(sheet_name, rows=()):
+    data = b"".join(iter_xlsx(["keyword", "context"], rows, sheet_name=sheet_name, batch_size=2))
+    return zipfile.ZipFile(io.BytesIO(data))
+
+
+def _sheet_name(zf):
+    return ET.fromstring(zf.read("xl/workbook.xml")).find("x:sheets/x:sheet", NS).get("name")
+
+
+@pytest.mark.parametrize(
+    "filename, expected",
+    [
+        ('Spec "Rev B"', 'Spec "Rev B"'),
+        ("Tower <A> & Annex", "Tower <A> & Annex"),
+        ("Div 03/04 [draft]: v2?", "Div 03_04 _draft__ v2_"),
+        ("'quoted'", "quoted"),
+        ("bell\x07name", "bellname"),
+        ("x" * 40, "x" * 31),
+        ("", "Sheet1"),
+        ("[]", "__"),
+    ],
+)
+def test_sheet_name_is_valid_xml_and_excel(filename, expected):
+    assert _sheet_name(_workbook(filename)) == expected
+
+
+def test_cells_with_markup_and_control_characters_round_trip():
+    rows = [("Sealed by", 'A "quoted" <tag> & more\x0b'), ("x", None), ("n", 3)]
+    zf = _workbook("results", rows)
+    sheet = ET.fromstring(zf.read("xl/worksheets/sheet1.xml"))
+    cells = [
+        "".join(c.itertext())
+        for row in sheet.iterfind("x:sheetData/x:row", NS)
+        for c in row.iterfind("x:c", NS)
+    ]
+    assert cells == ["keyword", "context", "Sealed by", 'A "quoted" <tag> & more', "x", "n", "3"]
+
+
+def test_content_disposition_keeps_ascii_fallback_and_utf8_name():
+    header = _content_disposition('Façade "final"\r\n.xlsx')
+    assert header.startswith('attachment; filename="Faade final.xlsx";')
+    assert "filename*=UTF-8''Fa%C3%A7ade%20%22final%22%0D%0A.xlsx" in header
+    assert "\n" not in header
@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { getToken, removeToken } from '../utils/auth'
 import { saveToLocalStorage } from '../utils/results'
@@ -17,6 +17,10 @@ export default function ParseScreen() {
   const [file, setFile] = useState<File | null>(null)
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState<string | null>(null)
+  // Aborting the request disconnects it, which makes the server stop parsing
+  const inFlight = useRef<AbortController | null>(null)
+
+  useEffect(() => () => inFlight.current?.abort(), [])
 
   const onChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     const f = e.target.files?.[0]
@@ -25,6 +29,9 @@ export default function ParseScreen() {
 
   const onParse = async () => {
     if (!file) return
+    inFlight.current?.abort()
+    const controller = new AbortController()
+    inFlight.current = controller
     setLoading(true)
     setError(null)
     try {
@@ -40,6 +47,7 @@ export default function ParseScreen() {
         method: 'POST',
         headers,
         body: form,
+        signal: controller.signal,
       })
       if (!res.ok) {
         const text = await res.text()
@@ -56,12 +64,21 @@ export default function ParseScreen() {
         setError('Failed to save result. Please try again.')
       }
     } catch (e: any) {
-      setError(e?.message || 'Failed to parse')
+      if (e?.name !== 'AbortError') {
+        setError(e?.message || 'Failed to parse')
+      }
     } finally {
-      setLoading(false)
+      if (inFlight.current === controller) {
+        inFlight.current = null
+        setLoading(false)
+      }
     }
   }
 
+  const onCancel = () => {
+    inFlight.current?.abort()
+  }
+
   return (
     <div className="parse-container">
       <div className="parse-header">
@@ -86,6 +103,7 @@ export default function ParseScreen() {
         <button disabled={!file || loading} onClick={onParse}>
           {loading ? 'Parsing…' : 'Parse'}
         </button>
+        {loading && <button onClick={onCancel}>Cancel</button>}
         {file && <span>{file.name}</span>}
       </div>
       {error && <div className="parse-error">{error}</div>}
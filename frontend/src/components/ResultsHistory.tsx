@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react'
 import { useNavigate, Link } from 'react-router-dom'
-import { listResults, deleteResult } from '../utils/results'
-import type { ParseResultSummary } from '../types'
+import { listResults, deleteResult, getResultsSummary } from '../utils/results'
+import type { AggregateBucket, ParseResultSummary, ResultsBreakdown } from '../types'
 import '../styles/ResultsHistory.css'
 
 export default function ResultsHistory() {
@@ -9,6 +9,7 @@ export default function ResultsHistory() {
   const [results, setResults] = useState<ParseResultSummary[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
+  const [summary, setSummary] = useState<ResultsBreakdown | null>(null)
 
   useEffect(() => {
     const fetchResults = async () => {
@@ -27,6 +28,19 @@ export default function ResultsHistory() {
     fetchResults()
   }, [])
 
+  // The breakdown is optional; the list still works without it
+  useEffect(() => {
+    getResultsSummary()
+      .then(setSummary)
+      .catch((err) => console.warn('Failed to load results summary:', err))
+  }, [results.length])
+
+  const topBuckets = (buckets: AggregateBucket[], limit = 5): string =>
+    buckets
+      .slice(0, limit)
+      .map((bucket) => `${bucket.key} (${bucket.matches})`)
+      .join(', ') || '—'
+
   const formatDate = (dateString: string): string => {
     try {
       const date = new Date(dateString)
@@ -120,6 +134,27 @@ export default function ResultsHistory() {
         </div>
       ) : (
         <div className="results-history-content">
+          {summary && summary.total_matches > 0 && (
+            <div className="results-history-summary">
+              <div className="results-history-stat">
+                <span className="results-history-stat-label">Total Matches:</span>
+                <span className="results-history-stat-value">
+                  {summary.total_matches}
+                  {summary.pending_results > 0 && ` (${summary.pending_results} older results still being counted)`}
+                </span>
+              </div>
+              <div className="results-history-stat">
+                <span className="results-history-stat-label">Top Keywords:</span>
+                <span className="results-history-stat-value">{topBuckets(summary.by_keyword)}</span>
+              </div>
+              <div className="results-history-stat">
+                <span className="results-history-stat-label">By Division:</span>
+                <span className="results-history-stat-value">
+                  {topBuckets([...summary.by_division].sort((a, b) => b.matches - a.matches))}
+                </span>
+              </div>
+            </div>
+          )}
           <div className="results-history-list">
             {results.map((result) => (
               <Link
@@ -144,6 +179,10 @@ export default function ResultsHistory() {
                   </span>
                 </div>
                 <div className="results-history-item-stats">
+                  <div className="results-history-stat">
+                    <span className="results-history-stat-label">Matches:</span>
+                    <span className="results-history-stat-value">{result.total_matches}</span>
+                  </div>
                   <div className="results-history-stat">
                     <span className="results-history-stat-label">Matched Pages:</span>
                     <span className="results-history-stat-value">
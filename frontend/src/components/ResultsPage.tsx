@@ -1,8 +1,8 @@
 import { useState, useEffect } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
-import { getResult, getFromLocalStorage } from '../utils/results'
+import { getResult, getFromLocalStorage, exportResult } from '../utils/results'
 import type { ParseResultDetail } from '../types'
-import ResultsTable from './ResultsTable'
+import ResultsTable, { type ResultsTableFilters } from './ResultsTable'
 import '../styles/ResultsPage.css'
 
 export default function ResultsPage() {
@@ -11,6 +11,7 @@ export default function ResultsPage() {
   const [result, setResult] = useState<ParseResultDetail | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
+  const [filters, setFilters] = useState<ResultsTableFilters>({ page: '' })
 
   useEffect(() => {
     const fetchResult = async () => {
@@ -73,6 +74,21 @@ export default function ResultsPage() {
     }
   }
 
+  const handleExport = async (format: 'csv' | 'xlsx') => {
+    if (!id) return
+    // Export what the table shows, not every match
+    const page = filters.page ? Number(filters.page) : undefined
+    if (page !== undefined && !(Number.isInteger(page) && page >= 1)) {
+      alert('Enter a page number of 1 or more to export that page')
+      return
+    }
+    try {
+      await exportResult(parseInt(id, 10), format, { page })
+    } catch (err: any) {
+      alert(err?.message || 'Failed to export result')
+    }
+  }
+
   const formatTime = (ms: number): string => {
     if (ms < 1000) return `${ms}ms`
     return `${(ms / 1000).toFixed(2)}s`
@@ -148,6 +164,18 @@ export default function ResultsPage() {
       <div className="results-page-header">
         <h1>Parse Results</h1>
         <div className="results-page-header-actions">
+          <button
+            onClick={() => handleExport('csv')}
+            className="results-page-button"
+          >
+            Export CSV
+          </button>
+          <button
+            onClick={() => handleExport('xlsx')}
+            className="results-page-button"
+          >
+            Export XLSX
+          </button>
           <button
             onClick={() => navigate('/results')}
             className="results-page-button"
@@ -192,13 +220,19 @@ export default function ResultsPage() {
             <span className="metadata-value">{formatDate(result.created_at)}</span>
           </div>
         </div>
+        {result.meta?.regex_truncated_pages?.length > 0 && (
+          <p className="results-page-warning">
+            Pattern matching stopped early on page(s) {result.meta.regex_truncated_pages.join(', ')}; some
+            matches on those pages may be missing.
+          </p>
+        )}
       </div>
 
       {/* Results Table */}
       <div className="results-page-content">
         <h2>Matches ({getUniqueMatchesCount(result.results)})</h2>
         {result.results.length > 0 ? (
-          <ResultsTable results={result.results} />
+          <ResultsTable results={result.results} filters={filters} onFiltersChange={setFilters} />
         ) : (
           <div className="results-page-empty">
             <p>No matches found in this document.</p>
@@ -5,8 +5,15 @@ import '../styles/ResultsTable.css'
 type SortField = 'page' | 'spec_section'
 type SortDirection = 'asc' | 'desc'
 
+/** Filters the table applies; the results page passes them on to exports too */
+export interface ResultsTableFilters {
+  page: string
+}
+
 interface ResultsTableProps {
   results: ParseResultItem[]
+  filters: ResultsTableFilters
+  onFiltersChange: (filters: ResultsTableFilters) => void
 }
 
 /**
@@ -74,13 +81,10 @@ function highlightSentenceWithKeyword(contextWindow: string, keyword: string): R
   )
 }
 
-export default function ResultsTable({ results }: ResultsTableProps) {
+export default function ResultsTable({ results, filters, onFiltersChange: setFilters }: ResultsTableProps) {
   const [sortField, setSortField] = useState<SortField | null>(null)
   const [sortDirection, setSortDirection] = useState<SortDirection>('asc')
   const [expandedRows, setExpandedRows] = useState<Set<number>>(new Set())
-  const [filters, setFilters] = useState({
-    page: '',
-  })
 
   // Deduplicate results - entries with same page, section, and section_hint are considered duplicates
   const uniqueResults = useMemo(() => {
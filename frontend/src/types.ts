@@ -38,6 +38,27 @@ export type ParseResultSummary = {
   created_at: string // ISO datetime string
 }
 
+export type AggregateBucket = {
+  key: string
+  matches: number
+  mean_confidence: number | null
+}
+
+/** Match breakdowns summed over saved results (GET /results/summary) */
+export type ResultsBreakdown = {
+  result_count: number
+  /** Older results not aggregated yet; not included in the totals */
+  pending_results: number
+  total_matches: number
+  mean_confidence: number | null
+  by_keyword: AggregateBucket[]
+  by_section: AggregateBucket[]
+  by_division: AggregateBucket[]
+  by_page_bucket: AggregateBucket[]
+  confidence_histogram: AggregateBucket[]
+  page_bucket_size: number
+}
+
 export type ParseResultDetail = ParseResultSummary & {
   results: ParseResultItem[]
   meta: Record<string, any>
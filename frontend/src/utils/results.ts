@@ -1,8 +1,9 @@
 import { getToken } from './auth'
-import type { ParseResponse, ParseResultSummary, ParseResultDetail } from '../types'
+import type { ParseResponse, ParseResultSummary, ParseResultDetail, ResultsBreakdown } from '../types'
 
 const API_BASE = (import.meta as any).env.VITE_API_BASE || 'http://127.0.0.1:8000/api/v1'
 const RESULT_STORAGE_PREFIX = 'parse_result_'
+const ETAG_STORAGE_PREFIX = 'parse_result_etag_'
 
 /**
  * Save parse response to localStorage if it has a result_id
@@ -15,7 +16,9 @@ export function saveResult(parseResponse: ParseResponse): void {
 }
 
 /**
- * Fetch a specific parse result from the backend
+ * Fetch a specific parse result from the backend.
+ * Revalidates the localStorage copy with its ETag, so an unchanged result costs
+ * one round trip and no body.
  */
 export async function getResult(resultId: number): Promise<ParseResultDetail> {
   const token = getToken()
@@ -23,11 +26,20 @@ export async function getResult(resultId: number): Promise<ParseResultDetail> {
     throw new Error('Authentication required')
   }
 
-  const response = await fetch(`${API_BASE}/results/${resultId}`, {
-    headers: {
-      Authorization: `Bearer ${token}`,
-    },
-  })
+  const headers: Record<string, string> = {
+    Authorization: `Bearer ${token}`,
+  }
+  const cached = getFromLocalStorage(resultId)
+  const etag = getStoredEtag(resultId)
+  if (cached && 'results' in cached && etag) {
+    headers['If-None-Match'] = etag
+  }
+
+  const response = await fetch(`${API_BASE}/results/${resultId}`, { headers })
+
+  if (response.status === 304 && cached) {
+    return cached as ParseResultDetail
+  }
 
   if (!response.ok) {
     const error = await response.json().catch(() => ({ detail: 'Failed to fetch result' }))
@@ -37,7 +49,7 @@ export async function getResult(resultId: number): Promise<ParseResultDetail> {
   const result = await response.json()
 
   // Cache the result in localStorage
-  saveToLocalStorage(resultId, result)
+  saveToLocalStorage(resultId, result, response.headers.get('ETag'))
 
   return result
 }
@@ -65,6 +77,80 @@ export async function listResults(): Promise<ParseResultSummary[]> {
   return response.json()
 }
 
+/**
+ * Get match breakdowns (by keyword, division, ...) across all saved results,
+ * served from aggregates stored at save time
+ */
+export async function getResultsSummary(): Promise<ResultsBreakdown> {
+  const token = getToken()
+  if (!token) {
+    throw new Error('Authentication required')
+  }
+
+  const response = await fetch(`${API_BASE}/results/summary`, {
+    headers: {
+      Authorization: `Bearer ${token}`,
+    },
+  })
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ detail: 'Failed to fetch summary' }))
+    throw new Error(error.detail || 'Failed to fetch summary')
+  }
+
+  return response.json()
+}
+
+/**
+ * Download a saved result as CSV or XLSX via the streaming export endpoint
+ */
+export async function exportResult(
+  resultId: number,
+  format: 'csv' | 'xlsx',
+  filters: { page?: number; keyword?: string; section?: string } = {}
+): Promise<void> {
+  const token = getToken()
+  if (!token) {
+    throw new Error('Authentication required')
+  }
+
+  const params = new URLSearchParams({ format })
+  for (const [key, value] of Object.entries(filters)) {
+    if (value !== undefined && value !== '') {
+      params.set(key, String(value))
+    }
+  }
+
+  const response = await fetch(`${API_BASE}/results/${resultId}/export?${params}`, {
+    headers: {
+      Authorization: `Bearer ${token}`,
+    },
+  })
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ detail: 'Failed to export result' }))
+    throw new Error(error.detail || 'Failed to export result')
+  }
+
+  const disposition = response.headers.get('Content-Disposition') || ''
+  // Prefer the UTF-8 name; the quoted one is an ASCII-only fallback
+  const encoded = disposition.match(/filename\*=UTF-8''([^;]+)/)
+  const quoted = disposition.match(/filename="([^"]+)"/)
+  const blob = await response.blob()
+  const url = URL.createObjectURL(blob)
+  const link = document.createElement('a')
+  link.href = url
+  link.download = encoded
+    ? decodeURIComponent(encoded[1])
+    : quoted
+      ? quoted[1]
+      : `result-${resultId}.${format}`
+  document.body.appendChild(link)
+  link.click()
+  link.remove()
+  URL.revokeObjectURL(url)
+}
+
 /**
  * Delete a parse result from the backend
  */
@@ -91,12 +177,22 @@ export async function deleteResult(resultId: number): Promise<void> {
 }
 
 /**
- * Save result data to localStorage with a key based on result_id
+ * Save result data to localStorage with a key based on result_id.
+ * The ETag is kept only when it describes exactly this data (a GET /results/{id} response).
  */
-export function saveToLocalStorage(resultId: number, data: ParseResponse | ParseResultDetail): void {
+export function saveToLocalStorage(
+  resultId: number,
+  data: ParseResponse | ParseResultDetail,
+  etag?: string | null
+): void {
   try {
     const key = `${RESULT_STORAGE_PREFIX}${resultId}`
     localStorage.setItem(key, JSON.stringify(data))
+    if (etag) {
+      localStorage.setItem(`${ETAG_STORAGE_PREFIX}${resultId}`, etag)
+    } else {
+      localStorage.removeItem(`${ETAG_STORAGE_PREFIX}${resultId}`)
+    }
   } catch (error) {
     console.warn('Failed to save result to localStorage:', error)
   }
@@ -119,6 +215,14 @@ export function getFromLocalStorage(resultId: number): ParseResponse | ParseResu
   }
 }
 
+function getStoredEtag(resultId: number): string | null {
+  try {
+    return localStorage.getItem(`${ETAG_STORAGE_PREFIX}${resultId}`)
+  } catch {
+    return null
+  }
+}
+
 /**
  * Delete a result from localStorage
  */
@@ -126,6 +230,7 @@ export function deleteFromLocalStorage(resultId: number): void {
   try {
     const key = `${RESULT_STORAGE_PREFIX}${resultId}`
     localStorage.removeItem(key)
+    localStorage.removeItem(`${ETAG_STORAGE_PREFIX}${resultId}`)
   } catch (error) {
     console.warn('Failed to delete result from localStorage:', error)
   }